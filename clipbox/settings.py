@@ -136,6 +136,82 @@ import os
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Video render ayarları
+VIDEO_RENDER_BACKEND = os.getenv('VIDEO_RENDER_BACKEND', 'moviepy')  # 'moviepy' | 'ffmpeg' | 'streaming'
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY')  # boşsa imageio-ffmpeg binary'si kullanılır
+RENDER_PARALLEL_WORKERS = int(os.getenv('RENDER_PARALLEL_WORKERS', 1))  # >1 ise MoviePy render'ı segmentlere bölünür
+RENDER_SEGMENT_IMAGES = int(os.getenv('RENDER_SEGMENT_IMAGES', 0))  # segment başına görsel; 0 → görseller worker'lara eşit bölünür
+RENDER_CACHE_ENABLED = os.getenv('RENDER_CACHE_ENABLED', '0') == '1'  # MEDIA_ROOT/render_cache altında segment + ses cache'i; açıkken MoviePy render'ı segmentli yoldan gider
+RENDER_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', 5 * 1024 ** 3))
+RENDER_CACHE_EVICT_GRACE_SECONDS = int(os.getenv('RENDER_CACHE_EVICT_GRACE_SECONDS', 3600))  # bu süre içinde kullanılan girdiler silinmez
+RENDER_DRAFT_SCALE = float(os.getenv('RENDER_DRAFT_SCALE', 0.33))  # taslak render çözünürlük oranı
+RENDER_DRAFT_FPS = int(os.getenv('RENDER_DRAFT_FPS', 12))
+KEN_BURNS_PRECOMPUTE_SECONDS = float(os.getenv('KEN_BURNS_PRECOMPUTE_SECONDS', 0))  # bu süreden kısa klipler önceden hesaplanır
+RENDER_MEMORY_CEILING_MB = int(os.getenv('RENDER_MEMORY_CEILING_MB', 1024))  # streaming backend bellek tavanı
+RENDER_STREAM_QUEUE_FRAMES = int(os.getenv('RENDER_STREAM_QUEUE_FRAMES', 48))  # encoder'ı bekleyen en fazla kare
+RENDITION_PLATFORMS = [p for p in os.getenv('RENDITION_PLATFORMS', '').split(',') if p]  # boşsa tüm platformlar
+
+# Arka plan işleri (harici broker yok; web sürecindeki thread havuzu)
+GENERATION_JOB_WORKERS = int(os.getenv('GENERATION_JOB_WORKERS', 2))  # 0 → adımlar istek içinde senkron çalışır
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 3))  # tam akışta aynı anda çalışabilecek adım sayısı
+BATCH_PIPELINE_WORKERS = int(os.getenv('BATCH_PIPELINE_WORKERS', 4))  # toplu üretimde aynı anda ilerleyen video sayısı
+BATCH_MAX_VIDEOS = int(os.getenv('BATCH_MAX_VIDEOS', 100))
+CPU_STEP_CONCURRENCY = int(os.getenv('CPU_STEP_CONCURRENCY', 1))  # Whisper/render adımları için süreç geneli sınır
+IO_STEP_CONCURRENCY = int(os.getenv('IO_STEP_CONCURRENCY', 8))  # API çağrısı bekleyen adımlar için süreç geneli sınır
+
+# Altyazı: 'align' → metni sese hizala (güven düşükse Whisper), 'whisper' → her zaman tam transkripsiyon
+SUBTITLE_MODE = os.getenv('SUBTITLE_MODE', 'align')
+SUBTITLE_ALIGNMENT_MIN_CONFIDENCE = float(os.getenv('SUBTITLE_ALIGNMENT_MIN_CONFIDENCE', 0.7))
+
+# Whisper (altyazı); modeller worker süreci içinde bir kez yüklenir
+WHISPER_MODEL_SIZE = os.getenv('WHISPER_MODEL_SIZE', 'medium')
+WHISPER_COMPUTE_TYPE = os.getenv('WHISPER_COMPUTE_TYPE', 'int8')  # int8 | float32 | ...
+WHISPER_CPU_THREADS = int(os.getenv('WHISPER_CPU_THREADS', 0))  # 0 → CTranslate2 varsayılanı
+WHISPER_MEMORY_BUDGET_MB = int(os.getenv('WHISPER_MEMORY_BUDGET_MB', 4096))  # aşılınca LRU model bırakılır
+WHISPER_BATCH_SIZE = int(os.getenv('WHISPER_BATCH_SIZE', 8))  # toplu transkripsiyonda birlikte decode edilen parça sayısı
+# Worker açılışında modeli yükle; 'align' modunda Whisper yalnızca yedek olduğundan varsayılan kapalı
+WHISPER_WARM_ON_STARTUP = os.getenv('WHISPER_WARM_ON_STARTUP', '1' if SUBTITLE_MODE == 'whisper' else '0') == '1'
+
+# Görsel üretimi (OpenAI images); limit API anahtarı başına, süreç genelinde paylaşılır
+IMAGE_GENERATION_CONCURRENCY = int(os.getenv('IMAGE_GENERATION_CONCURRENCY', 4))  # aynı anda bekleyen istek sayısı
+IMAGE_GENERATION_RETRIES = int(os.getenv('IMAGE_GENERATION_RETRIES', 2))  # başarısız slotlar için ek deneme turu
+IMAGE_RATE_LIMIT_PER_MINUTE = float(os.getenv('IMAGE_RATE_LIMIT_PER_MINUTE', 5))  # hesabın images/dakika limiti
+IMAGE_RATE_LIMIT_BURST = int(os.getenv('IMAGE_RATE_LIMIT_BURST', 0)) or None  # boşsa dakikalık limit kadar
+
+# Harici API istemcileri: (sağlayıcı, API anahtarı) başına tek keep-alive bağlantı havuzu
+API_HTTP_MAX_CONNECTIONS = int(os.getenv('API_HTTP_MAX_CONNECTIONS', 20))  # istemci başına açık bağlantı sınırı
+API_HTTP_MAX_KEEPALIVE = int(os.getenv('API_HTTP_MAX_KEEPALIVE', 10))  # boşta tutulan bağlantı sayısı
+API_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('API_HTTP_KEEPALIVE_EXPIRY', 30))  # sn
+API_HTTP_CONNECT_TIMEOUT = float(os.getenv('API_HTTP_CONNECT_TIMEOUT', 10))  # sn
+API_HTTP_READ_TIMEOUT = float(os.getenv('API_HTTP_READ_TIMEOUT', 120))  # sn; HD görsel üretimi uzun sürebilir
+API_CLIENT_REGISTRY_SIZE = int(os.getenv('API_CLIENT_REGISTRY_SIZE', 256))  # aşılınca LRU istemci bırakılır
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')  # boşsa resmi uç nokta (yük testinde sahte sağlayıcı)
+ELEVENLABS_BASE_URL = os.getenv('ELEVENLABS_BASE_URL')
+
+# Ajan katmanında dayanıklılık: 429/5xx/bağlantı hatalarında Retry-After'a uyan jitter'lı yeniden deneme,
+# API anahtarı başına AIMD eşzamanlılık sınırı (429'da yarıya iner, başarıda artar), sağlayıcı başına devre kesici
+AGENT_RETRY_MAX_ATTEMPTS = int(os.getenv('AGENT_RETRY_MAX_ATTEMPTS', 5))  # ilk deneme dahil
+AGENT_RETRY_BASE_DELAY = float(os.getenv('AGENT_RETRY_BASE_DELAY', 0.5))  # sn; her denemede iki katına çıkan aralık
+AGENT_RETRY_MAX_DELAY = float(os.getenv('AGENT_RETRY_MAX_DELAY', 30))  # sn; Retry-After bundan uzunsa beklenmez
+AGENT_CONCURRENCY_INITIAL = int(os.getenv('AGENT_CONCURRENCY_INITIAL', 4))  # anahtar + model başına başlangıç sınırı
+AGENT_CONCURRENCY_MIN = int(os.getenv('AGENT_CONCURRENCY_MIN', 1))
+AGENT_CONCURRENCY_MAX = int(os.getenv('AGENT_CONCURRENCY_MAX', 16))
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5))  # art arda 5xx/bağlantı hatası
+CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv('CIRCUIT_BREAKER_RESET_SECONDS', 30))  # açık kalma süresi
+
+# Ses (TTS): uzun metin parçalara bölünüp eşzamanlı sentezlenir, ses seviyesi eşitlenerek birleştirilir
+TTS_CHUNK_MAX_CHARS = int(os.getenv('TTS_CHUNK_MAX_CHARS', 1500))  # bundan kısa metin tek istekte, akışla yazılır
+TTS_CHUNK_CONCURRENCY = int(os.getenv('TTS_CHUNK_CONCURRENCY', 4))  # aynı anda sentezlenen parça sayısı
+TTS_CHUNK_RETRIES = int(os.getenv('TTS_CHUNK_RETRIES', 1))  # başarısız parçalar için ek deneme turu
+TTS_CHUNK_CONTEXT_CHARS = int(os.getenv('TTS_CHUNK_CONTEXT_CHARS', 300))  # komşu parçadan bağlam olarak giden metin
+
+# Ajan yanıt cache'i (metin, ses, görsel): aynı girdiyle tekrar çalışan adım API'yi yeniden çağırmaz; mevcut çıktıyı yeniden üretmek cache'i atlar
+AGENT_CACHE_ENABLED = os.getenv('AGENT_CACHE_ENABLED', '1') == '1'
+AGENT_CACHE_DIR = os.getenv('AGENT_CACHE_DIR')  # boşsa MEDIA_ROOT/agent_cache
+AGENT_CACHE_MAX_BYTES = int(os.getenv('AGENT_CACHE_MAX_BYTES', 2 * 1024 ** 3))  # aşılınca LRU girdiler silinir
+AGENT_CACHE_TTL_SECONDS = int(os.getenv('AGENT_CACHE_TTL_SECONDS', 7 * 24 * 3600))  # 0 → süresiz
+AGENT_CACHE_DISABLED_AGENTS = [a for a in os.getenv('AGENT_CACHE_DISABLED_AGENTS', '').split(',') if a]  # ör. text_generator
+
 LOGIN_REDIRECT_URL = '/panel/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
 
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clipbox.settings')
 
 application = get_wsgi_application()
+
+# Whisper modelini ilk altyazı isteğinden önce arka planda yükle
+from core.services.whisper_pool import warm_whisper_pool  # noqa: E402
+
+warm_whisper_pool()
@@ -1,13 +1,147 @@
 # agents/base.py
 
+import json
+import inspect
+import functools
+
 from langchain.tools import BaseTool
 from langchain_core.pydantic_v1 import BaseModel
-from typing import Any
+from typing import Any, Optional
+
+from core.services.agent_cache import get_agent_cache, is_bypassed, make_agent_key
+from core.services.instrumentation import span
+from core.services.resilience import ResilientCall
+
+# Cache'lenen giriş noktaları: akış (stream) ve ham sonuç (generate) varsa onlar, yoksa _run
+CACHED_ENTRY_POINTS = ("stream", "generate")
+STREAM_CHUNK_SIZE = 64 * 1024
+# Çıktıyı değiştirmeyen parametreler anahtara girmez
+NON_KEY_PARAMS = ("chunk_size",)
 
 class ToolInput(BaseModel):
     pass
 
+
+def _instrumented(run, agent_name):
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        # Harici API çağrısı süresi adımın span'lerine yazılır
+        with span(f"agent:{getattr(self, 'name', agent_name)}"):
+            return run(self, *args, **kwargs)
+    wrapper._instrumented = True
+    return wrapper
+
+
+def _call_params(method, self, args, kwargs):
+    # Varsayılanlar da anahtara girer: parametreyi açıkça vermek/vermemek aynı girdiyi üretir
+    bound = inspect.signature(method).bind(self, *args, **kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+    for name in ("self",) + NON_KEY_PARAMS:
+        params.pop(name, None)
+    return params
+
+
+def _cached(method, streaming):
+    """
+    Ajan çağrısını AgentCache üzerinden geçirir. Akışlarda chunk'lar hem çağırana verilir hem cache dosyasına
+    yazılır; akış yarıda kalırsa girdi oluşmaz.
+    """
+    def lookup(self, args, kwargs):
+        cache = get_agent_cache(self.name) if self.cache_enabled else None
+        if cache is None:
+            return None, None, None
+        params = _call_params(method, self, args, kwargs)
+        api_key = params.pop("api_key", None)
+        key = make_agent_key(self.name, self.cache_model(params), api_key, params)
+        path = None if is_bypassed() else cache.get(self.name, key, ttl=self.cache_ttl)
+        return cache, key, path
+
+    if streaming:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache, key, path = lookup(self, args, kwargs)
+            if cache is None:
+                yield from method(self, *args, **kwargs)
+                return
+            if path:
+                with span("agent_cache", agent=self.name, result="hit"), open(path, "rb") as f:
+                    yield from iter(lambda: f.read(STREAM_CHUNK_SIZE), b"")
+                return
+            with cache.writer(self.name, key) as f:
+                for chunk in method(self, *args, **kwargs):
+                    f.write(chunk)
+                    yield chunk
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache, key, path = lookup(self, args, kwargs)
+            if cache is None:
+                return method(self, *args, **kwargs)
+            if path:
+                with span("agent_cache", agent=self.name, result="hit"), open(path, "rb") as f:
+                    return self.cache_loads(f.read())
+            result = method(self, *args, **kwargs)
+            cache.write(self.name, key, self.cache_dumps(result))
+            return result
+
+    wrapper._cached = True
+    return wrapper
+
+
+def _resilient(method, streaming):
+    """
+    Sağlayıcı çağrısını ResilientCall üzerinden geçirir: anahtarın AIMD eşzamanlılık sınırı, sağlayıcının
+    devre kesicisi ve 429/5xx/bağlantı hatalarında Retry-After'a uyan jitter'lı yeniden deneme.
+    """
+    def open_call(self, args, kwargs):
+        params = _call_params(method, self, args, kwargs)
+        return ResilientCall(self.api_provider, self.cache_model(params), params.get("api_key"), agent=self.name)
+
+    if streaming:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            yield from open_call(self, args, kwargs).stream(lambda: method(self, *args, **kwargs))
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return open_call(self, args, kwargs).call(lambda: method(self, *args, **kwargs))
+
+    wrapper._resilient = True
+    return wrapper
+
+
 class BaseAgentTool(BaseTool):
+    # Yanıt cache'i (core.services.agent_cache); kapatmak için alt sınıfta cache_enabled = False
+    cache_enabled: bool = True
+    cache_ttl: Optional[int] = None  # saniye; None → AGENT_CACHE_TTL_SECONDS
+    api_model: Optional[str] = None  # cache anahtarına giren model adı
+    api_provider: str = "openai"  # devre kesici ve limiter kapsamı
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        run = cls.__dict__.get("_run")
+        if run is not None and not getattr(run, "_instrumented", False):
+            cls._run = _instrumented(run, cls.__name__)
+
+        agent_classes = [klass for klass in cls.__mro__ if issubclass(klass, BaseAgentTool) and klass is not BaseAgentTool]
+        has_entry_point = any(name in klass.__dict__ for klass in agent_classes for name in CACHED_ENTRY_POINTS)
+        for name in CACHED_ENTRY_POINTS if has_entry_point else ("_run",):
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "_cached", False):
+                # Cache en dışta: isabet limiter slotu almaz, API'ye gitmez
+                streaming = name == "stream"
+                setattr(cls, name, _cached(_resilient(method, streaming), streaming=streaming))
+
+    def cache_model(self, params):
+        return params.get("model_id") or params.get("model") or self.api_model
+
+    def cache_dumps(self, result) -> bytes:
+        return json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+    def cache_loads(self, data: bytes):
+        return json.loads(data.decode("utf-8"))
+
     def _run(self, *args: Any, **kwargs: Any) -> Any:
         raise NotImplementedError("This method must be overridden.")
 
@@ -1,8 +1,12 @@
 # agents/image_content_agent.py
 from .base import BaseAgentTool
-from typing import Type
-import openai
+from typing import Optional, Type
+from dataclasses import dataclass, field
+import io
 import base64
+from core.services.api_clients import get_client_registry
+from django.core.files.base import ContentFile
+from PIL import Image
 from langchain_core.pydantic_v1 import BaseModel, Field
 
 class ImageContentInput(BaseModel):
@@ -13,6 +17,42 @@ class ImageContentInput(BaseModel):
 class ImageContentOutput(BaseModel):
     image_base64: str = Field(..., description="Base64-encoded image content (PNG)")
 
+
+@dataclass
+class GeneratedImage:
+    """
+    Ajanın döndürdüğü ham görsel: baytlar, boyut ve biçim. base64'e çevrilmez; PIL ile yalnızca
+    başlık okunur, tam decode ilk to_pil() çağrısında bir kez yapılır.
+    """
+    data: bytes = field(repr=False)
+    width: int
+    height: int
+    format: str  # PNG, JPEG, WEBP...
+    _image: Optional[Image.Image] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_bytes(cls, data):
+        image = Image.open(io.BytesIO(data))  # lazy: pikseller henüz çözülmez
+        return cls(data=data, width=image.width, height=image.height, format=image.format, _image=image)
+
+    @property
+    def extension(self):
+        return {"JPEG": "jpg"}.get(self.format, (self.format or "png").lower())
+
+    def open(self):
+        """Salt-okunur dosya nesnesi; kopya oluşturmaz."""
+        return io.BytesIO(self.data)
+
+    def to_file(self, stem):
+        return ContentFile(self.data, name=f"{stem}.{self.extension}")
+
+    def to_pil(self):
+        if self._image is None:
+            self._image = Image.open(io.BytesIO(self.data))
+        self._image.load()
+        return self._image
+
+
 class ImageContentAgent(BaseAgentTool):
     name: str = "image_content_generator"
     description: str = (
@@ -21,28 +61,36 @@ class ImageContentAgent(BaseAgentTool):
     )
     args_schema: Type[BaseModel] = ImageContentInput
     return_schema: Type[BaseModel] = ImageContentOutput
+    api_model: str = "dall-e-3"
 
-    def _run(self, api_key: str, prompt: str, size: str = "1024x1024") -> dict:
-        openai.api_key = api_key
-        full_prompt = (
-            "Generate a high-quality, photorealistic image based on the following topic and criteria. "
-            "Avoid any text, letters, numbers, watermarks, captions, or signs in the image. "
-            "Do not include any visible handwriting, symbols, logos, brand names, or UI elements. "
-            "The image should be clean, focused, and without any embedded or overlay text. "
-            "Make sure the scene is visually clear and expressive, but completely text-free.\n\n"
-            f"Topic and criteria:\n{prompt.strip()}"
-        )
+    def generate(self, api_key: str, prompt: str, size: str = "1024x1024", variant: int = 0) -> GeneratedImage:
+        """
+        Görseli üretir ve ham baytlarıyla döner; base64 yanıt bir kez çözülür, ayrı bir indirme isteği yapılmaz.
+        variant API'ye gitmez, yalnızca cache anahtarına girer: aynı prompt'lu her slot ayrı görsel alır.
+        """
         try:
-            response = openai.images.generate(
-                model="dall-e-3",
+            response = get_client_registry().openai(api_key).images.generate(
+                model=self.api_model,
                 quality='hd',
                 prompt=prompt,
                 n=1,
                 size=size,
                 response_format="b64_json"
             )
-            image_base64 = response.data[0].b64_json
-            return ImageContentOutput(image_base64=image_base64).dict()
+            data = base64.b64decode(response.data[0].b64_json)
+            return GeneratedImage.from_bytes(data)
 
         except Exception as e:
-            raise RuntimeError(f"Image generation failed: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Image generation failed: {str(e)}") from e
+
+    def cache_dumps(self, result: GeneratedImage) -> bytes:
+        return result.data
+
+    def cache_loads(self, data: bytes) -> GeneratedImage:
+        return GeneratedImage.from_bytes(data)
+
+    def _run(self, api_key: str, prompt: str, size: str = "1024x1024") -> dict:
+        # Tool arayüzü için base64 çıktı; üretim akışı generate() kullanır
+        image = self.generate(api_key=api_key, prompt=prompt, size=size)
+        image_base64 = base64.b64encode(image.data).decode("utf-8")
+        return ImageContentOutput(image_base64=image_base64).dict()
@@ -1,5 +1,5 @@
 # agents/text_agent.py
-from langchain_openai import ChatOpenAI
+from core.services.api_clients import get_client_registry
 from .base import BaseAgentTool
 from langchain_core.pydantic_v1 import BaseModel, Field
 from typing import Type
@@ -31,6 +31,7 @@ class TextAgent(BaseAgentTool):
     )
     args_schema: Type[BaseModel] = TextAgentInput
     return_schema: Type[BaseModel] = TextAgentOutput
+    api_model: str = "gpt-4o-mini"
 
     def _run(self, api_key: str, topic_title: str, prompt_context: str, language: str, duration_minutes: int = 1) -> dict:
         prompt = (
@@ -57,7 +58,7 @@ class TextAgent(BaseAgentTool):
             "thumbnail_prompt (string), content_prompt (string)"
         )
 
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.8, api_key=api_key)
+        llm = get_client_registry().chat_openai(api_key, model=self.api_model, temperature=0.8)
         raw_response = llm.invoke(prompt).content
 
         # Remove code block if it accidentally adds it
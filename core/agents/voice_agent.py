@@ -1,8 +1,8 @@
 from langchain_core.pydantic_v1 import BaseModel, Field
 from .base import BaseAgentTool
-from typing import Type
+from typing import Iterator, Optional, Type
 import base64
-from elevenlabs.client import ElevenLabs
+from core.services.api_clients import get_client_registry
 
 class VoiceAgentInput(BaseModel):
     api_key: str = Field(..., description="ElevenLabs API key to access text-to-speech service")
@@ -21,22 +21,39 @@ class VoiceAgent(BaseAgentTool):
     )
     args_schema: Type[BaseModel] = VoiceAgentInput
     return_schema: Type[BaseModel] = VoiceAgentOutput
+    api_provider: str = "elevenlabs"
+
+    def stream(self, api_key: str, text: str, voice_id: str = "2EiwWnXFnvU5JabPnv8n", model_id: str = "eleven_multilingual_v2",
+               previous_text: Optional[str] = None, next_text: Optional[str] = None) -> Iterator[bytes]:
+        """
+        MP3 chunk'larını geldikleri gibi verir; çağıran doğrudan depoya yazar (bellekte tam ses tutulmaz).
+        Uzun metin parçalara bölündüyse previous_text/next_text komşu parçalarla tonlamayı sürekli tutar.
+        """
+        context = {}
+        if previous_text:
+            context["previous_text"] = previous_text
+        if next_text:
+            context["next_text"] = next_text
 
-    def _run(self, api_key: str, text: str, voice_id: str = "2EiwWnXFnvU5JabPnv8n", model_id: str = "eleven_multilingual_v2") -> dict:
         try:
-            client = ElevenLabs(api_key=api_key)
+            # Anahtar başına tek, bağlantı havuzlu istemci (her çağrıda yeni TLS el sıkışması yok)
+            client = get_client_registry().elevenlabs(api_key)
 
-            audio_stream = client.text_to_speech.convert(
+            yield from client.text_to_speech.stream(
                 text=text,
                 voice_id=voice_id,
                 model_id=model_id,
                 output_format="mp3_44100_128",
+                # Yeniden deneme ajan katmanında (core.services.resilience); SDK'nınki 429'u gizler
+                request_options={"max_retries": 0},
+                **context,
             )
 
-            audio_bytes = b"".join(audio_stream)  # <-- 🛠️ burada generator'ı bytes'a çeviriyoruz
-            audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
-
-            return VoiceAgentOutput(audio_base64=audio_base64).dict()
-
         except Exception as e:
-            raise RuntimeError(f"Voice generation failed: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Voice generation failed: {str(e)}") from e
+
+    def _run(self, api_key: str, text: str, voice_id: str = "2EiwWnXFnvU5JabPnv8n", model_id: str = "eleven_multilingual_v2") -> dict:
+        # Tool arayüzü için base64 çıktı; üretim akışı stream() kullanır
+        audio_bytes = b"".join(self.stream(api_key=api_key, text=text, voice_id=voice_id, model_id=model_id))
+        audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
+        return VoiceAgentOutput(audio_base64=audio_base64).dict()
\ No newline at end of file
@@ -2,9 +2,9 @@
 
 from langchain_core.pydantic_v1 import BaseModel
 from .base import BaseAgentTool
-from typing import Type
+from typing import Iterator, Type
 import base64
-import openai
+from core.services.api_clients import get_client_registry
 from langchain_core.pydantic_v1 import BaseModel, Field
 
 class VoiceAgentInput(BaseModel):
@@ -23,20 +23,25 @@ class VoiceAgent(BaseAgentTool):
     )
     args_schema: Type[BaseModel] = VoiceAgentInput
     return_schema: Type[BaseModel] = VoiceAgentOutput
+    api_model: str = "gpt-4o-mini-tts"
 
-    def _run(self, api_key: str, text: str, voice: str = "alloy") -> dict:
-        openai.api_key = api_key
-
+    def stream(self, api_key: str, text: str, voice: str = "alloy", chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """MP3 chunk'larını HTTP yanıtından okundukça verir; yanıt gövdesi bellekte birikmez."""
         try:
-            response = openai.audio.speech.create(
-                model="gpt-4o-mini-tts",
+            client = get_client_registry().openai(api_key)
+            with client.audio.speech.with_streaming_response.create(
+                model=self.api_model,
                 input=text,
                 voice=voice,
                 response_format="mp3"
-            )
-
-            audio_base64 = base64.b64encode(response.content).decode("utf-8")
-            return VoiceAgentOutput(audio_base64=audio_base64).dict()
+            ) as response:
+                yield from response.iter_bytes(chunk_size)
 
         except Exception as e:
-            raise RuntimeError(f"Voice generation failed: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Voice generation failed: {str(e)}") from e
+
+    def _run(self, api_key: str, text: str, voice: str = "alloy") -> dict:
+        # Tool arayüzü için base64 çıktı; üretim akışı stream() kullanır
+        audio_bytes = b"".join(self.stream(api_key=api_key, text=text, voice=voice))
+        audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
+        return VoiceAgentOutput(audio_base64=audio_base64).dict()
\ No newline at end of file
@@ -0,0 +1,284 @@
+# core/benchmarks/fake_provider.py
+
+import io
+import json
+import math
+import time
+import base64
+import random
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import ffmpeg
+import numpy as np
+from PIL import Image
+
+from core.services.ffmpeg_composer import get_ffmpeg_binary
+from core.services.rate_limit import TokenBucket
+
+# Sahte TTS konuşma hızı (kelime/sn); metin ajanı da aynı hızla metin yazar
+WORDS_PER_SECOND = 2.5
+
+VOCABULARY = (
+    "uzay", "zaman", "ışık", "yıldız", "evren", "gizem", "bilim", "dünya", "keşif", "enerji",
+    "okyanus", "derin", "sessiz", "parlak", "hızlı", "eski", "yeni", "büyük", "küçük", "sonsuz",
+)
+
+
+def _seed(*parts):
+    return int.from_bytes(hashlib.sha256("|".join(map(str, parts)).encode("utf-8")).digest()[:8], "big")
+
+
+def fake_script(seed, seconds):
+    """Süreye uygun uzunlukta, noktalamalı ve deterministik metin."""
+    rng = random.Random(seed)
+    words, sentence = [], []
+    for _ in range(max(3, int(seconds * WORDS_PER_SECOND))):
+        sentence.append(rng.choice(VOCABULARY))
+        if len(sentence) >= rng.randint(6, 12):
+            words.append(" ".join(sentence).capitalize() + rng.choice([".", ".", "!", "?"]))
+            sentence = []
+    if sentence:
+        words.append(" ".join(sentence).capitalize() + ".")
+    return " ".join(words)
+
+
+def _one_second_mp3():
+    """Ardı ardına eklenebilen ~1 sn'lik CBR MP3 (ID3/Xing başlığı yok)."""
+    data, _ = (
+        ffmpeg
+        .input("sine=frequency=220:duration=1", format="lavfi")
+        .output("pipe:", format="mp3", acodec="libmp3lame", audio_bitrate="128k", ar=44100, ac=1,
+                write_xing=0, id3v2_version=0)
+        .global_args("-nostdin")
+        .run(cmd=get_ffmpeg_binary(), capture_stdout=True, capture_stderr=True)
+    )
+    return data
+
+
+class FakeProviderServer:
+    """
+    OpenAI (chat, images, audio/speech) ve ElevenLabs (text-to-speech stream) uç noktalarının yerel taklidi.
+    Yanıtlar istek içeriğinden deterministik üretilir; gecikme, hata oranı ve 429 davranışı ayarlanabilir.
+    Kredi harcamadan ve ağ olmadan yük testi/benchmark için.
+
+        with FakeProviderServer(latency=0.2) as provider:
+            settings.OPENAI_BASE_URL = provider.openai_base_url
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, jitter=0.25, error_rate=0.0,
+                 throttle_rate=0.0, rate_limit_per_minute=0, retry_after=1, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.retry_after = retry_after
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._images = {}
+        self._requests = Counter()
+        self._scheduled = {}
+        self._mp3_second = _one_second_mp3()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # --- Yaşam döngüsü ---
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self):
+        return f"{self.url}/v1"
+
+    @property
+    def elevenlabs_base_url(self):
+        return self.url
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-provider", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Davranış ---
+
+    def _random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def _delay(self, scale=1.0):
+        if self.latency > 0:
+            time.sleep(self.latency * scale * (1 + self.jitter * (2 * self._random() - 1)))
+
+    def fail_request(self, name, nth=1, status=429, retry_after=None):
+        """`name` uç noktasına (images, chat...) bundan sonra gelen nth. isteği status ile düşürür."""
+        with self._lock:
+            key = (name, self._requests[name] + nth)
+            self._scheduled[key] = (status, {"Retry-After": str(retry_after)} if retry_after else {})
+
+    def _scheduled_fault(self, name):
+        with self._lock:
+            self._requests[name] += 1
+            return self._scheduled.pop((name, self._requests[name]), None)
+
+    def _fault(self, api_key):
+        """(durum kodu, başlıklar) veya None. Önce anahtar başına dakika limiti, sonra rastgele 429/500."""
+        if self.rate_limit_per_minute:
+            with self._lock:
+                bucket = self._buckets.setdefault(api_key, TokenBucket(self.rate_limit_per_minute, None))
+            wait = bucket.try_acquire()
+            if wait > 0:
+                return 429, {"Retry-After": str(max(1, math.ceil(wait)))}
+        if self.throttle_rate and self._random() < self.throttle_rate:
+            return 429, {"Retry-After": str(self.retry_after)}
+        if self.error_rate and self._random() < self.error_rate:
+            return 500, {}
+        return None
+
+    def image_png(self, seed, width, height):
+        # PNG sıkıştırması sahte sunucuyu yavaşlatmasın: boyut + 4 renk başına bir kez üretilir
+        key = (width, height, seed % 4)
+        with self._lock:
+            data = self._images.get(key)
+        if data is None:
+            tint = np.array([(seed >> shift) & 0xFF for shift in (0, 8, 16)], dtype=np.float32)
+            gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+            pixels = np.clip(gradient * 0.5 + tint * 0.5, 0, 255).astype(np.uint8)
+            pixels = np.broadcast_to(pixels, (height, width, 3))
+            buffer = io.BytesIO()
+            Image.fromarray(np.ascontiguousarray(pixels)).save(buffer, format="PNG", compress_level=1)
+            data = buffer.getvalue()
+            with self._lock:
+                self._images[key] = data
+        return data
+
+    def speech_mp3(self, text):
+        seconds = max(1, round(len(text.split()) / WORDS_PER_SECOND))
+        return self._mp3_second * seconds
+
+    def _handler_class(server):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type="application/json", headers=None):
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _api_key(self):
+                auth = self.headers.get("Authorization", "")
+                return self.headers.get("xi-api-key") or auth.removeprefix("Bearer ").strip()
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                parts = path.strip("/").split("/")
+                # /files/<seed>/<W>x<H>.png — images.generate'in döndürdüğü URL
+                if len(parts) == 3 and parts[0] == "files":
+                    width, height = map(int, parts[2].removesuffix(".png").split("x"))
+                    server.stats["GET /files"] += 1
+                    return self._send(200, server.image_png(int(parts[1]), width, height), "image/png")
+                self._send(404, {"error": {"message": f"Unknown path {path}"}})
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                body = self._json_body()
+                route = self._route(path)
+                if route is None:
+                    return self._send(404, {"error": {"message": f"Unknown path {path}"}})
+                name, handler, scale = route
+
+                fault = server._scheduled_fault(name) or server._fault(self._api_key())
+                server._delay(scale if fault is None else 0.1)
+                if fault:
+                    status, headers = fault
+                    server.stats[f"{name} {status}"] += 1
+                    message = "Rate limit reached" if status == 429 else "Upstream error"
+                    return self._send(status, {"error": {"message": message, "type": "fake_provider"}}, headers=headers)
+
+                server.stats[f"{name} 200"] += 1
+                handler(body, path)
+
+            def _route(self, path):
+                if path.endswith("/chat/completions"):
+                    return "chat", self._chat, 1.0
+                if path.endswith("/images/generations"):
+                    return "images", self._images, 2.0
+                if path.endswith("/audio/speech"):
+                    return "speech", self._speech, 1.0
+                if path.startswith("/v1/text-to-speech/"):
+                    return "elevenlabs", self._elevenlabs, 1.0
+                return None
+
+            def _chat(self, body, path):
+                prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+                seed = _seed(prompt)
+                duration = 60
+                for line in prompt.splitlines():
+                    if line.strip().startswith("- Duration:"):
+                        digits = "".join(ch for ch in line if ch.isdigit())
+                        duration = int(digits or 1) * 60
+                content = {
+                    "title": f"Sahte video {seed % 1000}",
+                    "script": fake_script(seed, duration - 5),
+                    "hashtags": ["#uzay", "#bilim", f"#v{seed % 100}"],
+                    "description": "Yük testi için deterministik açıklama.",
+                    "thumbnail_prompt": "abstract vibrant background",
+                    "content_prompt": "deep space, nebula, stars",
+                }
+                self._send(200, {
+                    "id": f"chatcmpl-{seed % 10 ** 8}",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(content)}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 400, "total_tokens": len(prompt.split()) + 400},
+                })
+
+            def _images(self, body, path):
+                width, height = map(int, body.get("size", "1024x1024").split("x"))
+                seed = _seed(body.get("prompt", ""), body.get("size"))
+                if body.get("response_format") == "b64_json":
+                    item = {"b64_json": base64.b64encode(server.image_png(seed, width, height)).decode("ascii")}
+                else:
+                    item = {"url": f"{server.url}/files/{seed}/{width}x{height}.png"}
+                self._send(200, {"created": 0, "data": [item]})
+
+            def _speech(self, body, path):
+                self._send(200, server.speech_mp3(body.get("input", "")), "audio/mpeg")
+
+            def _elevenlabs(self, body, path):
+                self._send(200, server.speech_mp3(body.get("text", "")), "audio/mpeg")
+
+        return Handler
@@ -0,0 +1,59 @@
+# core/benchmarks/inputs.py
+
+import os
+
+import ffmpeg
+import numpy as np
+from PIL import Image
+
+from core.benchmarks.subtitles import synthetic_subtitles
+from core.services.ffmpeg_composer import get_ffmpeg_binary
+
+
+def _srt_timestamp(seconds):
+    ms = int(round(seconds * 1000))
+    hrs, ms = divmod(ms, 3600000)
+    mins, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hrs:02}:{mins:02}:{secs:02},{ms:03}"
+
+
+def synthetic_images(work_dir, count, size=(1024, 1792), seed=0):
+    """Sabit tohumlu gürültü + gradyan PNG'ler; her çalıştırmada aynı baytlar üretilir."""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    paths = []
+    for i in range(count):
+        tint = rng.integers(0, 255, size=3).astype(np.float32)
+        noise = rng.integers(0, 64, size=(height, width, 3)).astype(np.float32)
+        pixels = np.clip(gradient * 0.5 + tint * 0.5 + noise, 0, 255).astype(np.uint8)
+        path = os.path.join(work_dir, f"image_{i:03d}.png")
+        Image.fromarray(pixels).save(path)
+        paths.append(path)
+    return paths
+
+
+def synthetic_audio(work_dir, duration, frequency=440):
+    """ffmpeg'in sine kaynağından MP3 (TTS çıktısının yerine)."""
+    path = os.path.join(work_dir, f"voice_{duration:g}s.mp3")
+    (
+        ffmpeg
+        .input(f"sine=frequency={frequency}:duration={duration}", format="lavfi")
+        .output(path, acodec="libmp3lame", audio_bitrate="128k")
+        .overwrite_output()
+        .run(cmd=get_ffmpeg_binary(), capture_stdout=True, capture_stderr=True)
+    )
+    return path
+
+
+def synthetic_srt(work_dir, cue_count, duration):
+    """Süreye eşit yayılmış cue_count adet cue içeren SRT dosyası."""
+    cue_duration = duration / cue_count
+    path = os.path.join(work_dir, f"subs_{cue_count}_{duration:g}s.srt")
+    blocks = []
+    for i, ((start, end), text) in enumerate(synthetic_subtitles(cue_count, cue_duration), start=1):
+        blocks.append(f"{i}\n{_srt_timestamp(start)} --> {_srt_timestamp(end)}\n{text}\n")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(blocks))
+    return path
@@ -0,0 +1,252 @@
+# core/benchmarks/load_test.py
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from accounts.models import UserAPIKeys
+from core.benchmarks.fake_provider import FakeProviderServer
+from core.benchmarks.metrics import measure
+from core.benchmarks.suite import _environment
+from core.services.api_clients import get_client_registry
+from core.services.resilience import resilience_stats
+from panels.models import Panel, PlatformChoices
+from videos.models import GenerationJob, JobStateChoices, Video
+
+# subtitle (Whisper modeli indirir) ve render adımları sağlayıcı çağırmaz; varsayılan akış dışında
+DEFAULT_STEPS = ("text", "voice", "content_images", "thumbnail_image")
+
+TERMINAL_STATES = (JobStateChoices.SUCCEEDED, JobStateChoices.FAILED, JobStateChoices.CANCELLED)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))], 4)
+
+    return {
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 4),
+        "mean": round(sum(ordered) / len(ordered), 4),
+    }
+
+
+def create_load_users(users, videos_per_user, duration_minutes=1, prefix="loadtest"):
+    """Kullanıcı başına ayrı sahte API anahtarları, bir panel ve videolar; [(user, [video, ...]), ...]."""
+    created = []
+    for idx in range(users):
+        user = User.objects.create_user(username=f"{prefix}-{idx:04d}", password=None)
+        UserAPIKeys.objects.create(
+            user=user,
+            openai_api_key=f"sk-{prefix}-openai-{idx:04d}",
+            tts_api_key=f"{prefix}-tts-{idx:04d}",
+            dalle_api_key=f"sk-{prefix}-dalle-{idx:04d}",
+        )
+        panel = Panel.objects.create(user=user, name=f"Yük testi {idx}", platform=PlatformChoices.YOUTUBE_SHORTS, language="tr")
+        videos = [
+            Video.objects.create(
+                panel=panel,
+                title=f"Yük testi videosu {idx}-{n}",
+                description="Sahte sağlayıcıya karşı uçtan uca yük testi.",
+                duration_minutes=duration_minutes,
+            )
+            for n in range(videos_per_user)
+        ]
+        created.append((user, videos))
+    return created
+
+
+def run_step_request(client, video, step, poll_interval=0.1, timeout=600):
+    """
+    Adımı HTTP üzerinden başlatır ve iş bitene kadar durum endpoint'ini yoklar.
+    {'state', 'error', 'latency_seconds', 'queued_seconds', 'run_seconds', 'job_id'} döner.
+    """
+    started = time.perf_counter()
+    response = client.post(f"/videos/{video.id}/generate/{step}/")
+    payload = response.json()
+    if response.status_code >= 400 or "job_id" not in payload:
+        return {"state": JobStateChoices.FAILED, "error": payload.get("error") or f"HTTP {response.status_code}",
+                "latency_seconds": time.perf_counter() - started}
+
+    deadline = started + timeout
+    while payload["state"] not in TERMINAL_STATES:
+        if time.perf_counter() > deadline:
+            payload = dict(payload, state="TIMEOUT", error=f"No result after {timeout}s")
+            break
+        time.sleep(poll_interval)
+        payload = client.get(f"/videos/jobs/{payload['job_id']}/").json()
+
+    return {
+        "job_id": payload["job_id"],
+        "state": payload["state"],
+        "error": payload.get("error"),
+        "latency_seconds": time.perf_counter() - started,
+        "queued_seconds": payload.get("queued_seconds"),
+        "run_seconds": payload.get("run_seconds"),
+    }
+
+
+def _span_totals(job_ids):
+    """StepRun span'lerinden ad başına iş başına ortalama süre (agent:*, slot_wait, file_save...)."""
+    totals = Counter()
+    runs = 0
+    for job in GenerationJob.objects.filter(id__in=job_ids).select_related("step_run"):
+        if job.step_run is None:
+            continue
+        runs += 1
+        for item in job.step_run.spans:
+            totals[item["name"]] += item.get("duration") or 0
+    return {name: round(total / runs, 4) for name, total in sorted(totals.items())} if runs else {}
+
+
+def _run_phase(sessions, step, poll_interval, job_timeout):
+    """Bir adımı tüm kullanıcılar için eşzamanlı çalıştırır; her kullanıcı kendi videolarını sırayla işler."""
+    results = []
+    lock = threading.Lock()
+
+    def drive(client, videos):
+        try:
+            for video in videos:
+                started = time.perf_counter()
+                try:
+                    outcome = run_step_request(client, video, step, poll_interval, job_timeout)
+                except Exception as e:
+                    outcome = {"state": JobStateChoices.FAILED, "error": f"{type(e).__name__}: {e}",
+                               "latency_seconds": time.perf_counter() - started}
+                outcome["video_id"] = video.id
+                with lock:
+                    results.append(outcome)
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=drive, args=(client, videos), name=f"load-user-{idx}", daemon=True)
+        for idx, (client, videos) in enumerate(sessions)
+    ]
+    with measure() as usage:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return results, usage
+
+
+def _phase_report(step, results, usage):
+    succeeded = [r for r in results if r["state"] == JobStateChoices.SUCCEEDED]
+    errors = Counter((r.get("error") or r["state"])[:120] for r in results if r["state"] != JobStateChoices.SUCCEEDED)
+    wall = usage["wall_seconds"]
+    return {
+        "step": step,
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "throughput_per_second": round(len(succeeded) / wall, 3) if wall else None,
+        "latency_seconds": percentiles([r["latency_seconds"] for r in results]),
+        "queued_seconds": percentiles([r["queued_seconds"] for r in results if r.get("queued_seconds") is not None]),
+        "run_seconds": percentiles([r["run_seconds"] for r in results if r.get("run_seconds") is not None]),
+        "span_seconds": _span_totals([r["job_id"] for r in results if r.get("job_id")]),
+        "errors": dict(errors.most_common(10)),
+        "resources": usage,
+    }
+
+
+def run_load_test(users=4, videos_per_user=2, steps=DEFAULT_STEPS, duration_minutes=1, latency=0.2, jitter=0.25,
+                  error_rate=0.0, throttle_rate=0.0, rate_limit_per_minute=0, retry_after=1, job_workers=None,
+                  poll_interval=0.1, job_timeout=600, seed=0, agent_cache=False, extra_settings=None):
+    """
+    Sahte sağlayıcıyı başlatır ve `users` eşzamanlı kullanıcıyı /videos/<id>/generate/<step>/ üzerinden
+    adım adım sürer: her adım tüm kullanıcılar için bir faz olarak ölçülür (gecikme yüzdelikleri, iş hacmi,
+    CPU/RSS, span dağılımı). Önceki adımı başarısız olan video sonraki adımlara girmez.
+    agent_cache=True ajan cache'ini üretimdeki gibi açık bırakır (geçici dizinde); cache davranışı da sınanır.
+    Mevcut veritabanına yazar; komut bunu geçici bir test veritabanında çalıştırır.
+    """
+    media_root = tempfile.mkdtemp(prefix="loadtest-media-")
+    provider = FakeProviderServer(
+        latency=latency, jitter=jitter, error_rate=error_rate, throttle_rate=throttle_rate,
+        rate_limit_per_minute=rate_limit_per_minute, retry_after=retry_after, seed=seed,
+    )
+    overrides = {
+        "OPENAI_BASE_URL": provider.openai_base_url,
+        "ELEVENLABS_BASE_URL": provider.elevenlabs_base_url,
+        "MEDIA_ROOT": media_root,
+        "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+        # Varsayılan: her istek sağlayıcıya gitsin; cache isabetleri ölçümü bozar
+        "AGENT_CACHE_ENABLED": agent_cache,
+        "AGENT_CACHE_DIR": os.path.join(media_root, "agent_cache"),
+        **(extra_settings or {}),
+    }
+    if job_workers is not None:
+        overrides["GENERATION_JOB_WORKERS"] = job_workers
+
+    registry = get_client_registry()
+    try:
+        with provider, override_settings(**overrides):
+            # Önceki base_url ile kurulmuş istemciler kullanılmasın
+            registry.close()
+            accounts = create_load_users(users, videos_per_user, duration_minutes)
+            sessions = []
+            for user, videos in accounts:
+                client = Client()
+                client.force_login(user)
+                sessions.append((client, videos))
+
+            phases = []
+            with measure() as overall:
+                for step in steps:
+                    results, usage = _run_phase(sessions, step, poll_interval, job_timeout)
+                    phases.append(_phase_report(step, results, usage))
+                    failed = {r["video_id"] for r in results if r["state"] != JobStateChoices.SUCCEEDED}
+                    sessions = [(client, [v for v in videos if v.id not in failed]) for client, videos in sessions]
+
+            completed = sum(len(videos) for _, videos in sessions)
+            provider_stats = dict(sorted(provider.stats.items()))
+            client_stats = registry.stats()
+            retry_stats = resilience_stats()
+    finally:
+        registry.close()
+        close_old_connections()
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    wall = overall["wall_seconds"]
+    return {
+        "environment": _environment(),
+        "config": {
+            "users": users,
+            "videos_per_user": videos_per_user,
+            "steps": list(steps),
+            "duration_minutes": duration_minutes,
+            "latency": latency,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "throttle_rate": throttle_rate,
+            "rate_limit_per_minute": rate_limit_per_minute,
+            "job_workers": job_workers,
+            "agent_cache": agent_cache,
+        },
+        "summary": {
+            "videos": users * videos_per_user,
+            "videos_completed": completed,
+            "videos_per_minute": round(completed / wall * 60, 3) if wall else None,
+            "steps_succeeded": sum(phase["succeeded"] for phase in phases),
+            "steps_failed": sum(phase["failed"] for phase in phases),
+            "resources": overall,
+        },
+        "steps": phases,
+        "provider": provider_stats,
+        "clients": client_stats,
+        "resilience": retry_stats,
+    }
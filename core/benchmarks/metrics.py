@@ -0,0 +1,68 @@
+# core/benchmarks/metrics.py
+
+import os
+import time
+import resource
+import threading
+from contextlib import contextmanager
+
+from core.services.frame_stream import current_rss_mb
+
+
+class RssSampler(threading.Thread):
+    """Ölçüm süresince sürecin RSS'ini periyodik okur; ru_maxrss sıfırlanamadığı için."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval = interval
+        self.peak = current_rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, current_rss_mb())
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    # ffmpeg alt süreçleri ve segment worker'ları da sayılsın
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+@contextmanager
+def measure(frames=None):
+    """
+    with measure(frames=...) as result: bloğunun duvar süresi, CPU kullanımı ve tepe RSS'ini
+    result sözlüğüne yazar. frames verilirse kare/saniye de hesaplanır.
+    """
+    result = {}
+    sampler = RssSampler()
+    sampler.start()
+    cpu_started = _cpu_seconds()
+    started = time.perf_counter()
+    try:
+        yield result
+    finally:
+        wall = time.perf_counter() - started
+        cpu = _cpu_seconds() - cpu_started
+        sampler.stop()
+        # Bitmiş alt süreçlerin tepe RSS'i (KB); sadece en büyüğü bilinebiliyor
+        children_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        result.update({
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            # 1.0 = tek çekirdek tam dolu; çekirdek sayısına bölünmüş hali de verilir
+            "cpu_utilisation": round(cpu / wall, 3) if wall else None,
+            "cpu_utilisation_per_core": round(cpu / wall / (os.cpu_count() or 1), 3) if wall else None,
+            "peak_rss_mb": round(sampler.peak, 1),
+            "children_peak_rss_mb": round(children_peak, 1),
+        })
+        if frames is not None:
+            result["frames"] = frames
+            result["frames_per_second"] = round(frames / wall, 2) if wall else None
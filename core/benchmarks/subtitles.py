@@ -0,0 +1,76 @@
+# core/benchmarks/subtitles.py
+
+import time
+import tracemalloc
+
+from moviepy import CompositeVideoClip
+
+from core.services.video_composer import animated_textclip
+from core.services.subtitle_renderer import build_subtitle_clip
+
+SAMPLE_SENTENCES = [
+    "Did you know octopuses have three hearts?",
+    "Bu bilgi çoğu insanı şaşırtıyor.",
+    "Two of them pump blood to the gills, one to the rest of the body.",
+    "Ve kanları mavidir!",
+]
+
+
+def synthetic_subtitles(cue_count, cue_duration=2.5):
+    """Benchmark için sahte altyazı listesi (parse_srt formatında)."""
+    subtitles = []
+    for i in range(cue_count):
+        start = i * cue_duration
+        text = SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)]
+        subtitles.append(((start, start + cue_duration), text))
+    return subtitles
+
+
+def _legacy_layer(subtitles, resolution, font_path):
+    clips = [animated_textclip(text, start, end, resolution, font_path) for (start, end), text in subtitles]
+    return CompositeVideoClip(clips, size=resolution)
+
+
+def _atlas_layer(subtitles, resolution, font_path):
+    return build_subtitle_clip(subtitles, resolution, font_path)
+
+
+def _measure(build, subtitles, resolution, font_path, fps, render_seconds):
+    tracemalloc.start()
+    started = time.perf_counter()
+    layer = build(subtitles, resolution, font_path)
+    setup_time = time.perf_counter() - started
+
+    frames = int(min(layer.duration, render_seconds) * fps)
+    started = time.perf_counter()
+    for i in range(frames):
+        t = i / fps
+        layer.get_frame(t)
+        if layer.mask is not None:
+            layer.mask.get_frame(t)
+    render_time = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "setup_seconds": round(setup_time, 4),
+        "frames": frames,
+        "render_seconds": round(render_time, 4),
+        "frames_per_second": round(frames / render_time, 2) if render_time else None,
+        "peak_traced_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def run_subtitle_benchmark(font_path, cue_count=20, resolution=(1080, 1920), fps=24, render_seconds=10.0):
+    """
+    Eski animated_textclip yolu ile glyph-atlas renderer'ını aynı girdilerle karşılaştırır.
+    """
+    subtitles = synthetic_subtitles(cue_count)
+    return {
+        "cue_count": cue_count,
+        "characters": sum(len(text) for _, text in subtitles),
+        "resolution": list(resolution),
+        "fps": fps,
+        "textclip": _measure(_legacy_layer, subtitles, resolution, font_path, fps, render_seconds),
+        "atlas": _measure(_atlas_layer, subtitles, resolution, font_path, fps, render_seconds),
+    }
@@ -0,0 +1,162 @@
+# core/benchmarks/suite.py
+
+import os
+import sys
+import shutil
+import platform
+import tempfile
+import contextlib
+from datetime import datetime, timezone
+
+import django
+
+from core.benchmarks.inputs import synthetic_audio, synthetic_images, synthetic_srt
+from core.benchmarks.metrics import measure
+from core.benchmarks.subtitles import synthetic_subtitles
+from core.services.ffmpeg_composer import probe_duration
+from core.services.thumbnail import render_thumbnail
+from core.services.video_composer import animated_textclip, compose_video, parse_srt, subtitle_font_path
+
+DEFAULT_DURATIONS = (10.0, 30.0)
+DEFAULT_RESOLUTIONS = ((1080, 1920), (1280, 720))
+DEFAULT_BACKENDS = ("moviepy", "ffmpeg", "streaming")
+
+
+def _environment():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def bench_parse_srt(srt_path, repeat=50):
+    with open(srt_path, "r", encoding="utf-8-sig") as f:
+        srt_text = f.read()
+    with measure() as result:
+        for _ in range(repeat):
+            cues = parse_srt(srt_text)
+    result.update({"repeat": repeat, "cues": len(cues)})
+    return result
+
+
+def bench_animated_textclip(resolution, font_path, cue_count=5, fps=24):
+    """Cue başına TextClip kurulumu + tüm karelerin üretimi (eski altyazı yolunun maliyeti)."""
+    subtitles = synthetic_subtitles(cue_count)
+    frames = sum(int((end - start) * fps) for (start, end), _ in subtitles)
+    with measure(frames=frames) as result:
+        for (start, end), text in subtitles:
+            clip = animated_textclip(text, start, end, resolution, font_path)
+            for i in range(int((end - start) * fps)):
+                clip.get_frame(start + i / fps)
+    result["cues"] = cue_count
+    return result
+
+
+def bench_thumbnail(image_path, title="Did you know octopuses have three hearts?", repeat=5):
+    with open(image_path, "rb") as f:
+        image_data = f.read()
+    with measure() as result:
+        for _ in range(repeat):
+            render_thumbnail(image_data, title)
+    result["repeat"] = repeat
+    return result
+
+
+def bench_compose_video(images, audio_path, srt_path, resolution, backend, work_dir, fps=24, draft=False, workers=1):
+    output_path = os.path.join(work_dir, f"out_{backend}_{resolution[0]}x{resolution[1]}.mp4")
+    frames = int(round(probe_duration(audio_path) * fps))
+    # compose_video'nun emoji'li ilerleme çıktısı JSON'a karışmasın
+    with contextlib.redirect_stdout(sys.stderr):
+        with measure(frames=frames) as result:
+            produced = compose_video(
+                images,
+                audio_path,
+                output_path=output_path,
+                resolution=resolution,
+                srt_path=srt_path,
+                backend=backend,
+                workers=workers,
+                use_cache=False,
+                fps=fps,
+                draft=draft,
+            )
+    result["success"] = bool(produced)
+    if produced:
+        result["output_bytes"] = os.path.getsize(produced)
+        os.remove(produced)
+    return result
+
+
+def run_benchmark_suite(
+    durations=DEFAULT_DURATIONS,
+    resolutions=DEFAULT_RESOLUTIONS,
+    backends=DEFAULT_BACKENDS,
+    image_count=5,
+    cues_per_minute=20,
+    fps=24,
+    workers=1,
+    draft=False,
+    font_path=None,
+    work_dir=None,
+):
+    """
+    Sentetik girdilerle (gürültü PNG'ler, sine MP3, SRT) üretim hattının ağır adımlarını ölçer.
+    Her süre × çözünürlük × backend kombinasyonu ayrı bir compose_video vakasıdır.
+    """
+    font_path = font_path or subtitle_font_path()
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="clipbox_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    report = {
+        "environment": _environment(),
+        "parameters": {
+            "durations": list(durations),
+            "resolutions": [list(r) for r in resolutions],
+            "backends": list(backends),
+            "image_count": image_count,
+            "cues_per_minute": cues_per_minute,
+            "fps": fps,
+            "workers": workers,
+            "draft": draft,
+        },
+        "cases": [],
+    }
+
+    try:
+        images = synthetic_images(work_dir, image_count)
+        report["thumbnail"] = bench_thumbnail(images[0])
+
+        for duration in durations:
+            audio_path = synthetic_audio(work_dir, duration)
+            cue_count = max(1, round(duration * cues_per_minute / 60))
+            srt_path = synthetic_srt(work_dir, cue_count, duration)
+            report.setdefault("parse_srt", []).append({"duration": duration, **bench_parse_srt(srt_path)})
+
+            for resolution in resolutions:
+                for backend in backends:
+                    print(f"⏱️ compose_video {backend} {resolution[0]}x{resolution[1]} {duration:g}s", file=sys.stderr)
+                    report["cases"].append({
+                        "step": "compose_video",
+                        "backend": backend,
+                        "duration": duration,
+                        "resolution": list(resolution),
+                        "cues": cue_count,
+                        **bench_compose_video(
+                            images, audio_path, srt_path, resolution, backend, work_dir,
+                            fps=fps, draft=draft, workers=workers,
+                        ),
+                    })
+
+        report["animated_textclip"] = [
+            {"resolution": list(resolution), **bench_animated_textclip(resolution, font_path, fps=fps)}
+            for resolution in resolutions
+        ]
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return report
@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.services.agent_cache import AgentCache
+
+
+class Command(BaseCommand):
+    help = "Inspects or prunes the on-disk cache of text, voice and image agent responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["stats", "prune", "clear"], nargs="?", default="stats")
+        parser.add_argument(
+            "--max-bytes", type=int, default=None,
+            help="Prune down to this size instead of AGENT_CACHE_MAX_BYTES.",
+        )
+
+    def handle(self, *args, **options):
+        cache = AgentCache()
+        action = options["action"]
+
+        if action == "prune":
+            freed = cache.evict(max_bytes=options["max_bytes"])
+            self.stdout.write(self.style.SUCCESS(f"Freed {freed} bytes."))
+        elif action == "clear":
+            cache.clear()
+            self.stdout.write(self.style.SUCCESS(f"Cleared {cache.root}."))
+
+        self.stdout.write(json.dumps(cache.stats(), indent=2))
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from videos.models import Video
+from videos.utils import generate_subtitles_batch_util
+
+
+class Command(BaseCommand):
+    help = "Generates subtitles for every video that has a voice track but no subtitle file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--panel", type=int, default=None, help="Only videos of this panel.")
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None, help="Defaults to WHISPER_BATCH_SIZE.")
+        parser.add_argument("--model", default=None, help="Defaults to WHISPER_MODEL_SIZE.")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the videos that would be processed.")
+
+    def handle(self, *args, **options):
+        videos = (
+            Video.objects.select_related("panel", "ai_content")
+            .filter(Q(subtitle_file__isnull=True) | Q(subtitle_file=""))
+            .exclude(Q(voice_file__isnull=True) | Q(voice_file=""))
+            .order_by("id")
+        )
+        if options["panel"]:
+            videos = videos.filter(panel_id=options["panel"])
+        if options["limit"]:
+            videos = videos[: options["limit"]]
+
+        videos = list(videos)
+        self.stdout.write(f"{len(videos)} video(s) without subtitles.")
+        if options["dry_run"]:
+            for video in videos:
+                self.stdout.write(f"  #{video.id} {video.title}")
+            return
+
+        def on_saved(video, method, error):
+            if error:
+                self.stderr.write(f"  #{video.id} failed: {error}")
+            else:
+                self.stdout.write(f"  #{video.id} {method}")
+
+        stats = generate_subtitles_batch_util(
+            videos, batch_size=options["batch_size"], model_size=options["model"], on_saved=on_saved,
+        )
+        self.stdout.write(json.dumps(stats, indent=2))
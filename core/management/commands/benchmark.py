@@ -0,0 +1,57 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.suite import (
+    DEFAULT_BACKENDS,
+    DEFAULT_DURATIONS,
+    DEFAULT_RESOLUTIONS,
+    run_benchmark_suite,
+)
+
+
+def _resolution(value):
+    try:
+        width, height = value.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise CommandError(f"Invalid resolution '{value}', expected WIDTHxHEIGHT")
+
+
+class Command(BaseCommand):
+    help = "Runs compose_video, parse_srt, animated_textclip and the thumbnail pipeline on synthetic inputs and reports timings as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--durations", default=",".join(f"{d:g}" for d in DEFAULT_DURATIONS),
+                            help="Comma separated audio durations in seconds")
+        parser.add_argument("--resolutions", default=",".join(f"{w}x{h}" for w, h in DEFAULT_RESOLUTIONS),
+                            help="Comma separated WIDTHxHEIGHT list")
+        parser.add_argument("--backends", default=",".join(DEFAULT_BACKENDS))
+        parser.add_argument("--images", type=int, default=5)
+        parser.add_argument("--cues-per-minute", type=int, default=20)
+        parser.add_argument("--fps", type=int, default=24)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--draft", action="store_true")
+        parser.add_argument("--work-dir", help="Keep synthetic inputs in this directory instead of a temp dir")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        report = run_benchmark_suite(
+            durations=[float(d) for d in options["durations"].split(",") if d],
+            resolutions=[_resolution(r) for r in options["resolutions"].split(",") if r],
+            backends=[b for b in options["backends"].split(",") if b],
+            image_count=options["images"],
+            cues_per_minute=options["cues_per_minute"],
+            fps=options["fps"],
+            workers=options["workers"],
+            draft=options["draft"],
+            work_dir=options["work_dir"],
+        )
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(payload)
+            self.stdout.write(self.style.SUCCESS(f"Benchmark report written to {options['output']}"))
+        else:
+            self.stdout.write(payload)
@@ -0,0 +1,32 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.benchmarks.subtitles import run_subtitle_benchmark
+
+
+class Command(BaseCommand):
+    help = "Compares the legacy TextClip subtitle path with the glyph-atlas renderer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cues", type=int, default=20)
+        parser.add_argument("--width", type=int, default=1080)
+        parser.add_argument("--height", type=int, default=1920)
+        parser.add_argument("--fps", type=int, default=24)
+        parser.add_argument("--render-seconds", type=float, default=10.0)
+        parser.add_argument(
+            "--font",
+            default=os.path.join(settings.BASE_DIR, "staticfiles", "Roboto_Condensed-Bold.ttf"),
+        )
+
+    def handle(self, *args, **options):
+        result = run_subtitle_benchmark(
+            font_path=options["font"],
+            cue_count=options["cues"],
+            resolution=(options["width"], options["height"]),
+            fps=options["fps"],
+            render_seconds=options["render_seconds"],
+        )
+        self.stdout.write(json.dumps(result, indent=2))
@@ -0,0 +1,47 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks.fake_provider import FakeProviderServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serves deterministic stand-ins for the OpenAI chat/images/speech and ElevenLabs TTS endpoints. "
+        "Point OPENAI_BASE_URL and ELEVENLABS_BASE_URL at it to run the app without real credit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.2)
+        parser.add_argument("--jitter", type=float, default=0.25)
+        parser.add_argument("--error-rate", type=float, default=0.0)
+        parser.add_argument("--throttle-rate", type=float, default=0.0)
+        parser.add_argument("--rate-limit-per-minute", type=float, default=0)
+        parser.add_argument("--retry-after", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        provider = FakeProviderServer(
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"],
+            jitter=options["jitter"],
+            error_rate=options["error_rate"],
+            throttle_rate=options["throttle_rate"],
+            rate_limit_per_minute=options["rate_limit_per_minute"],
+            retry_after=options["retry_after"],
+            seed=options["seed"],
+        )
+        with provider:
+            self.stdout.write(self.style.SUCCESS(f"Fake provider listening on {provider.url}"))
+            self.stdout.write(f"OPENAI_BASE_URL={provider.openai_base_url}")
+            self.stdout.write(f"ELEVENLABS_BASE_URL={provider.elevenlabs_base_url}")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(json.dumps(dict(sorted(provider.stats.items())), indent=2))
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+from core.benchmarks.load_test import DEFAULT_STEPS, run_load_test
+from videos.jobs import STEP_UTILS
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives N concurrent users through /videos/<id>/generate/<step>/ against a local fake OpenAI/ElevenLabs "
+        "server and reports throughput, latency percentiles and resource use per step as JSON. "
+        "Runs offline in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=4)
+        parser.add_argument("--videos-per-user", type=int, default=2)
+        parser.add_argument("--steps", default=",".join(DEFAULT_STEPS), help="Comma separated steps, run in order")
+        parser.add_argument("--duration-minutes", type=int, default=1)
+        parser.add_argument("--latency", type=float, default=0.2, help="Fake provider base latency in seconds")
+        parser.add_argument("--jitter", type=float, default=0.25, help="Relative latency jitter (0.25 = ±25%%)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of provider requests answered with 500")
+        parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of provider requests answered with 429")
+        parser.add_argument("--rate-limit-per-minute", type=float, default=0, help="Per-key provider limit; 0 disables")
+        parser.add_argument("--retry-after", type=int, default=1)
+        parser.add_argument("--job-workers", type=int, help="Overrides GENERATION_JOB_WORKERS")
+        parser.add_argument("--image-rate-limit-per-minute", type=float, help="Overrides IMAGE_RATE_LIMIT_PER_MINUTE")
+        parser.add_argument("--job-timeout", type=float, default=600)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--agent-cache", action="store_true",
+                            help="Keep the agent response cache enabled, as in production (off by default)")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        steps = [s for s in options["steps"].split(",") if s]
+        unknown = [s for s in steps if s not in STEP_UTILS]
+        if unknown:
+            raise CommandError(f"Unknown steps: {', '.join(unknown)}")
+
+        extra_settings = {}
+        if options["image_rate_limit_per_minute"] is not None:
+            extra_settings["IMAGE_RATE_LIMIT_PER_MINUTE"] = options["image_rate_limit_per_minute"]
+
+        # İş thread'leri aynı veritabanına yazar; SQLite'ta paylaşımlı bellek DB yerine geçici dosya kullanılır
+        db_dir = tempfile.mkdtemp(prefix="loadtest-db-")
+        for alias in connections:
+            settings_dict = connections[alias].settings_dict
+            if settings_dict["ENGINE"].endswith("sqlite3"):
+                settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(db_dir, f"{alias}.sqlite3")
+
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            report = run_load_test(
+                users=options["users"],
+                videos_per_user=options["videos_per_user"],
+                steps=steps,
+                duration_minutes=options["duration_minutes"],
+                latency=options["latency"],
+                jitter=options["jitter"],
+                error_rate=options["error_rate"],
+                throttle_rate=options["throttle_rate"],
+                rate_limit_per_minute=options["rate_limit_per_minute"],
+                retry_after=options["retry_after"],
+                job_workers=options["job_workers"],
+                job_timeout=options["job_timeout"],
+                seed=options["seed"],
+                agent_cache=options["agent_cache"],
+                extra_settings=extra_settings,
+            )
+        finally:
+            runner.teardown_databases(old_config)
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(payload)
+            self.stdout.write(self.style.SUCCESS(f"Load test report written to {options['output']}"))
+        else:
+            self.stdout.write(payload)
@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.services.render_cache import RenderCache
+
+
+class Command(BaseCommand):
+    help = "Inspects or prunes the content-addressed render cache under MEDIA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["stats", "prune", "clear"], nargs="?", default="stats")
+        parser.add_argument(
+            "--max-bytes", type=int, default=None,
+            help="Prune down to this size instead of RENDER_CACHE_MAX_BYTES.",
+        )
+        parser.add_argument(
+            "--grace-seconds", type=int, default=None,
+            help="Keep entries used within this many seconds instead of RENDER_CACHE_EVICT_GRACE_SECONDS.",
+        )
+
+    def handle(self, *args, **options):
+        cache = RenderCache()
+        action = options["action"]
+
+        if action == "prune":
+            freed = cache.evict(max_bytes=options["max_bytes"], grace_seconds=options["grace_seconds"])
+            self.stdout.write(self.style.SUCCESS(f"Freed {freed} bytes."))
+        elif action == "clear":
+            cache.clear()
+            self.stdout.write(self.style.SUCCESS(f"Cleared {cache.root}."))
+
+        self.stdout.write(json.dumps(cache.stats(), indent=2))
@@ -0,0 +1,221 @@
+# core/services/agent_cache.py
+
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import unicodedata
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from core.services.rate_limit import key_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Ajan çıktısının biçimi değişirse artırılır; eski girdiler anahtar uyuşmadığı için kullanılmaz
+AGENT_CACHE_VERSION = 1
+
+_bypass = contextvars.ContextVar("agent_cache_bypass", default=False)
+
+
+@contextmanager
+def agent_cache_bypass():
+    """Blok içindeki ajan çağrıları cache'i okumaz (yeni sonuç üretilir ve cache'e yazılır)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def normalize_text(value):
+    """Prompt karşılaştırması için: NFC, satır sonu/boşluk farkları ve baştaki/sondaki boşluklar yok sayılır."""
+    value = unicodedata.normalize("NFC", value).replace("\r\n", "\n")
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in value.split("\n")]
+    return "\n".join(lines).strip()
+
+
+def make_agent_key(agent, model, api_key, params):
+    """
+    (ajan, model, normalize edilmiş prompt/parametreler) → sha256. API anahtarının kendisi değil parmak izi
+    girer; farklı hesapların sonuçları birbirine karışmaz.
+    """
+    payload = json.dumps({
+        "agent": agent,
+        "model": model,
+        "scope": key_fingerprint(api_key) if api_key else None,
+        "params": {k: normalize_text(v) if isinstance(v, str) else v for k, v in params.items()},
+        "version": AGENT_CACHE_VERSION,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AgentCache:
+    """
+    Ajan yanıtları için disk üzerinde içerik adresli cache: ajan başına bir klasör, anahtar başına bir dosya.
+    mtime yazılma zamanıdır (TTL), atime son kullanımdır (LRU). Toplam boyut max_bytes'ı aşınca en uzun
+    süredir kullanılmayan girdiler silinir. Sayaçlar süreç içindir.
+    """
+
+    def __init__(self, root=None, max_bytes=None, ttl_seconds=None):
+        self.root = root or getattr(settings, "AGENT_CACHE_DIR", None) or os.path.join(settings.MEDIA_ROOT, "agent_cache")
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(settings, "AGENT_CACHE_MAX_BYTES", 2 * 1024 ** 3)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else getattr(settings, "AGENT_CACHE_TTL_SECONDS", 0)
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    def _count(self, agent, event):
+        with self._lock:
+            counter = self.counters.setdefault(agent, {"hits": 0, "misses": 0, "writes": 0})
+            counter[event] += 1
+
+    def path_for(self, agent, key):
+        return os.path.join(self.root, agent, key[:2], key)
+
+    def _expired(self, mtime, ttl):
+        ttl = self.ttl_seconds if ttl is None else ttl
+        return bool(ttl) and time.time() - mtime > ttl
+
+    def get(self, agent, key, ttl=None):
+        """Geçerli girdinin yolunu döner (yoksa veya süresi dolmuşsa None) ve sayaçları günceller."""
+        path = self.path_for(agent, key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._count(agent, "misses")
+            return None
+        if self._expired(stat.st_mtime, ttl):
+            self._remove(path)
+            self._count(agent, "misses")
+            return None
+        # LRU için yalnızca erişim zamanı güncellenir; mtime (TTL) korunur
+        os.utime(path, (time.time(), stat.st_mtime))
+        self._count(agent, "hits")
+        return path
+
+    def read(self, agent, key, ttl=None):
+        path = self.get(agent, key, ttl)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    @contextmanager
+    def writer(self, agent, key):
+        """
+        Geçici dosyaya yazılır; blok hatasız biterse atomik olarak yerine taşınır, hata olursa atılır.
+        Aynı anahtarı yazan iki çağrı çakışmaz.
+        """
+        path = self.path_for(agent, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self._count(agent, "writes")
+        self.evict()
+
+    def write(self, agent, key, data):
+        with self.writer(agent, key) as f:
+            f.write(data)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        """(yol, boyut, atime, mtime, ajan) listesi."""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                agent = os.path.relpath(path, self.root).split(os.sep)[0]
+                result.append((path, stat.st_size, stat.st_atime, stat.st_mtime, agent))
+        return result
+
+    def evict(self, max_bytes=None):
+        """Süresi dolanları, sonra toplam boyut sınırın altına inene kadar en eski kullanılanları siler."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        freed = 0
+        for entry in self.entries():
+            if self._expired(entry[3], None):
+                self._remove(entry[0])
+                freed += entry[1]
+            else:
+                entries.append(entry)
+
+        total = sum(entry[1] for entry in entries)
+        for path, size, *_ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= size
+            freed += size
+
+        if freed:
+            logger.info(f"Agent cache evicted {freed} bytes (limit {limit})")
+        return freed
+
+    def stats(self):
+        agents = {}
+        for _, size, _, _, agent in self.entries():
+            info = agents.setdefault(agent, {"entries": 0, "bytes": 0})
+            info["entries"] += 1
+            info["bytes"] += size
+        with self._lock:
+            for agent, counter in self.counters.items():
+                agents.setdefault(agent, {"entries": 0, "bytes": 0}).update(counter)
+        return {
+            "root": self.root,
+            "entries": sum(info["entries"] for info in agents.values()),
+            "bytes": sum(info["bytes"] for info in agents.values()),
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "agents": dict(sorted(agents.items())),
+        }
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_agent_cache(agent=None):
+    """Cache kapalıysa veya ajan AGENT_CACHE_DISABLED_AGENTS içindeyse None."""
+    global _cache
+    if not getattr(settings, "AGENT_CACHE_ENABLED", False):
+        return None
+    if agent and agent in getattr(settings, "AGENT_CACHE_DISABLED_AGENTS", []):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = AgentCache()
+        return _cache
+
+
+def is_bypassed():
+    return _bypass.get()
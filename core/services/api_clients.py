@@ -0,0 +1,171 @@
+# core/services/api_clients.py
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+
+import httpx
+from django.conf import settings
+
+from core.services.rate_limit import key_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def http_limits():
+    return httpx.Limits(
+        max_connections=getattr(settings, "API_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=getattr(settings, "API_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=getattr(settings, "API_HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def http_timeout():
+    return httpx.Timeout(
+        getattr(settings, "API_HTTP_READ_TIMEOUT", 120.0),
+        connect=getattr(settings, "API_HTTP_CONNECT_TIMEOUT", 10.0),
+    )
+
+
+def _running_loop_id():
+    # httpx.AsyncClient bağlantıları oluşturulduğu event loop'a bağlıdır
+    try:
+        return id(asyncio.get_running_loop())
+    except RuntimeError:
+        return None
+
+
+class ClientRegistry:
+    """
+    (sağlayıcı, API anahtarı) başına tek, keep-alive bağlantı havuzlu istemci. İstemciler thread-safe'tir;
+    farklı kullanıcıların işleri aynı süreçte paralel çalışırken global durum (openai.api_key) değişmez.
+    Kayıt sayısı max_clients ile sınırlıdır; en uzun süredir kullanılmayan istemci bırakılır.
+    """
+
+    def __init__(self, max_clients=None):
+        self.max_clients = max_clients or getattr(settings, "API_CLIENT_REGISTRY_SIZE", 256)
+        self._clients = OrderedDict()
+        self._lock = threading.RLock()  # factory iç içe get() çağırabilir
+        self.created = 0
+        self.reused = 0
+
+    def get(self, key, factory):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                self.reused += 1
+                return client
+            client = factory()
+            self._clients[key] = client
+            self.created += 1
+            while len(self._clients) > self.max_clients:
+                evicted, _ = self._clients.popitem(last=False)
+                # Kullanımdaki bir istemci kapatılmaz; referansı düşer, boştaki bağlantılar GC ile kapanır
+                logger.info(f"API client {evicted[:2]} evicted from registry")
+            return client
+
+    # --- Paylaşılan httpx havuzları ---
+
+    def http(self, provider, api_key=None):
+        return self.get(
+            (provider, key_fingerprint(api_key) if api_key else None, "http"),
+            lambda: httpx.Client(limits=http_limits(), timeout=http_timeout(), follow_redirects=True),
+        )
+
+    def async_http(self, provider, api_key=None):
+        return self.get(
+            (provider, key_fingerprint(api_key) if api_key else None, "async_http", _running_loop_id()),
+            lambda: httpx.AsyncClient(limits=http_limits(), timeout=http_timeout(), follow_redirects=True),
+        )
+
+    # --- Sağlayıcı istemcileri ---
+
+    def openai(self, api_key):
+        import openai
+
+        return self.get(
+            ("openai", key_fingerprint(api_key), "sync"),
+            lambda: openai.OpenAI(
+                api_key=api_key,
+                base_url=getattr(settings, "OPENAI_BASE_URL", None),
+                http_client=self.http("openai", api_key),
+                # Yeniden deneme ajan katmanında (core.services.resilience); SDK'nınki 429'u gizler
+                max_retries=0,
+            ),
+        )
+
+    def async_openai(self, api_key):
+        import openai
+
+        return self.get(
+            ("openai", key_fingerprint(api_key), "async", _running_loop_id()),
+            lambda: openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=getattr(settings, "OPENAI_BASE_URL", None),
+                http_client=self.async_http("openai", api_key),
+                max_retries=0,
+            ),
+        )
+
+    def chat_openai(self, api_key, model, temperature):
+        from langchain_openai import ChatOpenAI
+
+        return self.get(
+            ("openai", key_fingerprint(api_key), "chat", model, temperature),
+            lambda: ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=api_key,
+                base_url=getattr(settings, "OPENAI_BASE_URL", None),
+                http_client=self.http("openai", api_key),
+                http_async_client=self.async_http("openai", api_key),
+                max_retries=0,
+            ),
+        )
+
+    def elevenlabs(self, api_key):
+        from elevenlabs.client import ElevenLabs
+
+        base_url = getattr(settings, "ELEVENLABS_BASE_URL", None)
+        return self.get(
+            ("elevenlabs", key_fingerprint(api_key), "sync"),
+            lambda: ElevenLabs(api_key=api_key, httpx_client=self.http("elevenlabs", api_key), **({"base_url": base_url} if base_url else {})),
+        )
+
+    def async_elevenlabs(self, api_key):
+        from elevenlabs.client import AsyncElevenLabs
+
+        base_url = getattr(settings, "ELEVENLABS_BASE_URL", None)
+        return self.get(
+            ("elevenlabs", key_fingerprint(api_key), "async", _running_loop_id()),
+            lambda: AsyncElevenLabs(api_key=api_key, httpx_client=self.async_http("elevenlabs", api_key), **({"base_url": base_url} if base_url else {})),
+        )
+
+    def stats(self):
+        with self._lock:
+            providers = {}
+            for key in self._clients:
+                providers[key[0]] = providers.get(key[0], 0) + 1
+            return {"clients": len(self._clients), "providers": providers, "created": self.created, "reused": self.reused}
+
+    def close(self):
+        """Senkron havuzları kapatır (test/süreç kapanışı için)."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), OrderedDict()
+        for client in clients:
+            if isinstance(client, httpx.Client):
+                client.close()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
@@ -0,0 +1,135 @@
+# core/services/audio_stream.py
+
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+# MPEG ses çerçeve başlığı tabloları (kbps / Hz)
+_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+
+def _parse_header(b0, b1, b2, b3):
+    """4 baytlık MPEG çerçeve başlığı → (çerçeve uzunluğu, çerçevedeki örnek, örnekleme hızı) veya None."""
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    rate_index = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    version = {3: 1, 2: 2, 0: 2.5}[version_bits]
+    layer = 4 - layer_bits
+    bitrate = _BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 1152 if layer == 2 or version == 1 else 576
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+
+def _is_info_frame(frame_start):
+    return b"Xing" in frame_start or b"Info" in frame_start or b"VBRI" in frame_start
+
+
+class Mp3DurationCounter:
+    """
+    Akan MP3 baytlarından süreyi çerçeve başlıklarını sayarak hesaplar; sesi bellekte tutmaz.
+    Sadece bir sonraki başlığa kadar atlanacak bayt sayısı ve kısa bir kuyruk (yarım başlık ya da
+    ilk çerçevenin en fazla 64 baytı) saklanır.
+    """
+
+    def __init__(self):
+        self.bytes = 0
+        self.frames = 0
+        self.seconds = 0.0
+        self._skip = 0          # içinde bulunulan çerçevenin/etiketin kalan baytı
+        self._carry = b""       # chunk sınırına denk gelen yarım başlık/bilgi çerçevesi
+        self._started = False   # ID3v2 kontrolü yalnızca akışın başında
+
+    def feed(self, chunk):
+        self.bytes += len(chunk)
+        data = self._carry + chunk
+        self._carry = b""
+        pos = 0
+
+        if not self._started:
+            if len(data) < 10:
+                self._carry = data
+                return
+            self._started = True
+            if data[:3] == b"ID3":
+                size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+                self._skip = 10 + size
+
+        length = len(data)
+        while True:
+            if self._skip:
+                step = min(self._skip, length - pos)
+                self._skip -= step
+                pos += step
+                if self._skip:
+                    return
+            if length - pos < 4:
+                self._carry = data[pos:]
+                return
+            header = _parse_header(data[pos], data[pos + 1], data[pos + 2], data[pos + 3])
+            if header is None:
+                pos += 1  # senkron kaybı: bir sonraki 0xFF'e kadar kay
+                continue
+            frame_length, samples, sample_rate = header
+            if self.frames == 0:
+                # LAME/Xing bilgi çerçevesi ses içermez; etiket chunk sınırında bölünmesin
+                if length - pos < min(frame_length, 64):
+                    self._carry = data[pos:]
+                    return
+                if _is_info_frame(data[pos:pos + 64]):
+                    self._skip = frame_length
+                    continue
+            self.frames += 1
+            self.seconds += samples / sample_rate
+            self._skip = frame_length
+
+    def wrap(self, chunks):
+        """Chunk'ları sayarak aynen geçirir."""
+        for chunk in chunks:
+            if chunk:
+                self.feed(chunk)
+                yield chunk
+
+
+class ChunkStream(io.RawIOBase):
+    """
+    Bayt iterator'ünü salt-okunur, seek edilemeyen bir dosya gibi sunar. Django storage'ları
+    File.chunks() ile okuduğu için ses diske/uzak depoya parça parça yazılır; bellekte en fazla bir chunk kalır.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
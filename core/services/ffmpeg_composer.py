@@ -0,0 +1,238 @@
+# core/services/ffmpeg_composer.py
+
+import os
+import logging
+import tempfile
+import subprocess
+
+import ffmpeg
+from django.conf import settings
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from core.services.instrumentation import StepCancelled, emit_event, report_progress, span
+from core.services.subtitle_renderer import (
+    SUBTITLE_FONT_SIZE,
+    SUBTITLE_STROKE_WIDTH,
+    SUBTITLE_SIDE_MARGIN,
+)
+
+logger = logging.getLogger(__name__)
+
+SUBTITLE_FONT_NAME = "Roboto Condensed"
+
+
+def get_ffmpeg_binary():
+    """settings.FFMPEG_BINARY yoksa imageio-ffmpeg'in getirdiği binary kullanılır (MoviePy ile aynı)."""
+    binary = getattr(settings, "FFMPEG_BINARY", None)
+    if binary:
+        return binary
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def probe_duration(path):
+    """Medya süresini (saniye) dosyayı decode etmeden okur; imageio-ffmpeg ffprobe getirmediği için."""
+    return float(ffmpeg_parse_infos(path, decode_file=False)["duration"])
+
+
+def run_with_progress(stream, total_frames, stats_period=0.5):
+    """
+    ffmpeg'i `-progress pipe:1` ile çalıştırır; her raporda kare sayacı report_progress/emit_event'e aktarılır.
+    Dinleyici StepCancelled fırlatırsa süreç öldürülür ve hata çağırana iletilir. Çıkış kodu sıfır değilse ffmpeg.Error.
+    """
+    args = ffmpeg.compile(
+        stream.global_args("-progress", "pipe:1", "-nostats", "-stats_period", str(stats_period)),
+        cmd=get_ffmpeg_binary(),
+    )
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr)
+        frame = 0
+        try:
+            for raw in process.stdout:
+                key, _, value = raw.decode("utf-8", errors="ignore").strip().partition("=")
+                if key == "frame" and value.isdigit():
+                    frame = int(value)
+                elif key == "progress":
+                    report_progress(frame, total_frames, f"Encode {frame}/{total_frames} kare")
+                    emit_event("encode", frame=frame, total=total_frames)
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            process.stdout.close()
+
+        if process.wait() != 0:
+            stderr.seek(0)
+            raise ffmpeg.Error("ffmpeg", None, stderr.read())
+    return frame
+
+
+def _ass_timestamp(seconds):
+    cs = int(round(seconds * 100))
+    hrs, cs = divmod(cs, 360000)
+    mins, cs = divmod(cs, 6000)
+    secs, cs = divmod(cs, 100)
+    return f"{hrs}:{mins:02}:{secs:02}.{cs:02}"
+
+
+def _ass_escape(text):
+    return text.replace("\\", "/").replace("{", "(").replace("}", ")").replace("\n", " ")
+
+
+def write_typewriter_ass(subtitles, resolution, path, font_scale=1.0):
+    """
+    parse_srt çıktısını libass için ASS dosyasına çevirir. Harf harf efekt karaoke
+    (\\ko) etiketleriyle yapılır: henüz sırası gelmemiş harfler (kontur dahil) görünmez.
+    """
+    width, height = resolution
+    margin = round(SUBTITLE_SIDE_MARGIN * font_scale) // 2
+    font_size = max(1, round(SUBTITLE_FONT_SIZE * font_scale))
+    stroke_width = max(1, round(SUBTITLE_STROKE_WIDTH * font_scale))
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 1",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Default,{SUBTITLE_FONT_NAME},{font_size},&H00FFFFFF,&HFFFFFFFF,&H00000000,&H00000000,"
+        f"-1,0,0,0,100,100,0,0,1,{stroke_width},0,5,{margin},{margin},0,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+
+    for (start, end), text in subtitles:
+        text = _ass_escape(text.strip())
+        if not text or end <= start:
+            continue
+        # Her harf eşit süre alır (animated_textclip ile aynı zamanlama)
+        char_cs = max(1, int(round((end - start) * 100 / len(text))))
+        karaoke = "".join(f"{{\\ko{char_cs}}}{char}" for char in text)
+        lines.append(f"Dialogue: 0,{_ass_timestamp(start)},{_ass_timestamp(end)},Default,,0,0,0,,{karaoke}")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def _image_stream(img_path, resolution, frames, fps, zoom_ratio, zoom_frames):
+    """Tek görsel → zoompan ile Ken Burns efektli, sabit çözünürlüklü kare dizisi."""
+    width, height = resolution
+    # zoompan'ın titremesini azaltmak için önce 2x tuvale ölçekle + kırp
+    canvas_w, canvas_h = width * 2, height * 2
+    return (
+        ffmpeg.input(img_path)
+        .filter("scale", canvas_w, canvas_h, force_original_aspect_ratio="increase")
+        .filter("crop", canvas_w, canvas_h)
+        .filter(
+            "zoompan",
+            z=f"1+{zoom_ratio}*on/{zoom_frames}",
+            x="iw/2-(iw/zoom/2)",
+            y="ih/2-(ih/zoom/2)",
+            d=frames,
+            s=f"{width}x{height}",
+            fps=fps,
+        )
+        .filter("setsar", 1)
+        .filter("format", "yuv420p")
+    )
+
+
+def compose_video_ffmpeg(
+    images,
+    audio_path,
+    output_path="output.mp4",
+    music_path=None,
+    resolution=(1280, 720),
+    srt_path=None,
+    transition_duration=1.0,
+    zoom_ratio=0.2,
+    fps=24,
+    preset="medium",
+    subtitle_scale=1.0,
+):
+    """
+    compose_video ile aynı girdilerden tek bir ffmpeg filtergraph kurar:
+    zoompan (zoom) → xfade (geçiş) → subtitles (libass) ve libx264 ile encode eder.
+    Kare başına iş tamamen ffmpeg içinde kalır.
+    """
+    from core.services.video_composer import parse_srt
+
+    try:
+        print("🎬 Starting video composition (ffmpeg backend)")
+
+        if not images:
+            logger.error("No images provided.")
+            return None
+
+        with span("audio_load"):
+            audio_duration = probe_duration(audio_path)
+        print(f"🔊 Audio loaded. Duration: {audio_duration:.2f}s")
+
+        clip_duration = audio_duration / len(images)
+        clip_frames = int(round((clip_duration + transition_duration) * fps))
+        zoom_frames = max(1, int(round(clip_duration * fps)))
+
+        video = None
+        for idx, img_path in enumerate(images):
+            print(f"📷 Processing image {idx + 1}/{len(images)}: {img_path}")
+            stream = _image_stream(img_path, resolution, clip_frames, fps, zoom_ratio, zoom_frames)
+            if video is None:
+                video = stream
+            elif transition_duration <= 0:
+                video = ffmpeg.concat(video, stream, v=1, a=0)
+            else:
+                # Klip k, zaman çizelgesinde k * clip_duration anında başlar
+                video = ffmpeg.filter(
+                    [video, stream], "xfade",
+                    transition="fade", duration=transition_duration, offset=round(idx * clip_duration, 3),
+                )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if srt_path and os.path.isfile(srt_path):
+                print(f"💬 Adding subtitles from: {srt_path}")
+                with span("subtitle_build") as attrs:
+                    with open(srt_path, "r", encoding="utf-8-sig") as f:
+                        subtitles_data = parse_srt(f.read())
+                    attrs["cues"] = len(subtitles_data)
+                    ass_path = write_typewriter_ass(
+                        subtitles_data, resolution, os.path.join(tmp_dir, "subs.ass"), font_scale=subtitle_scale,
+                    )
+                fonts_dir = os.path.join(settings.BASE_DIR, "staticfiles")
+                video = video.filter("subtitles", filename=ass_path, fontsdir=fonts_dir)
+
+            audio = ffmpeg.input(audio_path).audio
+            if music_path and os.path.isfile(music_path):
+                music = ffmpeg.input(music_path).audio.filter("volume", 0.3)
+                audio = ffmpeg.filter([audio, music], "amix", inputs=2, duration="first", normalize=0)
+
+            print(f"💾 Writing final video to {output_path}")
+            # Filtergraph içinde zoom, geçiş ve altyazı da bu süreye dahil
+            total_frames = int(round(audio_duration * fps))
+            with span("encode", backend="ffmpeg", frames=total_frames):
+                run_with_progress(
+                    ffmpeg
+                    .output(video, audio, output_path, vcodec="libx264", acodec="aac", pix_fmt="yuv420p", r=fps, preset=preset)
+                    .overwrite_output(),
+                    total_frames,
+                )
+
+        print("✅ Video composition finished successfully")
+        return output_path
+
+    except StepCancelled:
+        raise
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode("utf-8", errors="ignore")[-2000:] if e.stderr else ""
+        logger.error(f"❌ ffmpeg backend failed: {stderr}")
+        return None
+    except Exception as e:
+        logger.exception(f"❌ Failed to compose video with ffmpeg: {str(e)}")
+        return None
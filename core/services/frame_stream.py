@@ -0,0 +1,313 @@
+# core/services/frame_stream.py
+
+import os
+import queue
+import logging
+import resource
+import tempfile
+import threading
+import subprocess
+from contextlib import ExitStack
+
+import ffmpeg
+import numpy as np
+from django.conf import settings
+
+from core.services.ffmpeg_composer import get_ffmpeg_binary, probe_duration
+from core.services.instrumentation import StepCancelled, emit_event, report_progress, span
+from core.services.ken_burns import KenBurnsZoom
+from core.services.subtitle_renderer import make_subtitle_renderer
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def current_rss_mb():
+    """Sürecin o anki RSS'i (MB). /proc yoksa tepe değere düşer."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    # Linux'ta ru_maxrss KB cinsinden
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class TimelineFrameSource:
+    """
+    compose_video zaman çizelgesini kare kare NumPy ile üretir. Görseller sadece aktif
+    oldukları pencerede yüklenir ve pencere geçince bırakılır; bellekte aynı anda en fazla
+    iki görsel (crossfade sırasında) ve tek bir altyazı tamponu bulunur.
+    """
+
+    def __init__(self, images, resolution, clip_duration, transition_duration=1.0, zoom_ratio=0.2,
+                 subtitles=None, font_path=None, subtitle_scale=1.0, decoder=None, subtitle_renderer=None):
+        self.images = images
+        # decoder(path) -> PIL Image; birden çok kaynak aynı decode edilmiş görselleri paylaşabilsin diye
+        self.decoder = decoder
+        self.resolution = tuple(resolution)
+        self.clip_duration = clip_duration
+        self.transition_duration = transition_duration
+        self.zoom_ratio = zoom_ratio
+        self.duration = len(images) * clip_duration + transition_duration
+        # subtitle_renderer: aynı çözünürlükteki kaynaklar yerleşimi bir kez hesaplanmış renderer'ı paylaşır
+        self.subtitles = subtitle_renderer
+        if subtitles and subtitle_renderer is None:
+            self.subtitles = make_subtitle_renderer(subtitles, resolution, font_path, font_scale=subtitle_scale)
+        self._active = {}
+
+    def _clip(self, idx):
+        zoom = self._active.get(idx)
+        if zoom is None:
+            image = self.images[idx]
+            zoom = KenBurnsZoom(
+                self.decoder(image) if self.decoder else image,
+                self.resolution,
+                duration=self.clip_duration + self.transition_duration,
+                zoom_ratio=self.zoom_ratio,
+                zoom_duration=self.clip_duration,
+            )
+            self._active[idx] = zoom
+        return zoom
+
+    def _release_before(self, idx):
+        for old in [key for key in self._active if key < idx]:
+            del self._active[old]
+
+    def frame(self, t):
+        cd = self.clip_duration
+        idx = min(int(t // cd), len(self.images) - 1)
+        # Önceki görsel crossfade süresince hâlâ görünür
+        local = t - idx * cd
+        fading = idx > 0 and self.transition_duration > 0 and local < self.transition_duration
+        self._release_before(idx - 1 if fading else idx)
+
+        current = self._clip(idx).frame(local)
+        if fading:
+            previous = self._clip(idx - 1).frame(local + cd)
+            alpha = local / self.transition_duration
+            frame = (previous * (1.0 - alpha) + current * alpha).astype(np.uint8)
+        else:
+            frame = np.array(current, dtype=np.uint8)
+
+        if self.subtitles is not None and self.subtitles.is_active(t):
+            self._overlay_subtitles(frame, t)
+        return frame
+
+    def _overlay_subtitles(self, frame, t):
+        sub = self.subtitles.frame(t)
+        mask = self.subtitles.mask(t)[..., None]
+        # Tuval kareden büyük olabilir (küçük çözünürlük, uzun cue); MoviePy gibi ortalayıp kırp
+        y0 = (frame.shape[0] - mask.shape[0]) // 2
+        x0 = (frame.shape[1] - mask.shape[1]) // 2
+        fy, fx = max(y0, 0), max(x0, 0)
+        sy, sx = fy - y0, fx - x0
+        h = min(mask.shape[0] - sy, frame.shape[0] - fy)
+        w = min(mask.shape[1] - sx, frame.shape[1] - fx)
+        sub = sub[sy:sy + h, sx:sx + w]
+        mask = mask[sy:sy + h, sx:sx + w]
+        region = frame[fy:fy + h, fx:fx + w]
+        region[...] = (sub * mask + region * (1.0 - mask)).astype(np.uint8)
+
+
+def _encoder_args(resolution, fps, output_path, audio_path, preset, music_path, video_bitrate, audio_codec):
+    width, height = resolution
+    video_in = ffmpeg.input("pipe:", format="rawvideo", pix_fmt="rgb24", s=f"{width}x{height}", r=fps)
+    audio = ffmpeg.input(audio_path).audio
+    if music_path and os.path.isfile(music_path):
+        music = ffmpeg.input(music_path).audio.filter("volume", 0.3)
+        audio = ffmpeg.filter([audio, music], "amix", inputs=2, duration="first", normalize=0)
+    output_options = dict(vcodec="libx264", acodec=audio_codec, pix_fmt="yuv420p", preset=preset, r=fps)
+    if video_bitrate:
+        output_options["video_bitrate"] = video_bitrate
+    return ffmpeg.compile(
+        ffmpeg.output(video_in, audio, output_path, **output_options).overwrite_output(),
+        cmd=get_ffmpeg_binary(),
+    )
+
+
+def stream_to_ffmpeg(source, output_path, audio_path, fps=24, preset="medium", music_path=None,
+                     queue_frames=None, memory_ceiling_mb=None, video_bitrate=None, audio_codec="aac"):
+    """
+    Kareleri bir üretici thread'de hesaplar, sınırlı bir kuyruk üzerinden ffmpeg'in stdin'ine yazar.
+    Kuyruk doluysa üretici bekler (backpressure); böylece bellek video uzunluğundan bağımsız kalır.
+
+    audio_codec="copy" ile önceden miks edilmiş bir AAC dosyası yeniden encode edilmeden eklenir.
+    """
+    errors = stream_to_ffmpeg_outputs(
+        source, [(output_path, video_bitrate)], audio_path, fps=fps, preset=preset, music_path=music_path,
+        queue_frames=queue_frames, memory_ceiling_mb=memory_ceiling_mb, audio_codec=audio_codec,
+    )
+    if errors[output_path]:
+        raise errors[output_path]
+    return output_path
+
+
+def stream_to_ffmpeg_outputs(source, outputs, audio_path, fps=24, preset="medium", music_path=None,
+                             queue_frames=None, memory_ceiling_mb=None, audio_codec="aac"):
+    """
+    stream_to_ffmpeg'in çok çıktılı hâli: her kare bir kez üretilir ve her çıktının ffmpeg'ine yazılır
+    (aynı çözünürlük/fps, farklı bitrate). outputs: [(yol, video_bitrate)]. Çıkan ffmpeg yalnızca kendi
+    çıktısını düşürür; {yol: hata veya None} döner. Kare üretimi hata verirse bütün çıktılar için yükselir.
+    """
+    width, height = source.resolution
+    frame_bytes = width * height * 3
+    total_frames = int(round(source.duration * fps))
+
+    memory_ceiling_mb = memory_ceiling_mb or getattr(settings, "RENDER_MEMORY_CEILING_MB", 1024)
+    queue_frames = queue_frames or getattr(settings, "RENDER_STREAM_QUEUE_FRAMES", 48)
+    # Kuyruktaki kareler bellek tavanının en fazla dörtte birini kullansın
+    queue_frames = max(2, min(queue_frames, int(memory_ceiling_mb * 1024 * 1024 / 4 // frame_bytes)))
+
+    frames = queue.Queue(maxsize=queue_frames)
+    stop = threading.Event()
+    errors = []
+
+    def produce():
+        try:
+            for i in range(total_frames):
+                if stop.is_set():
+                    return
+                frames.put(source.frame(i / fps).tobytes())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            frames.put(_STOP)
+
+    logger.info(
+        f"Streaming render: {total_frames} frames at {width}x{height} → {len(outputs)} output(s), "
+        f"queue {queue_frames} frames ({queue_frames * frame_bytes / (1024 * 1024):.0f} MB), "
+        f"memory ceiling {memory_ceiling_mb} MB"
+    )
+
+    peak = current_rss_mb()
+    results = {}
+    with ExitStack() as stack:
+        processes = {}
+        producer = threading.Thread(target=produce, name="frame-producer", daemon=True)
+        written = 0
+        try:
+            for output_path, video_bitrate in outputs:
+                args = _encoder_args(
+                    (width, height), fps, output_path, audio_path, preset, music_path, video_bitrate, audio_codec,
+                )
+                stderr = stack.enter_context(tempfile.TemporaryFile())
+                processes[output_path] = (
+                    subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr), stderr,
+                )
+            open_pipes = dict(processes)
+            producer.start()
+            while open_pipes:
+                item = frames.get()
+                if item is _STOP:
+                    break
+                for output_path, (process, _) in list(open_pipes.items()):
+                    try:
+                        process.stdin.write(item)
+                    except BrokenPipeError:
+                        # Bu encoder çıktı; diğerleri kareleri almaya devam eder
+                        del open_pipes[output_path]
+                written += 1
+                if written % fps == 0:
+                    peak = max(peak, current_rss_mb())
+                    report_progress(written, total_frames, f"Encode {written}/{total_frames} kare")
+                    emit_event("encode", frame=written, total=total_frames)
+        except BaseException:
+            # İptal veya hata: yarım dosyaları encode etmeye devam etmesinler
+            for process, _ in processes.values():
+                process.kill()
+            raise
+        finally:
+            stop.set()
+            # Üretici kuyrukta bekliyorsa serbest kalsın
+            while producer.is_alive():
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    producer.join(timeout=0.1)
+            for process, _ in processes.values():
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+            return_codes = {output_path: process.wait() for output_path, (process, _) in processes.items()}
+
+        if errors:
+            raise errors[0]
+        for output_path, (_, stderr) in processes.items():
+            results[output_path] = None
+            if return_codes[output_path] != 0:
+                stderr.seek(0)
+                tail = stderr.read().decode("utf-8", errors="ignore")[-2000:]
+                results[output_path] = RuntimeError(f"ffmpeg exited with {return_codes[output_path]}: {tail}")
+
+    level = logging.WARNING if peak > memory_ceiling_mb else logging.INFO
+    logger.log(
+        level,
+        f"Streaming render finished: {written} frames × {len(outputs)} output(s), peak RSS {peak:.0f} MB "
+        f"(ceiling {memory_ceiling_mb} MB{', EXCEEDED' if peak > memory_ceiling_mb else ''})",
+    )
+    return results
+
+
+def compose_video_streaming(
+    images,
+    audio_path,
+    output_path="output.mp4",
+    music_path=None,
+    resolution=(1280, 720),
+    srt_path=None,
+    transition_duration=1.0,
+    zoom_ratio=0.2,
+    fps=24,
+    preset="medium",
+    subtitle_scale=1.0,
+):
+    """
+    compose_video'nun sabit bellekli yolu: klip ağacı kurulmaz, kareler tembel üretilip
+    doğrudan encoder'a akıtılır.
+    """
+    from core.services.video_composer import read_srt, subtitle_font_path
+
+    try:
+        print("🎬 Starting video composition (streaming)")
+
+        if not images:
+            logger.error("No images provided.")
+            return None
+
+        with span("audio_load"):
+            audio_duration = probe_duration(audio_path)
+        print(f"🔊 Audio loaded. Duration: {audio_duration:.2f}s")
+
+        with span("subtitle_build"):
+            subtitles = read_srt(srt_path) if srt_path and os.path.isfile(srt_path) else None
+        # Görseller tembel yüklendiği için klip kurulumu encode span'inin içinde kalır
+        source = TimelineFrameSource(
+            images,
+            resolution,
+            clip_duration=audio_duration / len(images),
+            transition_duration=transition_duration,
+            zoom_ratio=zoom_ratio,
+            subtitles=subtitles,
+            font_path=subtitle_font_path(),
+            subtitle_scale=subtitle_scale,
+        )
+
+        print(f"💾 Streaming frames to {output_path}")
+        with span("encode", backend="streaming", frames=int(round(source.duration * fps))):
+            stream_to_ffmpeg(source, output_path, audio_path, fps=fps, preset=preset, music_path=music_path)
+
+        print("✅ Video composition finished successfully")
+        return output_path
+
+    except StepCancelled:
+        raise
+    except Exception as e:
+        logger.exception(f"❌ Failed to compose video (streaming): {str(e)}")
+        return None
@@ -0,0 +1,162 @@
+# core/services/instrumentation.py
+
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_current_recorder = contextvars.ContextVar("span_recorder", default=None)
+# Derinlik context'e bağlı: copy_context ile açılan worker thread'ler üst span'in derinliğini devralır
+# ve kendi iç içe span'lerini diğer thread'lerden bağımsız sayar.
+_span_depth = contextvars.ContextVar("span_depth", default=0)
+
+
+class SpanRecorder:
+    """
+    Bir adım çalışması boyunca açılan span'leri toplar. Her span: ad, adımın başlangıcına göre
+    başlangıç ofseti, süre, derinlik ve isteğe bağlı öznitelikler (kare sayısı, fps, agent adı...).
+    Worker thread'ler aynı recorder'a yazabildiği için spans listesi kilitle korunur.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def as_list(self):
+        with self._lock:
+            spans = list(self.spans)
+        return sorted(spans, key=lambda s: s["start"])
+
+    def _append(self, entry):
+        with self._lock:
+            self.spans.append(entry)
+
+    def add(self, name, started, duration, status="ok", **attrs):
+        """Başka bir thread'de ölçülmüş bir aralığı ekler (started: time.perf_counter() değeri)."""
+        entry = {
+            "name": name,
+            "start": round(started - self.started, 4),
+            "depth": 0,
+            "duration": round(duration, 4),
+            "status": status,
+        }
+        if attrs:
+            entry["attrs"] = attrs
+        self._append(entry)
+
+
+def current_recorder():
+    return _current_recorder.get()
+
+
+@contextmanager
+def record_spans():
+    """Blok içindeki span() çağrılarını yeni bir SpanRecorder'a yönlendirir."""
+    recorder = SpanRecorder()
+    token = _current_recorder.set(recorder)
+    depth_token = _span_depth.set(0)
+    try:
+        yield recorder
+    finally:
+        _span_depth.reset(depth_token)
+        _current_recorder.reset(token)
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    with span("encode", frames=n) as attrs: ... — süreyi ölçer ve aktif recorder'a yazar.
+    attrs sözlüğü blok içinde güncellenebilir. Recorder yoksa hiçbir şey kaydetmez.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        yield attrs
+        return
+
+    depth = _span_depth.get()
+    entry = {"name": name, "start": round(recorder.elapsed(), 4), "depth": depth}
+    depth_token = _span_depth.set(depth + 1)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield attrs
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _span_depth.reset(depth_token)
+        entry["duration"] = round(duration, 4)
+        entry["status"] = status
+        if "frames" in attrs and duration > 0:
+            attrs.setdefault("fps", round(attrs["frames"] / duration, 2))
+        if attrs:
+            entry["attrs"] = attrs
+        recorder._append(entry)
+        logger.debug(f"span {name}: {duration:.3f}s {attrs or ''}")
+
+
+class StepCancelled(Exception):
+    """Adım kullanıcı tarafından iptal edildi; dinleyiciler bir sonraki olayda fırlatır."""
+
+
+_progress_listener = contextvars.ContextVar("progress_listener", default=None)
+_event_listener = contextvars.ContextVar("event_listener", default=None)
+
+
+@contextmanager
+def progress_listener(callback):
+    """Blok içindeki report_progress() çağrılarını callback(fraction, message) ile iletir."""
+    token = _progress_listener.set(callback)
+    try:
+        yield
+    finally:
+        _progress_listener.reset(token)
+
+
+def report_progress(done, total, message=None):
+    """Uzun adımların (görsel döngüsü, encode) ilerlemesi; dinleyici yoksa hiçbir şey yapmaz."""
+    callback = _progress_listener.get()
+    if callback is None or not total:
+        return
+    fraction = min(max(done / total, 0.0), 1.0)
+    try:
+        callback(fraction, message)
+    except StepCancelled:
+        raise
+    except Exception:
+        logger.exception("Progress listener failed")
+    emit_event("progress", progress=round(fraction, 4), message=message)
+
+
+@contextmanager
+def event_listener(callback):
+    """Blok içindeki emit_event() çağrılarını callback(kind, data) ile iletir (canlı ilerleme akışı)."""
+    token = _event_listener.set(callback)
+    try:
+        yield
+    finally:
+        _event_listener.reset(token)
+
+
+def emit_event(kind, **data):
+    """
+    İnce taneli olay: görsel i/N, Whisper segmenti, encode karesi... Dinleyici yoksa hiçbir şey yapmaz.
+    Dinleyici StepCancelled fırlatırsa çağırana iletilir; uzun döngüler böylece iptal edilebilir.
+    """
+    callback = _event_listener.get()
+    if callback is None:
+        return
+    try:
+        callback(kind, data)
+    except StepCancelled:
+        raise
+    except Exception:
+        logger.exception("Event listener failed")
@@ -0,0 +1,112 @@
+# core/services/ken_burns.py
+
+import logging
+
+import numpy as np
+from PIL import Image
+from django.conf import settings
+from moviepy import VideoClip
+
+logger = logging.getLogger(__name__)
+
+
+def load_cover_canvas(img_path, size):
+    """
+    Görseli bir kez decode edip en-boy oranını bozmadan `size` tuvalini dolduracak şekilde
+    ölçekler ve ortadan kırpar. img_path bir PIL Image da olabilir.
+    """
+    width, height = size
+    if isinstance(img_path, Image.Image):
+        # Önceden decode edilmiş görsel (birden çok çıktı profili aynı görseli paylaşır)
+        img = img_path if img_path.mode == "RGB" else img_path.convert("RGB")
+    else:
+        with Image.open(img_path) as src:
+            img = src.convert("RGB")
+
+    scale = max(width / img.width, height / img.height)
+    scaled = img.resize((max(width, round(img.width * scale)), max(height, round(img.height * scale))), Image.LANCZOS)
+    left = (scaled.width - width) // 2
+    top = (scaled.height - height) // 2
+    return scaled.crop((left, top, left + width, top + height))
+
+
+class KenBurnsZoom:
+    """
+    Merkezden yakınlaşan zoom efekti. Görsel, en yüksek zoom'da bile çıktıdan küçük kalmayacak
+    kadar büyük bir tuvale bir kez ölçeklenir; her kare bu tuvalden kayan bir pencerenin
+    tek bir bilinear resample ile çıktı boyutuna indirilmesiyle üretilir.
+    """
+
+    def __init__(self, img_path, resolution, duration, zoom_ratio=0.2, zoom_duration=None):
+        self.resolution = tuple(resolution)
+        self.duration = duration
+        self.zoom_ratio = zoom_ratio
+        self.zoom_duration = zoom_duration or duration
+
+        # Geçiş süresince de zoom devam eder; tuvali en büyük zoom'a göre boyutla
+        self.max_zoom = 1.0 + zoom_ratio * (duration / self.zoom_duration)
+        canvas_size = (
+            int(np.ceil(self.resolution[0] * self.max_zoom)),
+            int(np.ceil(self.resolution[1] * self.max_zoom)),
+        )
+        self.canvas = load_cover_canvas(img_path, canvas_size)
+        self._last_t = None
+        self._last_frame = None
+        self._frames = None
+
+    def zoom_at(self, t):
+        return 1.0 + self.zoom_ratio * (t / self.zoom_duration)
+
+    def window_at(self, t):
+        """t anındaki kırpma penceresi (tuval koordinatlarında, alt-piksel hassasiyetli)."""
+        zoom = self.zoom_at(t)
+        cw, ch = self.canvas.size
+        win_w = cw / zoom
+        win_h = ch / zoom
+        left = (cw - win_w) / 2
+        top = (ch - win_h) / 2
+        return (left, top, left + win_w, top + win_h)
+
+    def render(self, t):
+        # box parametresi pencereyi kopyalamadan doğrudan örnekler
+        frame = self.canvas.resize(self.resolution, Image.BILINEAR, box=self.window_at(t))
+        return np.asarray(frame)
+
+    def precompute(self, fps):
+        """Kısa klipler için tüm zoom dizisini önceden hesaplar; kareler tek bir dizide tutulur."""
+        count = int(np.ceil(self.duration * fps)) + 1
+        frames = np.empty((count, self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+        for i in range(count):
+            frames[i] = self.render(min(i / fps, self.duration))
+        self._frames = frames
+        self._fps = fps
+        # Tuvale artık gerek yok
+        self.canvas = None
+        return self
+
+    def frame(self, t):
+        if self._frames is not None:
+            idx = min(int(round(t * self._fps)), len(self._frames) - 1)
+            return self._frames[idx]
+
+        if t == self._last_t:
+            return self._last_frame
+        self._last_t = t
+        self._last_frame = self.render(t)
+        return self._last_frame
+
+
+def ken_burns_clip(img_path, resolution, duration, zoom_ratio=0.2, zoom_duration=None, precompute=None, fps=24):
+    """
+    ImageClip + Resize(lambda) + Resize(resolution) zincirinin yerini alan zoom klibi.
+
+    precompute None ise settings.KEN_BURNS_PRECOMPUTE_SECONDS'tan kısa klipler önceden hesaplanır.
+    """
+    zoom = KenBurnsZoom(img_path, resolution, duration, zoom_ratio=zoom_ratio, zoom_duration=zoom_duration)
+
+    if precompute is None:
+        precompute = duration <= getattr(settings, "KEN_BURNS_PRECOMPUTE_SECONDS", 0)
+    if precompute:
+        zoom.precompute(fps)
+
+    return VideoClip(frame_function=zoom.frame, duration=duration)
@@ -0,0 +1,302 @@
+# core/services/parallel_render.py
+
+import os
+import math
+import shutil
+import logging
+import tempfile
+import multiprocessing
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ffmpeg
+from moviepy import CompositeVideoClip
+
+from core.services.ffmpeg_composer import get_ffmpeg_binary, probe_duration
+from core.services.instrumentation import StepCancelled, report_progress, span
+from core.services.render_cache import file_digest, make_key
+from core.services.subtitle_renderer import build_subtitle_clip
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Segment:
+    index: int
+    first_image: int    # bu segmentte başlayan ilk görsel
+    last_image: int     # hariç
+    start_frame: int
+    end_frame: int      # hariç
+
+
+def plan_segments(image_count, clip_duration, transition_duration, fps, images_per_segment):
+    """
+    Zaman çizelgesini görsel sınırlarından böler. Kesimler kare sınırına yuvarlanır ki
+    segmentler uç uca eklendiğinde tek süreçte render edilmiş videoyla aynı kareler çıksın.
+    """
+    # MoviePy int(süre * fps) kare yazar; toplam kare sayısı tek süreçli render'la aynı olsun
+    total_frames = int((image_count * clip_duration + transition_duration) * fps)
+    segments = []
+
+    for index, first in enumerate(range(0, image_count, images_per_segment)):
+        last = min(first + images_per_segment, image_count)
+        start_frame = int(round(first * clip_duration * fps))
+        end_frame = total_frames if last == image_count else int(round(last * clip_duration * fps))
+        segments.append(Segment(index, first, last, start_frame, end_frame))
+
+    return segments
+
+
+def render_segment(job):
+    """
+    Worker süreçte tek bir segmenti sadece görüntü olarak (sessiz) encode eder.
+    Süreçler arası taşınabilmesi için modül seviyesinde tanımlı.
+    """
+    from core.services.video_composer import build_image_clip
+
+    segment = job["segment"]
+    fps = job["fps"]
+    clip_duration = job["clip_duration"]
+    t0 = segment.start_frame / fps
+    t1 = segment.end_frame / fps
+
+    # Kesimden önce başlayan görsel crossfade boyunca hâlâ görünür; onu da segmente dahil et
+    first_clip = max(segment.first_image - 1, 0)
+    layers = []
+    for idx in range(first_clip, segment.last_image):
+        clip = build_image_clip(
+            job["images"][idx], idx, job["resolution"], clip_duration,
+            job["transition_duration"], job["zoom_ratio"], precompute=False, fps=fps,
+        )
+        layers.append(clip.with_start(idx * clip_duration))
+
+    window_subs = [sub for sub in job["subtitles"] if sub[0][1] > t0 and sub[0][0] < t1]
+    if window_subs:
+        subtitle_layer = build_subtitle_clip(
+            window_subs, job["resolution"], job["font_path"], duration=t1, font_scale=job["subtitle_scale"],
+        )
+        if subtitle_layer is not None:
+            layers.append(subtitle_layer)
+
+    frame_count = segment.end_frame - segment.start_frame
+    video = (
+        CompositeVideoClip(layers, size=job["resolution"])
+        .with_duration(t1 + 1.0 / fps)
+        # Yarım kare pay: MoviePy int(duration * fps) kare yazar, float hatası bir kare kaybettirmesin
+        .subclipped(t0, t0 + (frame_count + 0.5) / fps)
+    )
+    video.write_videofile(
+        job["output_path"],
+        fps=fps,
+        codec="libx264",
+        audio=False,
+        preset=job["preset"],
+        pixel_format="yuv420p",
+        logger=None,
+    )
+    return job["output_path"]
+
+
+def _concat_list_entry(path):
+    escaped = path.replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def mix_audio(audio_path, output_path, music_path=None):
+    """Ses (ve varsa müzik) tek bir AAC dosyasına miks edilir; final mux'ta kopyalanır."""
+    audio = ffmpeg.input(audio_path).audio
+    if music_path and os.path.isfile(music_path):
+        music = ffmpeg.input(music_path).audio.filter("volume", 0.3)
+        audio = ffmpeg.filter([audio, music], "amix", inputs=2, duration="first", normalize=0)
+
+    (
+        ffmpeg
+        .output(audio, output_path, acodec="aac", audio_bitrate="192k")
+        .overwrite_output()
+        .run(cmd=get_ffmpeg_binary(), capture_stdout=True, capture_stderr=True)
+    )
+    return output_path
+
+
+def concat_segments(segment_paths, audio_path, output_path, work_dir):
+    """Segmentleri concat demuxer ile yeniden encode etmeden birleştirir, hazır sesi tek seferde ekler."""
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            f.write(_concat_list_entry(path))
+
+    video = ffmpeg.input(list_path, format="concat", safe=0).video
+    audio = ffmpeg.input(audio_path).audio
+
+    (
+        ffmpeg
+        .output(video, audio, output_path, vcodec="copy", acodec="copy", movflags="+faststart")
+        .overwrite_output()
+        .run(cmd=get_ffmpeg_binary(), capture_stdout=True, capture_stderr=True)
+    )
+    return output_path
+
+
+def _segment_key(job, font_digest):
+    segment = job["segment"]
+    first_clip = max(segment.first_image - 1, 0)
+    t0 = segment.start_frame / job["fps"]
+    t1 = segment.end_frame / job["fps"]
+    return make_key(
+        "segment",
+        images=[file_digest(path) for path in job["images"][first_clip:segment.last_image]],
+        first_image=segment.first_image,
+        frames=[segment.start_frame, segment.end_frame],
+        resolution=list(job["resolution"]),
+        fps=job["fps"],
+        preset=job["preset"],
+        clip_duration=round(job["clip_duration"], 6),
+        transition_duration=job["transition_duration"],
+        zoom_ratio=job["zoom_ratio"],
+        # Altyazı katmanı segmente gömülü; sadece bu pencereye düşen cue'lar anahtara girer
+        subtitles=[sub for sub in job["subtitles"] if sub[0][1] > t0 and sub[0][0] < t1],
+        subtitle_scale=job["subtitle_scale"],
+        font=font_digest,
+    )
+
+
+def compose_video_parallel(
+    images,
+    audio_path,
+    output_path="output.mp4",
+    music_path=None,
+    resolution=(1280, 720),
+    srt_path=None,
+    transition_duration=1.0,
+    zoom_ratio=0.2,
+    workers=2,
+    segment_images=None,
+    fps=24,
+    preset="medium",
+    subtitle_scale=1.0,
+    cache=None,
+):
+    """
+    compose_video'nun MoviePy yolunu segmentlere bölüp her segmenti ayrı bir süreçte render eder.
+    segment_images verilmezse görseller worker sayısına eşit bölünür.
+
+    cache (RenderCache) verilirse segmentler ve miks ses içerik hash'iyle saklanır; sonraki
+    render'da sadece girdisi değişen segmentler yeniden encode edilir, gerisi remux edilir.
+    """
+    from core.services.video_composer import read_srt, subtitle_font_path
+
+    work_dir = None
+    try:
+        print(f"🎬 Starting segmented video composition ({workers} workers)")
+
+        if not images:
+            logger.error("No images provided.")
+            return None
+
+        with span("audio_load"):
+            audio_duration = probe_duration(audio_path)
+        clip_duration = audio_duration / len(images)
+        # Cache açıkken görsel başına segment: tek bir görsel değişince sadece onun segmenti yeniden encode edilir
+        segment_images = segment_images or (1 if cache is not None else math.ceil(len(images) / workers))
+        segments = plan_segments(len(images), clip_duration, transition_duration, fps, segment_images)
+        print(f"🧩 {len(segments)} segments, {segment_images} image(s) each")
+
+        with span("subtitle_build"):
+            subtitles = read_srt(srt_path) if srt_path and os.path.isfile(srt_path) else []
+
+        work_dir = tempfile.mkdtemp(prefix="segments_", dir=os.path.dirname(os.path.abspath(output_path)))
+        jobs = [
+            {
+                "segment": segment,
+                "images": images,
+                "resolution": tuple(resolution),
+                "clip_duration": clip_duration,
+                "transition_duration": transition_duration,
+                "zoom_ratio": zoom_ratio,
+                "subtitles": subtitles,
+                "font_path": subtitle_font_path(),
+                "fps": fps,
+                "preset": preset,
+                "subtitle_scale": subtitle_scale,
+                "output_path": os.path.join(work_dir, f"segment_{segment.index:04d}.mp4"),
+            }
+            for segment in segments
+        ]
+
+        segment_paths = [job["output_path"] for job in jobs]
+        pending = jobs
+        if cache is not None:
+            font_digest = file_digest(subtitle_font_path()) if subtitles else None
+            pending = []
+            for idx, job in enumerate(jobs):
+                job["cache_key"] = _segment_key(job, font_digest)
+                cached = cache.get("segment", job["cache_key"], ".mp4")
+                if cached:
+                    segment_paths[idx] = cached
+                else:
+                    pending.append(job)
+            print(f"♻️ Render cache: {len(jobs) - len(pending)}/{len(jobs)} segments reused")
+
+        if pending:
+            frames = sum(job["segment"].end_frame - job["segment"].start_frame for job in pending)
+            # Segment süreçlerinde klip kurulumu ve encode birlikte ölçülür
+            with span("encode", backend="segmented", segments=len(pending), workers=workers, frames=frames):
+                if workers > 1 and len(pending) > 1:
+                    # spawn: Django'nun thread'li süreçlerinden fork etmek kilitlenmelere yol açabiliyor
+                    context = multiprocessing.get_context("spawn")
+                    pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context)
+                    try:
+                        futures = [pool.submit(render_segment, job) for job in pending]
+                        for done, future in enumerate(as_completed(futures), start=1):
+                            future.result()
+                            # İptal burada fark edilir (worker süreçlerde dinleyici yok)
+                            report_progress(done, len(pending), f"Segment {done}/{len(pending)}")
+                    finally:
+                        # İptal veya hata: henüz başlamamış segmentler render edilmez
+                        pool.shutdown(cancel_futures=True)
+                else:
+                    for done, job in enumerate(pending, start=1):
+                        render_segment(job)
+                        report_progress(done, len(pending), f"Segment {done}/{len(pending)}")
+
+        if cache is not None:
+            for job in pending:
+                segment_paths[job["segment"].index] = cache.put("segment", job["cache_key"], ".mp4", job["output_path"])
+
+        audio_key = None
+        mixed_audio = None
+        if cache is not None:
+            audio_key = make_key(
+                "audio",
+                voice=file_digest(audio_path),
+                music=file_digest(music_path) if music_path and os.path.isfile(music_path) else None,
+            )
+            mixed_audio = cache.get("audio", audio_key, ".m4a")
+        if not mixed_audio:
+            with span("audio_mix"):
+                mixed_audio = mix_audio(audio_path, os.path.join(work_dir, "audio.m4a"), music_path=music_path)
+            if cache is not None:
+                mixed_audio = cache.put("audio", audio_key, ".m4a", mixed_audio)
+
+        print(f"💾 Joining segments into {output_path}")
+        with span("concatenation", segments=len(segment_paths), reused=len(jobs) - len(pending)):
+            concat_segments(segment_paths, mixed_audio, output_path, work_dir)
+
+        if cache is not None:
+            cache.evict()
+
+        print("✅ Video composition finished successfully")
+        return output_path
+
+    except StepCancelled:
+        raise
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode("utf-8", errors="ignore")[-2000:] if e.stderr else ""
+        logger.error(f"❌ Segment concat failed: {stderr}")
+        return None
+    except Exception as e:
+        logger.exception(f"❌ Failed to compose video in parallel: {str(e)}")
+        return None
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
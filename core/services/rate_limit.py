@@ -0,0 +1,69 @@
+# core/services/rate_limit.py
+
+import time
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Basit token bucket: dakikada `rate_per_minute` token dolar, en fazla `capacity` birikir.
+    acquire() token yoksa bir sonraki token'a kadar bekler; thread-safe.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity or max(1, int(rate_per_minute)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """Token varsa alır ve 0 döner; yoksa kaç saniye beklenmesi gerektiğini döner."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1, timeout=None):
+        """Token alınana kadar bekler; timeout dolarsa False döner."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def key_fingerprint(api_key):
+    """Anahtarın kendisini bellekte/loglarda taşımamak için kısa özeti."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def bucket_for(scope, api_key, rate_per_minute, capacity=None):
+    """
+    (scope, API anahtarı) başına süreç genelinde tek bucket. Aynı anahtarı kullanan bütün işler
+    (farklı videolar, paralel adımlar) aynı limiti paylaşır.
+    """
+    key = (scope, key_fingerprint(api_key))
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None or bucket.rate != rate_per_minute / 60.0:
+            bucket = TokenBucket(rate_per_minute, capacity)
+            _buckets[key] = bucket
+        return bucket
@@ -0,0 +1,151 @@
+# core/services/render_cache.py
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Render çıktısını etkileyen kod değişirse artırılır; eski girdiler anahtar uyuşmadığı için kullanılmaz
+RENDER_CACHE_VERSION = 1
+
+_digest_lock = threading.Lock()
+_digest_memo = {}
+
+
+def file_digest(path):
+    """Dosya içeriğinin sha256'sı. (yol, boyut, mtime) aynı kaldıkça süreç içinde tekrar okunmaz."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digest_memo.get(memo_key)
+    if digest:
+        return digest
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def make_key(kind, **parts):
+    """Girdi parçalarından (hash'ler, parametreler) deterministik bir anahtar üretir."""
+    payload = json.dumps({"kind": kind, "version": RENDER_CACHE_VERSION, **parts}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    MEDIA_ROOT altında içerik adresli render ara çıktıları (segmentler, miks ses).
+    Toplam boyut max_bytes'ı aşınca en uzun süredir kullanılmayan girdiler silinir (LRU, mtime ile);
+    yakın zamanda kullanılanlar sınır aşılsa da korunur.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.path.join(settings.MEDIA_ROOT, "render_cache")
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, "RENDER_CACHE_MAX_BYTES", 5 * 1024 ** 3
+        )
+        self.evict_grace_seconds = getattr(settings, "RENDER_CACHE_EVICT_GRACE_SECONDS", 3600)
+
+    def path_for(self, kind, key, suffix):
+        return os.path.join(self.root, kind, key[:2], f"{key}{suffix}")
+
+    def get(self, kind, key, suffix):
+        path = self.path_for(kind, key, suffix)
+        if not os.path.isfile(path):
+            return None
+        # LRU için son kullanım zamanını güncelle
+        os.utime(path, None)
+        return path
+
+    def put(self, kind, key, suffix, src_path):
+        """src_path dosyayı cache'e taşır ve cache içindeki yolu döner."""
+        path = self.path_for(kind, key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Aynı anahtarı yazan iki render çakışmasın: önce geçici ada taşı, sonra atomik replace
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        shutil.move(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def entries(self):
+        """(yol, boyut, mtime, tür) listesi."""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                kind = os.path.relpath(path, self.root).split(os.sep)[0]
+                result.append((path, stat.st_size, stat.st_mtime, kind))
+        return result
+
+    def stats(self):
+        entries = self.entries()
+        kinds = {}
+        for _, size, _, kind in entries:
+            count, total = kinds.get(kind, (0, 0))
+            kinds[kind] = (count + 1, total + size)
+        return {
+            "root": self.root,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _, _ in entries),
+            "max_bytes": self.max_bytes,
+            "kinds": {kind: {"entries": count, "bytes": total} for kind, (count, total) in sorted(kinds.items())},
+        }
+
+    def evict(self, max_bytes=None, grace_seconds=None):
+        """
+        Toplam boyut sınırın altına inene kadar en eski girdileri siler; silinen bayt sayısını döner.
+        Son grace_seconds içinde yazılan/okunan girdiler silinmez: eşzamanlı bir render get() ile aldığı
+        segmenti henüz birleştirmemiş olabilir.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        grace = self.evict_grace_seconds if grace_seconds is None else grace_seconds
+        cutoff = time.time() - grace
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _, _ in entries)
+        freed = 0
+
+        for path, size, mtime, _ in entries:
+            if total <= limit or mtime > cutoff:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            freed += size
+
+        if freed:
+            logger.info(f"Render cache evicted {freed} bytes (limit {limit})")
+        return freed
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def get_render_cache():
+    if not getattr(settings, "RENDER_CACHE_ENABLED", False):
+        return None
+    return RenderCache()
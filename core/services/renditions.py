@@ -0,0 +1,194 @@
+# core/services/renditions.py
+
+import os
+import shutil
+import logging
+import tempfile
+import threading
+import contextvars
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from core.services.ffmpeg_composer import probe_duration
+from core.services.frame_stream import TimelineFrameSource, stream_to_ffmpeg_outputs
+from core.services.instrumentation import StepCancelled, span
+from core.services.parallel_render import mix_audio
+from core.services.subtitle_renderer import make_subtitle_renderer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    name: str                   # panels.PlatformChoices değeri veya serbest bir ad
+    resolution: tuple
+    fps: int = 30
+    video_bitrate: str = None   # örn. "8M"; boşsa x264 CRF varsayılanı
+
+
+# Platform başına varsayılan çıktı profilleri (anahtarlar panels.PlatformChoices değerleri)
+PLATFORM_PROFILES = {
+    "YOUTUBE_SHORTS": OutputProfile("YOUTUBE_SHORTS", (1080, 1920), 30, "8M"),
+    "INSTAGRAM_REELS": OutputProfile("INSTAGRAM_REELS", (1080, 1920), 30, "6M"),
+    "TIKTOK": OutputProfile("TIKTOK", (1080, 1920), 30, "6M"),
+    "YOUTUBE_LONG": OutputProfile("YOUTUBE_LONG", (1920, 1080), 30, "10M"),
+}
+
+
+def platform_profiles(platforms=None):
+    """Verilen platformların (varsayılan: hepsi) profilleri."""
+    platforms = platforms or PLATFORM_PROFILES.keys()
+    return [PLATFORM_PROFILES[platform] for platform in platforms]
+
+
+class SharedImageDecoder:
+    """
+    Görselleri bir kez decode edip bütün profillerin frame kaynaklarına dağıtır. Kaynaklar aşağı yukarı
+    aynı hızda ilerlediği için küçük bir LRU yeterli; çıkarılan görsel gerekirse yeniden decode edilir.
+    """
+
+    def __init__(self, max_images=4):
+        self.max_images = max_images
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self.decodes = 0
+
+    def __call__(self, path):
+        with self._lock:
+            image = self._images.get(path)
+            if image is not None:
+                self._images.move_to_end(path)
+                return image
+
+            with Image.open(path) as src:
+                image = src.convert("RGB")
+            self.decodes += 1
+            self._images[path] = image
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+            return image
+
+
+def group_profiles(profiles):
+    """Profilleri (çözünürlük, fps) ile gruplar; bir grubun kareleri bir kez üretilir."""
+    groups = OrderedDict()
+    for profile in profiles:
+        groups.setdefault((tuple(profile.resolution), profile.fps), []).append(profile)
+    return groups
+
+
+def rendition_path(output_path, profile):
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}_{profile.name.lower()}{ext or '.mp4'}"
+
+
+def compose_renditions(
+    images,
+    audio_path,
+    profiles,
+    output_path="output.mp4",
+    music_path=None,
+    srt_path=None,
+    transition_duration=1.0,
+    zoom_ratio=0.2,
+    preset="medium",
+    workers=None,
+):
+    """
+    Aynı hikâyeyi birden çok çıktı profilinde tek seferde üretir. Ses bir kez miks edilir, altyazı bir kez
+    okunur ve her çözünürlük için bir kez yerleştirilir, görseller bir kez decode edilir. Aynı çözünürlük ve
+    fps'teki profiller tek bir grup olur: kareler grup başına bir kez üretilip her profilin ffmpeg'ine
+    (kendi bitrate'iyle) yazılır; gruplar paralel çalışır.
+    {profil adı: dosya yolu} döner; başarısız profiller sonuçta yer almaz.
+    """
+    from core.services.video_composer import read_srt, subtitle_font_path
+
+    work_dir = None
+    try:
+        print(f"🎬 Starting multi-profile composition ({', '.join(p.name for p in profiles)})")
+
+        if not images or not profiles:
+            logger.error("No images or output profiles provided.")
+            return None
+
+        with span("audio_load"):
+            audio_duration = probe_duration(audio_path)
+        print(f"🔊 Audio loaded. Duration: {audio_duration:.2f}s")
+
+        work_dir = tempfile.mkdtemp(prefix="renditions_", dir=os.path.dirname(os.path.abspath(output_path)))
+        with span("audio_mix"):
+            mixed_audio = mix_audio(audio_path, os.path.join(work_dir, "audio.m4a"), music_path=music_path)
+
+        groups = group_profiles(profiles)
+        with span("subtitle_build", layouts=len({resolution for resolution, _ in groups})):
+            subtitles = read_srt(srt_path) if srt_path and os.path.isfile(srt_path) else None
+            layouts = {}
+            if subtitles:
+                for resolution, _ in groups:
+                    if resolution not in layouts:
+                        layouts[resolution] = make_subtitle_renderer(subtitles, resolution, subtitle_font_path())
+
+        decoder = SharedImageDecoder(max_images=2 * len(groups) + 2)
+        clip_duration = audio_duration / len(images)
+
+        def render(resolution, fps, group):
+            renderer = layouts.get(resolution)
+            source = TimelineFrameSource(
+                images,
+                resolution,
+                clip_duration=clip_duration,
+                transition_duration=transition_duration,
+                zoom_ratio=zoom_ratio,
+                decoder=decoder,
+                # Aynı çözünürlükte farklı fps'li gruplar yerleşimi paylaşır, çizim durumunu paylaşmaz
+                subtitle_renderer=renderer.fork() if renderer else None,
+            )
+            paths = {profile.name: rendition_path(output_path, profile) for profile in group}
+            print(
+                f"💾 Encoding {', '.join(profile.name for profile in group)} "
+                f"{resolution[0]}x{resolution[1]}@{fps} → {', '.join(paths.values())}"
+            )
+            errors = stream_to_ffmpeg_outputs(
+                source, [(paths[profile.name], profile.video_bitrate) for profile in group], mixed_audio,
+                fps=fps, preset=preset, audio_codec="copy",
+            )
+            return {name: (path, errors[path]) for name, path in paths.items()}
+
+        results = {}
+        frames = sum(int(round((audio_duration + transition_duration) * fps)) for _, fps in groups)
+        with span("encode", backend="renditions", profiles=len(profiles), groups=len(groups), frames=frames):
+            with ThreadPoolExecutor(max_workers=workers or len(groups)) as pool:
+                # İlerleme/span dinleyicileri worker thread'lere de taşınsın
+                futures = {
+                    key: pool.submit(contextvars.copy_context().run, render, *key, group)
+                    for key, group in groups.items()
+                }
+                for (resolution, fps), future in futures.items():
+                    try:
+                        outputs = future.result()
+                    except StepCancelled:
+                        raise
+                    except Exception as e:
+                        logger.exception(f"❌ Renditions {resolution[0]}x{resolution[1]}@{fps} failed: {str(e)}")
+                        continue
+                    for name, (path, error) in outputs.items():
+                        if error:
+                            logger.error(f"❌ Rendition {name} failed: {str(error)}")
+                        else:
+                            results[name] = path
+
+        print(f"🖼️ {decoder.decodes} image decodes for {len(images)} images × {len(groups)} frame groups")
+        print(f"✅ {len(results)}/{len(profiles)} renditions finished")
+        return results or None
+
+    except StepCancelled:
+        raise
+    except Exception as e:
+        logger.exception(f"❌ Failed to compose renditions: {str(e)}")
+        return None
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,346 @@
+# core/services/resilience.py
+
+import re
+import time
+import random
+import logging
+import threading
+import email.utils
+
+import httpx
+from django.conf import settings
+
+from core.services.instrumentation import emit_event, span
+from core.services.rate_limit import key_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Sunucu tarafı geçici hatalar: yeniden denenir ve sağlayıcının devre kesicisine hata olarak yazılır
+SERVER_ERROR_STATUS = (408, 500, 502, 503, 504, 520, 522, 524)
+# Bağlantı hatası türleri (openai SDK kendi sınıflarına sarar); SDK'ları içe aktarmadan adla tanınır
+NETWORK_ERROR_NAMES = ("APIConnectionError", "APITimeoutError")
+
+THROTTLED = "throttled"
+SERVER = "server"
+NETWORK = "network"
+
+
+class CircuitOpenError(RuntimeError):
+    """Sağlayıcının devresi açık: istek gönderilmeden hemen başarısız olur."""
+
+
+def parse_retry_after(headers):
+    """Retry-After (saniye veya HTTP tarihi) / retry-after-ms başlığından beklenecek süre; yoksa None."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    if re.fullmatch(r"\s*\d+(\.\d+)?\s*", value):
+        return float(value)
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+def classify_error(exc):
+    """
+    (tür, HTTP durumu, retry_after) döner; tür THROTTLED, SERVER, NETWORK veya None (yeniden denenmez).
+    Ajanlar SDK hatasını RuntimeError'a sardığı için __cause__/__context__ zinciri de taranır.
+    """
+    seen = 0
+    while exc is not None and seen < 5:
+        response = getattr(exc, "response", None)
+        status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+        if isinstance(status, int):
+            headers = getattr(exc, "headers", None) or getattr(response, "headers", None)
+            if status == 429:
+                return THROTTLED, status, parse_retry_after(headers)
+            if status in SERVER_ERROR_STATUS:
+                return SERVER, status, parse_retry_after(headers)
+            return None, status, None
+        if isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError)) or \
+                any(klass.__name__ in NETWORK_ERROR_NAMES for klass in type(exc).__mro__):
+            return NETWORK, None, None
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return None, None, None
+
+
+def backoff_delay(attempt, retry_after=None, base=None, cap=None):
+    """
+    attempt. tekrar için bekleme: üstel artan aralıkta tam jitter (eşzamanlı istemciler aynı anda dönmesin).
+    Sunucu Retry-After verdiyse ondan önce denenmez; üstüne küçük bir jitter eklenir.
+    """
+    base = getattr(settings, "AGENT_RETRY_BASE_DELAY", 0.5) if base is None else base
+    cap = getattr(settings, "AGENT_RETRY_MAX_DELAY", 30.0) if cap is None else cap
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class AdaptiveLimiter:
+    """
+    API anahtarı başına AIMD eşzamanlılık sınırı: her başarılı çağrıda sınır 1/sınır kadar artar
+    (yaklaşık her tam turda +1), 429'da `decrease` ile çarpılır. Aynı turda gelen 429'lar sınırı bir kez
+    düşürür: yalnızca son düşüşten sonra başlamış çağrılar sayılır. 429 Retry-After taşıyorsa anahtarın
+    bütün çağrıları o süre dolana kadar bekler; her biri ayrı ayrı deneyip yeni 429 almaz.
+    """
+
+    def __init__(self, initial=None, minimum=None, maximum=None, decrease=0.5):
+        self.minimum = max(1, minimum or getattr(settings, "AGENT_CONCURRENCY_MIN", 1))
+        self.maximum = max(self.minimum, maximum or getattr(settings, "AGENT_CONCURRENCY_MAX", 16))
+        initial = initial or getattr(settings, "AGENT_CONCURRENCY_INITIAL", 4)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.decrease = decrease
+        self.in_flight = 0
+        self.counters = {"successes": 0, "throttled": 0, "errors": 0, "decreases": 0}
+        self._epoch = 0
+        self._resume_at = 0.0
+        self._cond = threading.Condition()
+
+    def _has_room(self, now):
+        return self.in_flight < int(self.limit) and now >= self._resume_at
+
+    def try_acquire(self):
+        """Yer varsa slot alır ve bilet döner; yoksa None."""
+        with self._cond:
+            if not self._has_room(time.monotonic()):
+                return None
+            self.in_flight += 1
+            return self._epoch
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._has_room(now):
+                    self.in_flight += 1
+                    return self._epoch
+                waits = [self._resume_at - now] if self._resume_at > now else []
+                if deadline is not None:
+                    if now >= deadline:
+                        return None
+                    waits.append(deadline - now)
+                self._cond.wait(min(waits) if waits else None)
+
+    def release(self, ticket, outcome, retry_after=None):
+        """outcome: 'success', 'throttled' veya 'error' (sınırı değiştirmez)."""
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == THROTTLED and retry_after:
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+            if outcome == "success":
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self.counters["successes"] += 1
+            elif outcome == THROTTLED:
+                self.counters["throttled"] += 1
+                if ticket == self._epoch:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self.counters["decreases"] += 1
+                    self._epoch += 1
+            else:
+                self.counters["errors"] += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return dict(limit=round(self.limit, 2), in_flight=self.in_flight, **self.counters)
+
+
+class CircuitBreaker:
+    """
+    Sağlayıcı başına devre kesici. Art arda `failure_threshold` sunucu/bağlantı hatasında açılır ve
+    `reset_timeout` boyunca istekleri göndermeden reddeder; süre dolunca tek bir deneme isteğine izin verir
+    (yarı açık), o başarılı olursa kapanır. 429 ve istemci hataları sağlayıcının ayakta olduğunu gösterir.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or getattr(settings, "CIRCUIT_BREAKER_FAILURE_THRESHOLD", 5)
+        self.reset_timeout = reset_timeout if reset_timeout is not None else getattr(settings, "CIRCUIT_BREAKER_RESET_SECONDS", 30)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Çağrıya izin verilmiyorsa CircuitOpenError fırlatır."""
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"{self.name} circuit open after {self.failures} failures, retry in {remaining:.0f}s")
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(f"{self.name} circuit half-open, probe request in flight")
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                logger.warning(f"{self.name} circuit opened after {self.failures} consecutive failures")
+
+    def stats(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "opened": self.opened}
+
+
+_limiters = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def limiter_for(provider, model, api_key):
+    """(sağlayıcı, model, API anahtarı) başına süreç genelinde tek limiter; hesap limitleri model başınadır."""
+    key = (provider, model, key_fingerprint(api_key))
+    with _registry_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = AdaptiveLimiter()
+        return limiter
+
+
+def breaker_for(provider):
+    with _registry_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+
+def resilience_stats():
+    with _registry_lock:
+        limiters, breakers = dict(_limiters), dict(_breakers)
+    return {
+        "breakers": {name: breaker.stats() for name, breaker in sorted(breakers.items())},
+        "limiters": {f"{provider}:{model}:{fingerprint}": limiter.stats() for (provider, model, fingerprint), limiter in limiters.items()},
+    }
+
+
+class ResilientCall:
+    """
+    Tek bir ajan çağrısının denemeleri: devre kontrolü, limiter slotu, hata sınıflandırması ve bekleme.
+    call() düz fonksiyonları, stream() ilk chunk gelene kadar yeniden denenebilen akışları sarar.
+    """
+
+    def __init__(self, provider, model, api_key, agent=None):
+        self.provider = provider
+        self.agent = agent or provider
+        self.breaker = breaker_for(provider)
+        self.limiter = limiter_for(provider, model, api_key)
+        self.max_attempts = max(1, getattr(settings, "AGENT_RETRY_MAX_ATTEMPTS", 5))
+        self.max_delay = getattr(settings, "AGENT_RETRY_MAX_DELAY", 30.0)
+        self.attempt = 0
+
+    def _acquire(self):
+        self.breaker.before_call()
+        ticket = self.limiter.try_acquire()
+        if ticket is None:
+            # Anahtarın sınırı dolu: bekleme süresi adımın span'lerinde görünsün
+            with span("agent_limit_wait", agent=self.agent, limit=int(self.limiter.limit)):
+                ticket = self.limiter.acquire()
+        return ticket
+
+    def _finish(self, ticket, exc=None, retry=True):
+        """Slotu bırakır ve sonucu limiter/devre kesiciye yazar; yeniden denenecekse (tür, durum, bekleme) döner."""
+        if exc is None:
+            self.limiter.release(ticket, "success")
+            self.breaker.record_success()
+            return None
+
+        kind, status, retry_after = classify_error(exc)
+        self.limiter.release(ticket, THROTTLED if kind == THROTTLED else "error", retry_after)
+        if kind in (SERVER, NETWORK):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        self.attempt += 1
+        if not retry or kind is None or self.attempt >= self.max_attempts:
+            return None
+        if retry_after is not None and retry_after > self.max_delay:
+            logger.warning(f"{self.agent}: Retry-After {retry_after:.0f}s exceeds AGENT_RETRY_MAX_DELAY, giving up")
+            return None
+        delay = min(self.max_delay, backoff_delay(self.attempt - 1, retry_after))
+        logger.warning(f"{self.agent}: {kind} error ({status or type(exc).__name__}), retry {self.attempt}/{self.max_attempts - 1} in {delay:.2f}s")
+        return kind, status, delay
+
+    def _wait(self, retry):
+        kind, status, delay = retry
+        # Dinleyici iptal edilmiş işte StepCancelled fırlatır; bekleme boşa sürmez
+        emit_event("agent_retry", agent=self.agent, attempt=self.attempt, reason=kind, status=status, delay=round(delay, 2))
+        with span("agent_backoff", agent=self.agent, attempt=self.attempt, reason=kind, status=status):
+            time.sleep(delay)
+
+    def call(self, fn):
+        while True:
+            ticket = self._acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                retry = self._finish(ticket, e)
+                if retry is None:
+                    raise
+                self._wait(retry)
+                continue
+            self._finish(ticket)
+            return result
+
+    def stream(self, open_stream):
+        """
+        open_stream() yeni bir chunk iteratörü döner. İlk chunk gelmeden oluşan hata yeniden denenir;
+        çağırana veri verildikten sonraki hata olduğu gibi iletilir (yarım akış tekrar edilemez).
+        """
+        while True:
+            ticket = self._acquire()
+            try:
+                iterator = iter(open_stream())
+                first = next(iterator, None)
+            except Exception as e:
+                retry = self._finish(ticket, e)
+                if retry is None:
+                    raise
+                self._wait(retry)
+                continue
+            break
+
+        finished = False
+        try:
+            if first is not None:
+                yield first
+            yield from iterator
+        except Exception as e:
+            finished = True
+            self._finish(ticket, e, retry=False)
+            raise
+        finally:
+            if not finished:
+                # Tüketici akışı erken bıraksa da slot geri verilir
+                self._finish(ticket)
@@ -0,0 +1,329 @@
+# core/services/script_alignment.py
+
+import re
+import logging
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from core.services.instrumentation import emit_event, span
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+
+# Kelimeden sonra gelen noktalamanın "burada duraklama olur" gücü
+SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)]*$")
+CLAUSE_END = re.compile(r"[;:]+[\"'”’)]*$")
+COMMA_END = re.compile(r"[,–—]+[\"'”’)]*$")
+
+# Altyazı satırı sınırları
+CUE_MAX_WORDS = 10
+CUE_MAX_SECONDS = 5.0
+
+# Bu süreden uzun sessizlik TTS'te neredeyse her zaman bir noktalamadır
+LONG_PAUSE_SECONDS = 0.35
+
+# Konuşma hızı (kelime ağırlığı/sn ≈ harf/sn) bu aralığın dışındaysa metin bu sese ait değildir.
+# TTS sesleri tipik olarak 15-20 arasındadır.
+PLAUSIBLE_CHARS_PER_SECOND = (6.0, 28.0)
+
+
+@dataclass
+class AlignedWord:
+    word: str
+    start: float
+    end: float
+
+
+@dataclass
+class AlignmentResult:
+    cues: list = field(default_factory=list)   # [{'start', 'end', 'text', 'words': [{'word', 'start', 'end'}]}]
+    confidence: float = 0.0
+    speech_regions: int = 0
+    anchors: int = 0
+
+    def to_srt(self):
+        from core.services.subtitle_generator import format_timestamp
+
+        return "".join(
+            f"{idx}\n{format_timestamp(cue['start'])} --> {format_timestamp(cue['end'])}\n{cue['text']}\n\n"
+            for idx, cue in enumerate(self.cues, start=1)
+        )
+
+
+def speech_regions(samples, sample_rate=SAMPLE_RATE, min_gap=0.08, min_speech=0.05):
+    """
+    Enerji tabanlı VAD: 20 ms karelerin RMS seviyesi gürültü tabanına göre eşiklenir. TTS çıktısı temiz
+    olduğu için sessizlikler belirgindir. [(başlangıç, bitiş)] saniye listesi döner.
+    """
+    frame = int(sample_rate * FRAME_SECONDS)
+    count = len(samples) // frame
+    if count == 0:
+        return []
+
+    frames = samples[: count * frame].reshape(count, frame)
+    level = 20 * np.log10(np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1)) + 1e-9)
+    floor, peak = np.percentile(level, 10), np.percentile(level, 95)
+    threshold = max(floor + 10.0, peak - 35.0)
+    voiced = level > threshold
+
+    regions = []
+    start = None
+    for i, is_voiced in enumerate(voiced):
+        if is_voiced and start is None:
+            start = i
+        elif not is_voiced and start is not None:
+            regions.append([start * FRAME_SECONDS, i * FRAME_SECONDS])
+            start = None
+    if start is not None:
+        regions.append([start * FRAME_SECONDS, count * FRAME_SECONDS])
+
+    # Kelime içi kısa kesintileri (patlamalı ünsüzler) birleştir, çok kısa patlamaları at
+    merged = []
+    for region in regions:
+        if merged and region[0] - merged[-1][1] < min_gap:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+    return [(s, e) for s, e in merged if e - s >= min_speech]
+
+
+def _boundary_strength(word):
+    if SENTENCE_END.search(word):
+        return 3.0
+    if CLAUSE_END.search(word):
+        return 2.0
+    if COMMA_END.search(word):
+        return 1.0
+    return 0.0
+
+
+def _word_weight(word):
+    # Harf sayısı konuşma süresinin kaba bir vekili; noktalama-only token'lar da kısa bir süre alır
+    return max(1, len(re.sub(r"\W", "", word))) + 1
+
+
+class _SpeechClock:
+    """Sessizlikleri atlayan 'konuşma zamanı' ile gerçek zaman arasında dönüşüm."""
+
+    def __init__(self, regions):
+        self.regions = regions
+        self.offsets = np.cumsum([0.0] + [e - s for s, e in regions])
+
+    @property
+    def total(self):
+        return float(self.offsets[-1])
+
+    def to_real(self, t):
+        t = min(max(t, 0.0), self.total)
+        i = int(np.searchsorted(self.offsets, t, side="right") - 1)
+        i = min(i, len(self.regions) - 1)
+        return self.regions[i][0] + (t - self.offsets[i])
+
+    def gap_position(self, k):
+        """k. sessizliğin (k. ve k+1. bölge arası) konuşma zamanındaki yeri."""
+        return float(self.offsets[k + 1])
+
+
+def _match_pauses(boundaries, expected, gap_positions, gap_lengths, total):
+    """
+    Noktalama sınırlarını (beklenen konumlarıyla) sessizliklere monoton biçimde eşler (DTW benzeri DP).
+    Eşleşmeyen uzun sessizlik ve eşleşmeyen cümle sonu cezalandırılır. [(sınır indeksi, gap indeksi)] döner.
+    """
+    m, k = len(boundaries), len(gap_positions)
+    tolerance = max(1.0, 0.08 * total)
+    neg = -1e18
+    score = np.full((m + 1, k + 1), neg)
+    back = np.zeros((m + 1, k + 1), dtype=np.int8)  # 0: eşle, 1: sınırı atla, 2: gap'i atla
+    score[0, 0] = 0.0
+
+    for i in range(m + 1):
+        for j in range(k + 1):
+            if i == 0 and j == 0:
+                continue
+            best, move = neg, 0
+            if i and j:
+                distance = abs(expected[i - 1] - gap_positions[j - 1]) / tolerance
+                candidate = score[i - 1, j - 1] + boundaries[i - 1][1] + min(gap_lengths[j - 1], 1.0) - 2.0 * distance
+                if candidate > best:
+                    best, move = candidate, 0
+            if i:
+                candidate = score[i - 1, j] - 0.5 * boundaries[i - 1][1]
+                if candidate > best:
+                    best, move = candidate, 1
+            if j:
+                candidate = score[i, j - 1] - 2.0 * min(gap_lengths[j - 1], 1.0)
+                if candidate > best:
+                    best, move = candidate, 2
+            score[i, j], back[i, j] = best, move
+
+    pairs = []
+    i, j = m, k
+    while i or j:
+        move = back[i, j]
+        if move == 0:
+            pairs.append((boundaries[i - 1][0], j - 1))
+            i, j = i - 1, j - 1
+        elif move == 1:
+            i -= 1
+        else:
+            j -= 1
+    return pairs[::-1]
+
+
+def _build_cues(words, strengths):
+    cues, current = [], []
+    for i, word in enumerate(words):
+        current.append(word)
+        duration = current[-1].end - current[0].start
+        split = strengths[i] >= 3.0 or len(current) >= CUE_MAX_WORDS or duration >= CUE_MAX_SECONDS
+        # Uzun cümleyi tercihen virgülde böl
+        if not split and strengths[i] >= 1.0 and len(current) >= CUE_MAX_WORDS // 2:
+            split = True
+        if split:
+            cues.append(current)
+            current = []
+    if current:
+        cues.append(current)
+
+    result = []
+    for idx, cue in enumerate(cues):
+        end = cue[-1].end
+        # Satır bir sonraki satıra kadar (en fazla 0.3 sn) ekranda kalsın
+        if idx + 1 < len(cues):
+            end = min(max(end, cues[idx + 1][0].start - 0.01), end + 0.3)
+        result.append({
+            "start": round(cue[0].start, 3),
+            "end": round(end, 3),
+            "text": " ".join(w.word for w in cue),
+            "words": [{"word": w.word, "start": round(w.start, 3), "end": round(w.end, 3)} for w in cue],
+        })
+    return result
+
+
+def align_script(script, regions):
+    """Bilinen metni konuşma bölgelerine hizalar; kelime ve satır zamanlarını güven skoruyla döner."""
+    words = script.split()
+    if not words or not regions:
+        return AlignmentResult(speech_regions=len(regions))
+
+    clock = _SpeechClock(regions)
+    weights = np.array([_word_weight(w) for w in words], dtype=np.float64)
+    strengths = [_boundary_strength(w) for w in words]
+    cumulative = np.cumsum(weights)
+    scale = clock.total / cumulative[-1]
+
+    # Noktalama sınırları ile sessizlikleri eşle; eşlenen çiftler çapa olur
+    boundaries = [(i, strengths[i]) for i in range(len(words) - 1) if strengths[i] > 0]
+    expected = [cumulative[i] * scale for i, _ in boundaries]
+    gap_positions = [clock.gap_position(g) for g in range(len(regions) - 1)]
+    gap_lengths = [regions[g + 1][0] - regions[g][1] for g in range(len(regions) - 1)]
+    pairs = _match_pauses(boundaries, expected, gap_positions, gap_lengths, clock.total)
+
+    # Çapalar arasında kelimeler, ağırlıklarıyla orantılı olarak konuşma zamanına yayılır
+    anchors = [(-1, 0.0)] + [(i, gap_positions[g]) for i, g in pairs] + [(len(words) - 1, clock.total)]
+    aligned, rates = [], []
+    for (prev_word, prev_t), (word_idx, t) in zip(anchors, anchors[1:]):
+        span_words = range(prev_word + 1, word_idx + 1)
+        span_weight = weights[prev_word + 1: word_idx + 1].sum()
+        if not len(span_words) or t <= prev_t:
+            rates.append((span_weight, float("inf")))
+            for i in span_words:
+                real = clock.to_real(prev_t)
+                aligned.append(AlignedWord(words[i], real, real))
+            continue
+        rates.append((span_weight, span_weight / (t - prev_t)))
+        position = prev_t
+        step = (t - prev_t) / span_weight
+        for i in span_words:
+            start = position
+            position += weights[i] * step
+            aligned.append(AlignedWord(words[i], clock.to_real(start), clock.to_real(position - 1e-6)))
+
+    confidence = _confidence(rates, weights.sum() / clock.total, boundaries, pairs, gap_lengths)
+    return AlignmentResult(
+        cues=_build_cues(aligned, strengths),
+        confidence=round(confidence, 3),
+        speech_regions=len(regions),
+        anchors=len(pairs),
+    )
+
+
+def _confidence(rates, global_rate, boundaries, pairs, gap_lengths):
+    """
+    Üç sinyal: (1) çapalar arası konuşma hızının genel hıza tutarlılığı, (2) cümle sonlarının ne kadarının
+    bir sessizliğe denk geldiği, (3) uzun sessizliklerin ne kadarının bir noktalamaya denk geldiği.
+    Metin sese ait değilse (eksik/fazla/başka metin) en az biri düşer.
+    """
+    chars_per_second = global_rate  # ağırlıklar yaklaşık harf sayısı
+    low, high = PLAUSIBLE_CHARS_PER_SECOND
+    if not low <= chars_per_second <= high:
+        return 0.0
+
+    total = sum(weight for weight, _ in rates) or 1.0
+    consistent = sum(weight for weight, rate in rates if 0.5 * global_rate <= rate <= 2.0 * global_rate) / total
+
+    sentence_ends = [i for i, strength in boundaries if strength >= 3.0]
+    if sentence_ends:
+        matched = {i for i, _ in pairs}
+        sentence_ratio = sum(1 for i in sentence_ends if i in matched) / len(sentence_ends)
+    else:
+        sentence_ratio = 1.0
+
+    long_gaps = [g for g, length in enumerate(gap_lengths) if length >= LONG_PAUSE_SECONDS]
+    if long_gaps:
+        matched_gaps = {g for _, g in pairs}
+        gap_ratio = sum(1 for g in long_gaps if g in matched_gaps) / len(long_gaps)
+    else:
+        gap_ratio = 1.0
+    return consistent * sentence_ratio * gap_ratio
+
+
+def align_script_chunks(chunks, regions):
+    """
+    Metin TTS'e parça parça gittiyse (Video.voice_chunks) her parça yalnızca kendi zaman aralığındaki
+    bölgelere hizalanır; parça sınırları kesin çapa olur. Güven, en zayıf parçanınkidir.
+    """
+    cues, confidences, anchors = [], [], 0
+    for chunk in chunks:
+        start, end = chunk["start"], chunk["end"]
+        clipped = [(max(s, start), min(e, end)) for s, e in regions if e > start and s < end]
+        result = align_script(chunk["text"], [(s, e) for s, e in clipped if e - s > 0])
+        cues.extend(result.cues)
+        confidences.append(result.confidence)
+        anchors += result.anchors + 1
+    return AlignmentResult(
+        cues=cues,
+        confidence=min(confidences) if confidences else 0.0,
+        speech_regions=len(regions),
+        anchors=anchors,
+    )
+
+
+def align_script_to_audio(script, audio_path, chunks=None):
+    """
+    Ses dosyasını çözüp enerji VAD'ı ile bölgeleri bulur ve metni hizalar. chunks (Video.voice_chunks)
+    birden fazla parçaysa parça zamanları kullanılır.
+    """
+    from faster_whisper.audio import decode_audio
+
+    with span("alignment", method="energy_vad") as attrs:
+        samples = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        regions = speech_regions(samples)
+        if chunks and len(chunks) > 1:
+            result = align_script_chunks(chunks, regions)
+            attrs["chunks"] = len(chunks)
+        else:
+            result = align_script(script, regions)
+        attrs.update(
+            cues=len(result.cues),
+            regions=result.speech_regions,
+            anchors=result.anchors,
+            confidence=result.confidence,
+        )
+
+    for idx, cue in enumerate(result.cues, start=1):
+        emit_event("segment", index=idx, start=cue["start"], end=cue["end"], text=cue["text"])
+    return result
@@ -1,6 +1,14 @@
 # core/services/subtitle_generator.py
 
-from faster_whisper import WhisperModel
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.audio import decode_audio
+from faster_whisper.tokenizer import _LANGUAGE_CODES
+
+from core.services.instrumentation import emit_event, report_progress, span
+from core.services.whisper_pool import get_whisper_model
 
 def format_timestamp(seconds: float) -> str:
     """SRT biçiminde timestamp üretir."""
@@ -10,26 +18,92 @@ def format_timestamp(seconds: float) -> str:
     millis = int((seconds - int(seconds)) * 1000)
     return f"{hrs:02}:{mins:02}:{secs:02},{millis:03}"
 
-def generate_subtitles_with_whisper(audio_path: str, model_size: str = "medium") -> str:
+def whisper_language(language):
+    """Panel dilini ('tr', 'en-US'...) Whisper koduna çevirir; tanınmıyorsa None (otomatik algılama)."""
+    if not language:
+        return None
+    code = language.replace("_", "-").split("-")[0].lower()
+    return code if code in _LANGUAGE_CODES else None
+
+def generate_subtitles_with_whisper(audio_path: str, model_size: str = None, language: str = None, compute_type: str = None) -> str:
     """
     Verilen ses dosyasını Whisper ile işleyerek zaman kodlu SRT döner.
 
     Args:
         audio_path (str): MP3/WAV gibi ses dosyasının tam yolu
-        model_size (str): Whisper modeli (tiny, base, small, medium, large)
+        model_size (str): Whisper modeli (tiny, base, small, medium, large); boşsa WHISPER_MODEL_SIZE
+        language (str): Panel dili; verilirse dil algılama atlanır
+        compute_type (str): int8, float32...; boşsa WHISPER_COMPUTE_TYPE
 
     Returns:
         str: .srt içeriği (string olarak)
     """
-    model = WhisperModel(model_size, device="cpu")  # GPU varsa "cuda" yaz
-    segments, info = model.transcribe(audio_path, beam_size=5)
+    # Model süreç içinde bir kez yüklenir (core.services.whisper_pool)
+    model = get_whisper_model(model_size, compute_type)
+    language = whisper_language(language)
+
+    with span("transcribe", language=language or "auto") as attrs:
+        segments, info = model.transcribe(audio_path, beam_size=5, language=language)
+
+        srt_output = ""
+        for idx, segment in enumerate(segments, start=1):
+            start = format_timestamp(segment.start)
+            end = format_timestamp(segment.end)
+            text = segment.text.strip()
+
+            srt_output += f"{idx}\n{start} --> {end}\n{text}\n\n"
+
+            # Segmentler decode edildikçe canlı akışa gider
+            emit_event("segment", index=idx, start=round(segment.start, 2), end=round(segment.end, 2), text=text)
+            report_progress(segment.end, info.duration, f"Altyazı {start} / {format_timestamp(info.duration)}")
+
+        attrs["segments"] = srt_output.count(" --> ")
+        attrs["audio_seconds"] = round(info.duration, 2)
+
+    return srt_output
+
+def _segments_to_srt(segments):
+    return "".join(
+        f"{idx}\n{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}\n{segment.text.strip()}\n\n"
+        for idx, segment in enumerate(segments, start=1)
+    )
+
+def transcribe_many(items, model_size: str = None, compute_type: str = None, batch_size: int = None):
+    """
+    Çok sayıda dosyayı paylaşılan model ve faster-whisper'ın BatchedInferencePipeline'ı ile yazıya döker.
+    Her dosyanın VAD parçaları batch_size'lık gruplar halinde birlikte decode edilir; bir sonraki dosyanın
+    sesi, mevcut dosya işlenirken arka planda çözülür.
+
+    Args:
+        items: [(anahtar, ses dosyası yolu, dil)] — dil Panel dili, boş olabilir
+    Yields:
+        (anahtar, srt içeriği veya None, hata mesajı veya None, ses süresi sn)
+    """
+    items = list(items)
+    if not items:
+        return
 
-    srt_output = ""
-    for idx, segment in enumerate(segments, start=1):
-        start = format_timestamp(segment.start)
-        end = format_timestamp(segment.end)
-        text = segment.text.strip()
+    pipeline = BatchedInferencePipeline(get_whisper_model(model_size, compute_type))
+    batch_size = batch_size or getattr(settings, "WHISPER_BATCH_SIZE", 8)
 
-        srt_output += f"{idx}\n{start} --> {end}\n{text}\n\n"
+    def decode(path):
+        return decode_audio(path, sampling_rate=16000)
 
-    return srt_output
\ No newline at end of file
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-decode") as prefetch:
+        pending = prefetch.submit(decode, items[0][1])
+        for idx, (key, path, language) in enumerate(items):
+            current = pending
+            if idx + 1 < len(items):
+                pending = prefetch.submit(decode, items[idx + 1][1])
+            try:
+                audio = current.result()
+                with span("transcribe", batched=True, batch_size=batch_size) as attrs:
+                    segments, info = pipeline.transcribe(
+                        audio, language=whisper_language(language), batch_size=batch_size, beam_size=5,
+                    )
+                    srt_output = _segments_to_srt(segments)
+                    attrs["audio_seconds"] = round(info.duration, 2)
+            except Exception as e:
+                yield key, None, str(e), 0.0
+                continue
+            yield key, srt_output, None, info.duration
@@ -0,0 +1,301 @@
+# core/services/subtitle_renderer.py
+
+import bisect
+import copy
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from moviepy import VideoClip
+
+logger = logging.getLogger(__name__)
+
+SUBTITLE_FONT_SIZE = 92
+SUBTITLE_COLOR = (255, 255, 255)
+SUBTITLE_STROKE_COLOR = (0, 0, 0)
+SUBTITLE_STROKE_WIDTH = 2
+SUBTITLE_INTERLINE = 4
+SUBTITLE_SIDE_MARGIN = 100
+
+
+@dataclass
+class Glyph:
+    """Tek bir karakterin rasterize edilmiş dolgu ve kontur maskeleri."""
+    fill: np.ndarray      # (h, w) float32, 0..1
+    stroke: np.ndarray    # (h, w) float32, 0..1
+    left: int             # kalem konumuna göre x ofseti
+    top: int              # baseline'a göre y ofseti
+    advance: float
+
+
+class GlyphAtlas:
+    """
+    Bir font / boyut / kontur kombinasyonu için karakterleri bir kez rasterize edip saklar.
+    Aynı karakter ikinci kez istendiğinde PIL'e hiç gidilmez.
+    """
+
+    def __init__(self, font_path, font_size=SUBTITLE_FONT_SIZE, stroke_width=SUBTITLE_STROKE_WIDTH):
+        self.font = ImageFont.truetype(font_path, font_size)
+        self.stroke_width = stroke_width
+        self.ascent, self.descent = self.font.getmetrics()
+        # Pillow'un multiline_text satır aralığıyla aynı hesap (TextClip de bunu kullanır)
+        self.line_height = self.font.getbbox("A", stroke_width=stroke_width)[3] + stroke_width + SUBTITLE_INTERLINE
+        self._glyphs = {}
+
+    def glyph(self, char):
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            glyph = self._rasterize(char)
+            self._glyphs[char] = glyph
+        return glyph
+
+    def _rasterize(self, char):
+        sw = self.stroke_width
+        left, top, right, bottom = self.font.getbbox(char, stroke_width=sw, anchor="ls")
+        advance = self.font.getlength(char)
+        width, height = right - left, bottom - top
+
+        if width <= 0 or height <= 0:
+            empty = np.zeros((0, 0), dtype=np.float32)
+            return Glyph(fill=empty, stroke=empty, left=0, top=0, advance=advance)
+
+        fill_img = Image.new("L", (width, height), 0)
+        ImageDraw.Draw(fill_img).text((-left, -top), char, font=self.font, fill=255, anchor="ls")
+
+        stroke_img = Image.new("L", (width, height), 0)
+        ImageDraw.Draw(stroke_img).text(
+            (-left, -top), char, font=self.font, fill=255,
+            stroke_width=sw, stroke_fill=255, anchor="ls",
+        )
+
+        return Glyph(
+            fill=np.asarray(fill_img, dtype=np.float32) / 255.0,
+            stroke=np.asarray(stroke_img, dtype=np.float32) / 255.0,
+            left=left,
+            top=top,
+            advance=advance,
+        )
+
+
+@lru_cache(maxsize=8)
+def get_glyph_atlas(font_path, font_size=SUBTITLE_FONT_SIZE, stroke_width=SUBTITLE_STROKE_WIDTH):
+    """Aynı süreçte tekrar eden render'lar atlas'ı yeniden kullanır."""
+    return GlyphAtlas(font_path, font_size, stroke_width)
+
+
+@dataclass
+class CueLayout:
+    start: float
+    end: float
+    text: str
+    # Her karakter için (glyph, x, y) — x/y, altyazı bloğunun sol üst köşesine göre
+    placements: list
+    width: int
+    height: int
+
+
+def _break_lines(text, atlas, max_width):
+    """
+    TextClip(method="caption") ile aynı mantık: boşluklardan kır, sığmazsa harften kır.
+    (satır, kırılan boşluk atıldı mı) çiftleri döner; harf sayacı kaymasın diye gerekli.
+    """
+    lines = []
+    current = ""
+    current_width = 0.0
+    last_space = None
+
+    for char in text:
+        advance = atlas.glyph(char).advance
+        if current_width + advance >= max_width and current:
+            if last_space is not None:
+                lines.append((current[:last_space], True))
+                current = current[last_space + 1:] + char
+            else:
+                lines.append((current, False))
+                current = char
+            current_width = sum(atlas.glyph(c).advance for c in current)
+            last_space = None
+        else:
+            current += char
+            current_width += advance
+
+        if char == " ":
+            last_space = len(current) - 1
+
+    if current:
+        lines.append((current, False))
+    return lines
+
+
+def layout_cue(text, start, end, atlas, max_width):
+    """Bir altyazıyı tek seferde satırlara böler ve her karakterin konumunu hesaplar."""
+    lines = _break_lines(text, atlas, max_width)
+    sw = atlas.stroke_width
+    placements = []
+    text_width = 0
+
+    for line_idx, (line, dropped_space) in enumerate(lines):
+        pen_x = float(sw)
+        baseline = atlas.ascent + sw + line_idx * atlas.line_height
+        for char in line:
+            glyph = atlas.glyph(char)
+            x = max(0, int(round(pen_x)) + glyph.left)
+            y = baseline + glyph.top
+            placements.append((glyph, x, y))
+            if glyph.fill.size:
+                text_width = max(text_width, x + glyph.stroke.shape[1])
+            pen_x += glyph.advance
+        # Kırılmada atılan boşluk da süreden pay alır; sıralama kaymasın diye boş yer tutucu ekle
+        if dropped_space:
+            placements.append((atlas.glyph(" "), 0, 0))
+
+    height = atlas.ascent + atlas.descent + sw * 2 + max(len(lines) - 1, 0) * atlas.line_height
+    return CueLayout(start=start, end=end, text=text, placements=placements, width=text_width, height=height)
+
+
+class SubtitleRenderer:
+    """
+    Tüm altyazıları tek bir klipte çizer. Her cue bir kez yerleştirilir; kare başına sadece
+    yeni açılan harflerin hazır bitmap'leri tampona eklenir (typewriter efekti).
+    """
+
+    def __init__(self, subtitles, resolution, font_path,
+                 font_size=SUBTITLE_FONT_SIZE, stroke_width=SUBTITLE_STROKE_WIDTH,
+                 color=SUBTITLE_COLOR, stroke_color=SUBTITLE_STROKE_COLOR, animated=True,
+                 side_margin=SUBTITLE_SIDE_MARGIN):
+        self.atlas = get_glyph_atlas(font_path, font_size, stroke_width)
+        self.color = np.array(color, dtype=np.float32)
+        self.stroke_color = np.array(stroke_color, dtype=np.float32)
+        self.animated = animated
+
+        max_width = resolution[0] - side_margin
+        self.cues = [
+            layout_cue(text, start, end, self.atlas, max_width)
+            for (start, end), text in subtitles
+            if text.strip() and end > start
+        ]
+        self.cues.sort(key=lambda cue: cue.start)
+        self._starts = [cue.start for cue in self.cues]
+
+        self.width = max((cue.width for cue in self.cues), default=1) or 1
+        self.height = max((cue.height for cue in self.cues), default=1) or 1
+
+        self._empty_frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._empty_mask = np.zeros((self.height, self.width), dtype=np.float32)
+        self._reset_state()
+
+    def _reset_state(self):
+        self._state_key = None
+        self._stroke_acc = None
+        self._fill_acc = None
+        self._revealed = 0
+        self._frame = None
+        self._mask = None
+
+    def fork(self):
+        """Aynı yerleşimi (cue'lar, atlas) paylaşan, çizim durumu boş bir kopya; ayrı bir zaman çizelgesi için."""
+        clone = copy.copy(self)
+        clone._reset_state()
+        return clone
+
+    def _active_cue(self, t):
+        idx = bisect.bisect_right(self._starts, t) - 1
+        if idx < 0:
+            return None, None
+        cue = self.cues[idx]
+        if t >= cue.end:
+            return None, None
+        return idx, cue
+
+    def _reveal_count(self, cue, t):
+        total = len(cue.placements)
+        if not self.animated:
+            return total
+        step = (cue.end - cue.start) / total
+        return min(total, int((t - cue.start) / step) + 1)
+
+    def _blit(self, acc, bitmap, x, y):
+        h, w = bitmap.shape
+        target = acc[y:y + h, x:x + w]
+        # alpha "over": a + b * (1 - a)
+        target += bitmap[:target.shape[0], :target.shape[1]] * (1.0 - target)
+
+    def _render(self, t):
+        idx, cue = self._active_cue(t)
+        if cue is None:
+            return self._empty_frame, self._empty_mask
+
+        count = self._reveal_count(cue, t)
+        if self._state_key == (idx, count):
+            return self._frame, self._mask
+
+        # Yeni cue veya geri sarma: tamponları sıfırla
+        if self._state_key is None or self._state_key[0] != idx or count < self._revealed:
+            self._stroke_acc = np.zeros((self.height, self.width), dtype=np.float32)
+            self._fill_acc = np.zeros((self.height, self.width), dtype=np.float32)
+            self._revealed = 0
+
+        offset_x = (self.width - cue.width) // 2
+        offset_y = (self.height - cue.height) // 2
+        for glyph, x, y in cue.placements[self._revealed:count]:
+            if not glyph.fill.size:
+                continue
+            self._blit(self._stroke_acc, glyph.stroke, offset_x + x, offset_y + y)
+            self._blit(self._fill_acc, glyph.fill, offset_x + x, offset_y + y)
+        self._revealed = count
+
+        # Konturlar dolgunun altında kalır (PIL'in tek geçişte çizdiği gibi)
+        fill_a = self._fill_acc[..., None]
+        stroke_a = (self._stroke_acc * (1.0 - self._fill_acc))[..., None]
+        alpha = fill_a + stroke_a
+        rgb = (self.color * fill_a + self.stroke_color * stroke_a) / np.maximum(alpha, 1e-6)
+
+        self._frame = rgb.astype(np.uint8)
+        self._mask = alpha[..., 0]
+        self._state_key = (idx, count)
+        return self._frame, self._mask
+
+    def is_active(self, t):
+        return self._active_cue(t)[1] is not None
+
+    def frame(self, t):
+        return self._render(t)[0]
+
+    def mask(self, t):
+        return self._render(t)[1]
+
+    def to_clip(self, duration):
+        clip = VideoClip(frame_function=self.frame, duration=duration)
+        mask = VideoClip(frame_function=self.mask, is_mask=True, duration=duration)
+        return clip.with_mask(mask).with_position(("center", "center"))
+
+
+def make_subtitle_renderer(subtitles, resolution, font_path, animated=True, font_scale=1.0):
+    """font_scale, küçültülmüş (taslak) render'larda yazıyı çözünürlükle orantılı tutar."""
+    return SubtitleRenderer(
+        subtitles, resolution, font_path,
+        font_size=max(1, round(SUBTITLE_FONT_SIZE * font_scale)),
+        stroke_width=max(1, round(SUBTITLE_STROKE_WIDTH * font_scale)),
+        side_margin=round(SUBTITLE_SIDE_MARGIN * font_scale),
+        animated=animated,
+    )
+
+
+def build_subtitle_clip(subtitles, resolution, font_path, duration=None, animated=True, font_scale=1.0):
+    """
+    parse_srt çıktısından tek bir altyazı katmanı üretir. Altyazı yoksa None döner.
+    """
+    renderer = make_subtitle_renderer(subtitles, resolution, font_path, animated=animated, font_scale=font_scale)
+    if not renderer.cues:
+        return None
+
+    if duration is None:
+        duration = max(cue.end for cue in renderer.cues)
+
+    logger.info(
+        f"Subtitle atlas ready: {len(renderer.cues)} cues, "
+        f"{len(renderer.atlas._glyphs)} glyphs, canvas {renderer.width}x{renderer.height}"
+    )
+    return renderer.to_clip(duration)
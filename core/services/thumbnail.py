@@ -0,0 +1,49 @@
+# core/services/thumbnail.py
+
+import io
+import os
+
+from django.conf import settings
+from PIL import Image, ImageDraw, ImageFont
+
+THUMBNAIL_SIZE = (1024, 576)
+THUMBNAIL_FONT_SIZE = 64
+
+
+def thumbnail_font_path():
+    return os.path.join(settings.BASE_DIR, "static", "Roboto_Condensed-Bold.ttf")
+
+
+def render_thumbnail(image_data, title, font_path=None, target_size=THUMBNAIL_SIZE):
+    """
+    Ham görsel baytlarını (veya zaten açılmış bir PIL görselini) thumbnail boyutuna indirir,
+    başlığı gölgeli olarak alta yazar ve PNG baytlarını döner.
+    """
+    # 1. Resmi aç, yeniden boyutlandır
+    if not isinstance(image_data, Image.Image):
+        image_data = Image.open(io.BytesIO(image_data))
+    image = image_data.convert("RGBA")
+    image = image.resize(target_size, Image.LANCZOS)
+
+    # 2. Yazıyı yerleştir
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype(font_path or thumbnail_font_path(), size=THUMBNAIL_FONT_SIZE)
+    text_color = (255, 255, 255, 255)
+    shadow_color = (0, 0, 0, 180)
+
+    w, h = image.size
+    # Yazı konumu hesapla
+    bbox = draw.textbbox((0, 0), title, font=font)
+    tw = bbox[2] - bbox[0]
+    th = bbox[3] - bbox[1]
+    x = (w - tw) // 2
+    y = h - th - 40
+
+    # Gölge + yazı
+    draw.text((x + 2, y + 2), title, font=font, fill=shadow_color)
+    draw.text((x, y), title, font=font, fill=text_color)
+
+    # 3. PNG olarak kaydet
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
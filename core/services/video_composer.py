@@ -1,6 +1,7 @@
 import os
 import re
 import logging
+import tempfile
 import uuid
 from moviepy import (
     ImageClip,
@@ -14,6 +15,11 @@ from moviepy.video.fx.Resize import Resize
 from moviepy.video.fx.CrossFadeIn import CrossFadeIn
 from moviepy.video.tools.subtitles import SubtitlesClip
 from django.conf import settings
+from core.services.subtitle_renderer import build_subtitle_clip
+from core.services.ken_burns import ken_burns_clip
+from core.services.render_cache import RenderCache, get_render_cache
+from core.services.instrumentation import StepCancelled, emit_event, report_progress, span
+from proglog import TqdmProgressBarLogger
 logger = logging.getLogger(__name__)
 
 
@@ -76,6 +82,61 @@ def animated_textclip(txt, start, end, resolution, font_path):
 
     return CompositeVideoClip(clips).with_start(start).with_duration(duration)
 
+def subtitle_font_path():
+    return os.path.join(settings.BASE_DIR, "static", "Roboto_Condensed-Bold.ttf")
+
+
+def read_srt(srt_path):
+    with open(srt_path, "r", encoding="utf-8-sig") as f:
+        return parse_srt(f.read())
+
+
+def build_image_clip(img_path, idx, resolution, clip_duration, transition_duration, zoom_ratio, precompute=None, fps=24):
+    """
+    Zaman çizelgesindeki idx. görselin klibi: zoom + (ilk klip değilse) crossfade.
+    Klip, zaman çizelgesinde idx * clip_duration anında başlar ve transition_duration kadar taşar.
+    fps, önceden hesaplanan zoom karelerinin render fps'iyle aynı ızgarada olması için gerekir.
+    """
+    # 🔍 Görsel bir kez panel çözünürlüğüne göre ölçeklenir, zoom kayan kırpma penceresiyle yapılır
+    img = ken_burns_clip(
+        img_path,
+        resolution,
+        duration=clip_duration + transition_duration,
+        zoom_ratio=zoom_ratio,
+        zoom_duration=clip_duration,
+        precompute=precompute,
+        fps=fps,
+    )
+
+    # 🎞️ Geçiş efekti sadece ilk klipten sonrakilere uygulanır
+    if idx != 0 and transition_duration > 0:
+        img = img.with_effects([CrossFadeIn(transition_duration)])
+
+    return img
+
+
+class RenderProgressLogger(TqdmProgressBarLogger):
+    """Konsol çubuklarını korur, MoviePy'ın kare sayacını ayrıca report_progress'e aktarır."""
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        super().bars_callback(bar, attr, value, old_value)
+        if bar == "frame_index" and attr == "index":
+            total = self.bars[bar]["total"]
+            if total:
+                report_progress(value, total, f"Encode {value}/{total} kare")
+                if value % 24 == 0 or value >= total:
+                    emit_event("encode", frame=value, total=total)
+
+
+def draft_settings(resolution):
+    """Taslak render için küçültülmüş çözünürlük, düşük fps ve ölçek oranı."""
+    scale = getattr(settings, "RENDER_DRAFT_SCALE", 0.33)
+    # libx264 + yuv420p çift boyut ister
+    width = max(2, int(resolution[0] * scale) // 2 * 2)
+    height = max(2, int(resolution[1] * scale) // 2 * 2)
+    return (width, height), getattr(settings, "RENDER_DRAFT_FPS", 12), scale
+
+
 def compose_video(
     images,
     audio_path,
@@ -83,6 +144,115 @@ def compose_video(
     music_path=None,
     resolution=(1280, 720),
     srt_path=None,
+    transition_duration=1.0,
+    zoom_ratio=0.2,
+    backend=None,
+    workers=None,
+    segment_images=None,
+    use_cache=None,
+    fps=24,
+    preset="medium",
+    draft=False,
+    profiles=None,
+):
+    """
+    Render backend'ini seçer: "ffmpeg" (tek filtergraph), "streaming" (sabit bellekli kare akışı) veya "moviepy".
+    backend verilmezse settings.VIDEO_RENDER_BACKEND kullanılır; ffmpeg/streaming başarısız olursa MoviePy'a düşülür.
+    İptal (StepCancelled) bir hata sayılmaz: hiçbir backend'e düşülmeden çağırana iletilir.
+    MoviePy yolunda workers > 1 ise zaman çizelgesi segmentlere bölünüp paralel render edilir.
+    Render cache açıksa (use_cache veya settings.RENDER_CACHE_ENABLED) segmentli yol her zaman kullanılır
+    ve sadece girdisi değişen segmentler yeniden render edilir.
+
+    draft=True: küçük çözünürlük, düşük fps, ultrafast preset; zoom ve crossfade kapalı (sadece tempo/altyazı kontrolü).
+
+    profiles (OutputProfile listesi) verilirse resolution/fps yok sayılır; her profil için ayrı bir dosya üretilir
+    ve {profil adı: yol} sözlüğü döner (bkz. core.services.renditions).
+    """
+    if profiles:
+        from core.services.renditions import compose_renditions
+
+        return compose_renditions(
+            images,
+            audio_path,
+            profiles,
+            output_path=output_path,
+            music_path=music_path,
+            srt_path=srt_path,
+            transition_duration=transition_duration,
+            zoom_ratio=zoom_ratio,
+            preset=preset,
+            workers=workers,
+        )
+
+    subtitle_scale = 1.0
+    if draft:
+        resolution, fps, subtitle_scale = draft_settings(resolution)
+        preset = "ultrafast"
+        transition_duration = 0.0
+        zoom_ratio = 0.0
+        print(f"📝 Draft render: {resolution[0]}x{resolution[1]} @ {fps}fps")
+
+    options = dict(
+        output_path=output_path,
+        music_path=music_path,
+        resolution=resolution,
+        srt_path=srt_path,
+        transition_duration=transition_duration,
+        zoom_ratio=zoom_ratio,
+        fps=fps,
+        preset=preset,
+        subtitle_scale=subtitle_scale,
+    )
+    backend = backend or getattr(settings, "VIDEO_RENDER_BACKEND", "moviepy")
+
+    if backend == "ffmpeg":
+        from core.services.ffmpeg_composer import compose_video_ffmpeg
+
+        result = compose_video_ffmpeg(images, audio_path, **options)
+        if result:
+            return result
+        logger.warning("ffmpeg backend failed, falling back to MoviePy")
+
+    if backend == "streaming":
+        from core.services.frame_stream import compose_video_streaming
+
+        result = compose_video_streaming(images, audio_path, **options)
+        if result:
+            return result
+        logger.warning("Streaming backend failed, falling back to MoviePy")
+
+    workers = workers or getattr(settings, "RENDER_PARALLEL_WORKERS", 1)
+    cache = get_render_cache() if use_cache is None else (RenderCache() if use_cache else None)
+    if (workers > 1 and len(images) > 1) or cache is not None:
+        from core.services.parallel_render import compose_video_parallel
+
+        result = compose_video_parallel(
+            images,
+            audio_path,
+            workers=workers,
+            segment_images=segment_images or getattr(settings, "RENDER_SEGMENT_IMAGES", None),
+            cache=cache,
+            **options,
+        )
+        if result:
+            return result
+        logger.warning("Segmented render failed, falling back to single-process MoviePy")
+
+    return compose_video_moviepy(images, audio_path, **options)
+
+
+def compose_video_moviepy(
+    images,
+    audio_path,
+    output_path="output.mp4",
+    music_path=None,
+    resolution=(1280, 720),
+    srt_path=None,
+    transition_duration=1.0,
+    zoom_ratio=0.2,
+    fps=24,
+    preset="medium",
+    subtitle_scale=1.0,
 ):
     try:
         print("🎬 Starting video composition")
@@ -93,81 +263,70 @@ def compose_video(
 
         print(f"🖼️ Video resolution: {resolution}")
 
-        audio = AudioFileClip(audio_path)
-        audio_duration = audio.duration
-        print(f"🔊 Audio loaded. Duration: {audio_duration:.2f}s")
+        with span("audio_load"):
+            audio = AudioFileClip(audio_path)
+            audio_duration = audio.duration
+            print(f"🔊 Audio loaded. Duration: {audio_duration:.2f}s")
 
-        # Background music
-        if music_path and os.path.isfile(music_path):
-            music = AudioFileClip(music_path).volumex(0.3)
-            final_audio = CompositeAudioClip([audio, music.set_duration(audio.duration)])
-        else:
-            final_audio = audio
+            # Background music
+            if music_path and os.path.isfile(music_path):
+                music = AudioFileClip(music_path).volumex(0.3)
+                final_audio = CompositeAudioClip([audio, music.set_duration(audio.duration)])
+            else:
+                final_audio = audio
 
         clip_duration = audio_duration / len(images)
 
-        transition_duration = 1.0  # saniye cinsinden geçiş süresi
-
         clips = []
 
-        for idx, img_path in enumerate(images):
-            print(f"📷 Processing image {idx + 1}/{len(images)}: {img_path}")
-
-            try:
-                zoom_ratio = 0.2
-                # Görseli süreyle birlikte klip haline getir
-                img = ImageClip(img_path, duration=clip_duration + transition_duration)
-
-                # 🔍 Efekt zinciri: önce zoom, sonra çözünürlük
-                effects = [
-                    Resize(lambda t: 1.0 + zoom_ratio * (t / clip_duration)),  # Zoom
-                    Resize(resolution)                                         # Çözünürlük
-                ]
+        with span("clip_construction", images=len(images)):
+            for idx, img_path in enumerate(images):
+                print(f"📷 Processing image {idx + 1}/{len(images)}: {img_path}")
 
-                # 🎞️ Geçiş efekti sadece ilk klipten sonrakilere uygulanır
-                # İlk klip dışındakilere CrossFadeIn ekleniyor
-                if idx != 0:
-                    effects.append(CrossFadeIn(transition_duration))
+                try:
+                    clips.append(build_image_clip(img_path, idx, resolution, clip_duration, transition_duration, zoom_ratio, fps=fps))
+                except Exception as e:
+                    logger.error(f"⚠️ Error with image {img_path}: {e}")
+                    return None
 
-                img = img.with_effects(effects)
-
-                clips.append(img)
-
-            except Exception as e:
-                logger.error(f"⚠️ Error with image {img_path}: {e}")
-                return None
-            
         print("🧩 Concatenating image clips with crossfade")
-        video = concatenate_videoclips(clips, method="compose", padding=-transition_duration)
-        video = video.with_audio(final_audio)
+        with span("concatenation"):
+            video = concatenate_videoclips(clips, method="compose", padding=-transition_duration)
+            video = video.with_audio(final_audio)
 
         # Subtitles
         # Subtitles
         if srt_path and os.path.isfile(srt_path):
             print(f"💬 Adding subtitles from: {srt_path}")
 
-            with open(srt_path, "r", encoding="utf-8-sig") as f:
-                srt_text = f.read()
-
-            subtitles_data = parse_srt(srt_text)
-            animated_subs = []
-            FONT_PATH = os.path.join(settings.BASE_DIR, "static", "Roboto_Condensed-Bold.ttf")
+            with span("subtitle_build") as attrs:
+                subtitles_data = read_srt(srt_path)
+                attrs["cues"] = len(subtitles_data)
 
-            for (start, end), text in subtitles_data:
-                animated = animated_textclip(text, start, end, resolution, FONT_PATH)
-                animated_subs.append(animated)
+                # Harf harf efekt artık tek bir atlas tabanlı katmanda çiziliyor
+                subtitle_layer = build_subtitle_clip(
+                    subtitles_data, resolution, subtitle_font_path(), duration=video.duration, font_scale=subtitle_scale,
+                )
 
-            subtitle_layer = CompositeVideoClip(animated_subs)
-            video = CompositeVideoClip([video, subtitle_layer])
-            video = video.with_audio(final_audio)
+            if subtitle_layer is not None:
+                video = CompositeVideoClip([video, subtitle_layer])
+                video = video.with_audio(final_audio)
 
 
         print(f"💾 Writing final video to {output_path}")
-        video.write_videofile(output_path, fps=24, codec="libx264", audio_codec="aac")
+        # Geçici ses dosyası çalışma dizinine değil, iptal/hata sonrası silinecek bir klasöre yazılır
+        with span("encode", backend="moviepy", frames=int(video.duration * fps)), \
+                tempfile.TemporaryDirectory(prefix="moviepy_", dir=os.path.dirname(os.path.abspath(output_path))) as tmp_dir:
+            video.write_videofile(
+                output_path, fps=fps, codec="libx264", audio_codec="aac", preset=preset, logger=RenderProgressLogger(),
+                temp_audiofile_path=tmp_dir,
+            )
 
         print("✅ Video composition finished successfully")
         return output_path
 
+    except StepCancelled:
+        raise
     except Exception as e:
         logger.exception(f"❌ Failed to compose video: {str(e)}")
         return None
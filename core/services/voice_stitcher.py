@@ -0,0 +1,128 @@
+# core/services/voice_stitcher.py
+
+import re
+import logging
+import statistics
+
+import ffmpeg
+
+from core.services.ffmpeg_composer import get_ffmpeg_binary
+from core.services.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+# Cümle sonu; kapanan tırnak/parantez cümlede kalır
+SENTENCE_BREAK = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"'”’)])|(?<=[.!?…][\"'”’)]{2}))\s+")
+CLAUSE_BREAK = re.compile(r"(?<=[,;:–—])\s+")
+
+# Parçalar arası ses seviyesi eşitlemesinde uygulanacak en büyük kazanç (dB)
+MAX_GAIN_DB = 6.0
+# Bu seviyenin altındaki parça sessiz kabul edilir, kazanç uygulanmaz
+SILENCE_LUFS = -60.0
+
+
+def _split_long(sentence, max_chars):
+    """max_chars'tan uzun cümleyi önce virgül/noktalı virgülde, gerekirse kelime sınırında böler."""
+    pieces, current = [], ""
+    for part in CLAUSE_BREAK.split(sentence):
+        words = [part] if len(part) <= max_chars else part.split()
+        for word in words:
+            candidate = f"{current} {word}".strip()
+            if current and len(candidate) > max_chars:
+                pieces.append(current)
+                candidate = word
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_script(text, max_chars):
+    """
+    Metni sağlayıcı sınırına (max_chars) sığan parçalara böler. Sınırlar paragraf, olmazsa cümle sonlarıdır;
+    parça yarıdan fazla dolduysa paragraf sonunda kapatılır. Kısa metin tek parça döner.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks, current = [], ""
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        sentences = []
+        for sentence in SENTENCE_BREAK.split(paragraph):
+            sentences.extend(_split_long(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+
+        for idx, sentence in enumerate(sentences):
+            separator = "\n\n" if current and idx == 0 else " "
+            candidate = f"{current}{separator}{sentence}" if current else sentence
+            if current and len(candidate) > max_chars:
+                chunks.append(current)
+                candidate = sentence
+            current = candidate
+
+        if len(current) >= max_chars // 2:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def measure_audio(path):
+    """EBU R128 entegre ses seviyesi (LUFS) ve decode edilmiş süre (sn). Encoder boşlukları süreye dahil değildir."""
+    _, stderr = (
+        ffmpeg
+        .input(path)
+        .audio.filter("ebur128", framelog="quiet")
+        .output("-", format="null")
+        .global_args("-nostdin")
+        .run(cmd=get_ffmpeg_binary(), capture_stdout=True, capture_stderr=True)
+    )
+    log = stderr.decode("utf-8", errors="ignore")
+    loudness = re.findall(r"I:\s+(-?[\d.]+|-inf) LUFS", log)
+    times = re.findall(r"time=(\d+):(\d+):([\d.]+)", log)
+    if not times:
+        raise RuntimeError(f"Could not measure audio: {path}")
+    hrs, mins, secs = times[-1]
+    duration = int(hrs) * 3600 + int(mins) * 60 + float(secs)
+    lufs = float(loudness[-1]) if loudness and loudness[-1] != "-inf" else None
+    return lufs, duration
+
+
+def loudness_gains(levels, max_gain=MAX_GAIN_DB):
+    """Her parçayı parçaların medyan seviyesine getiren kazançlar (dB); sessiz parçalara dokunulmaz."""
+    audible = [level for level in levels if level is not None and level > SILENCE_LUFS]
+    if not audible:
+        return [0.0] * len(levels)
+    target = statistics.median(audible)
+    return [
+        0.0 if level is None or level <= SILENCE_LUFS else max(-max_gain, min(max_gain, target - level))
+        for level in levels
+    ]
+
+
+def stitch_voice(paths, output_path, gains_db=None, bitrate="128k"):
+    """
+    Parçaları tek geçişte decode edip (encoder gecikme/dolgu örnekleri atılır) kazançla eşitler ve
+    tek MP3 olarak yeniden kodlar; parça sınırlarında boşluk veya tıklama kalmaz.
+    """
+    gains_db = gains_db or [0.0] * len(paths)
+    streams = [
+        ffmpeg.input(path).audio.filter("volume", f"{gain:.2f}dB") if abs(gain) >= 0.05 else ffmpeg.input(path).audio
+        for path, gain in zip(paths, gains_db)
+    ]
+    audio = ffmpeg.concat(*streams, v=0, a=1) if len(streams) > 1 else streams[0]
+
+    with span("voice_stitch", chunks=len(paths)):
+        (
+            ffmpeg
+            .output(audio, output_path, acodec="libmp3lame", audio_bitrate=bitrate, ar=44100)
+            .global_args("-nostdin")
+            .overwrite_output()
+            .run(cmd=get_ffmpeg_binary(), capture_stdout=True, capture_stderr=True)
+        )
+    return output_path
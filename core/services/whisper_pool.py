@@ -0,0 +1,148 @@
+# core/services/whisper_pool.py
+
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from core.services.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+# float32 ağırlıklarla yaklaşık bellek (MB); int8 bunun ~%35'i, float16/int8_float16 ~%55'i
+MODEL_MEMORY_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 950,
+    "medium": 3000,
+    "large-v1": 6000,
+    "large-v2": 6000,
+    "large-v3": 6000,
+    "large-v3-turbo": 3200,
+    "turbo": 3200,
+    "distil-large-v3": 3000,
+}
+COMPUTE_TYPE_FACTOR = {
+    "int8": 0.35,
+    "int8_float32": 0.35,
+    "int8_float16": 0.55,
+    "float16": 0.55,
+}
+
+
+def estimated_memory_mb(size, compute_type):
+    base = MODEL_MEMORY_MB.get(size, MODEL_MEMORY_MB["medium"])
+    return int(base * COMPUTE_TYPE_FACTOR.get(compute_type, 1.0))
+
+
+class WhisperModelPool:
+    """
+    Süreç içinde yaşayan WhisperModel'ler: (boyut, compute_type, cpu_threads) başına bir kez yüklenir,
+    tahmini bellek bütçesi aşılınca en uzun süredir kullanılmayan model bırakılır. Thread-safe.
+    """
+
+    def __init__(self, budget_mb):
+        self.budget_mb = budget_mb
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.loads = 0
+        self.hits = 0
+
+    def used_mb(self):
+        return sum(estimated_memory_mb(size, compute_type) for size, compute_type, _ in self._models)
+
+    def _evict_for(self, key):
+        needed = estimated_memory_mb(key[0], key[1])
+        while self._models and self.used_mb() + needed > self.budget_mb:
+            evicted, _ = self._models.popitem(last=False)
+            logger.info(f"Whisper model {evicted} evicted (budget {self.budget_mb} MB)")
+
+    def get(self, size, compute_type="int8", cpu_threads=0):
+        key = (size, compute_type, cpu_threads)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return model
+            # Aynı modeli isteyen ikinci thread yüklemeyi bekler, ikinci kez yüklemez
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                model = self._models.get(key)
+                if model is not None:
+                    self.hits += 1
+                    return model
+
+            from faster_whisper import WhisperModel
+
+            with span("model_load", model=size, compute_type=compute_type):
+                model = WhisperModel(size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+            with self._lock:
+                self._evict_for(key)
+                self._models[key] = model
+                self._loading.pop(key, None)
+                self.loads += 1
+            logger.info(f"Whisper model {key} loaded (~{estimated_memory_mb(size, compute_type)} MB)")
+            return model
+
+    def stats(self):
+        with self._lock:
+            return {
+                "models": [list(key) for key in self._models],
+                "used_mb": self.used_mb(),
+                "budget_mb": self.budget_mb,
+                "loads": self.loads,
+                "hits": self.hits,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WhisperModelPool(getattr(settings, "WHISPER_MEMORY_BUDGET_MB", 4096))
+        return _pool
+
+
+def model_settings(size=None, compute_type=None, cpu_threads=None):
+    """Verilmeyen değerleri settings'ten tamamlar."""
+    return (
+        size or getattr(settings, "WHISPER_MODEL_SIZE", "medium"),
+        compute_type or getattr(settings, "WHISPER_COMPUTE_TYPE", "int8"),
+        getattr(settings, "WHISPER_CPU_THREADS", 0) if cpu_threads is None else cpu_threads,
+    )
+
+
+def get_whisper_model(size=None, compute_type=None, cpu_threads=None):
+    return get_pool().get(*model_settings(size, compute_type, cpu_threads))
+
+
+def warm_whisper_pool(background=True):
+    """
+    Ayarlı modeli worker açılışında yükler; ilk altyazı isteği model yüklemesini beklemez.
+    WHISPER_WARM_ON_STARTUP kapalıysa hiçbir şey yapmaz.
+    """
+    if not getattr(settings, "WHISPER_WARM_ON_STARTUP", False):
+        return None
+
+    def warm():
+        try:
+            get_whisper_model()
+        except Exception:
+            logger.exception("Could not warm the Whisper model pool")
+
+    if not background:
+        warm()
+        return None
+    thread = threading.Thread(target=warm, name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
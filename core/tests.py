@@ -1,3 +1,856 @@
-from django.test import TestCase
+import contextvars
+import email.utils
+import itertools
+import math
+import os
+import random
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import numpy as np
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+from mutagen.mp3 import MP3
+
+from core.benchmarks.inputs import synthetic_audio, synthetic_images, synthetic_srt
+from core.services import renditions, video_composer
+from core.services.audio_stream import ChunkStream, Mp3DurationCounter
+from core.services.ffmpeg_composer import get_ffmpeg_binary, probe_duration
+from core.services.frame_stream import TimelineFrameSource
+from core.services.instrumentation import record_spans, span
+from core.services.ken_burns import KenBurnsZoom
+from core.services.parallel_render import (
+    Segment, _segment_key, compose_video_parallel, concat_segments, mix_audio, plan_segments, render_segment,
+)
+from core.services.rate_limit import TokenBucket, bucket_for
+from core.services.render_cache import RenderCache, make_key
+from core.services.subtitle_renderer import (
+    SUBTITLE_SIDE_MARGIN, SubtitleRenderer, _break_lines, get_glyph_atlas, layout_cue,
+)
+from core.services.resilience import (
+    NETWORK, SERVER, THROTTLED, AdaptiveLimiter, CircuitBreaker, CircuitOpenError, ResilientCall,
+    classify_error, parse_retry_after,
+)
+from core.services.script_alignment import (
+    SAMPLE_RATE, _boundary_strength, _word_weight, align_script, speech_regions,
+)
+from core.services.renditions import OutputProfile, compose_renditions
+from core.services.video_composer import compose_video_moviepy, read_srt, subtitle_font_path
+from core.services.voice_stitcher import SILENCE_LUFS, loudness_gains, split_script
+
+SCRIPT = (
+    "Ahtapotların üç kalbi vardır. İkisi solungaçlara kan pompalar, üçüncüsü ise vücudun geri kalanına. "
+    "Yüzerken ana kalp durur; bu yüzden sürünmeyi tercih ederler! Kanları mavidir, çünkü bakır taşır. "
+    "Peki sizce en tuhaf deniz canlısı hangisi?"
+)
+
+# Noktalama gücüne göre sentetik duraklama süresi (saniye)
+PAUSES = {3.0: 0.45, 2.0: 0.3, 1.0: 0.2}
+
+
+def synthesize(script, chars_per_second=16.0, seed=1):
+    """
+    Ton + sessizlikten sentetik seslendirme: kelimeler ağırlıklarına göre (±%15) ton sürer,
+    noktalamalarda sessizlik olur. (samples, kelime başlangıçları, gerçek konuşma bölgeleri) döner.
+    """
+    rng = random.Random(seed)
+    lead = np.zeros(int(0.3 * SAMPLE_RATE))
+    chunks, starts, regions = [lead], [], []
+    t = region_start = len(lead) / SAMPLE_RATE
+    words = script.split()
+    for idx, word in enumerate(words):
+        n = int(_word_weight(word) / chars_per_second * rng.uniform(0.85, 1.15) * SAMPLE_RATE)
+        starts.append(t)
+        chunks.append(0.3 * np.sin(2 * np.pi * 220 * np.arange(n) / SAMPLE_RATE))
+        t += n / SAMPLE_RATE
+        pause = PAUSES.get(_boundary_strength(word), 0) if idx < len(words) - 1 else 0
+        if pause:
+            regions.append((region_start, t))
+            n = int(pause * SAMPLE_RATE)
+            chunks.append(np.zeros(n))
+            t += n / SAMPLE_RATE
+            region_start = t
+    regions.append((region_start, t))
+    chunks.append(np.zeros(int(0.3 * SAMPLE_RATE)))
+
+    samples = np.concatenate(chunks).astype(np.float32)
+    samples += np.random.default_rng(seed).normal(0, 1e-4, len(samples)).astype(np.float32)
+    return samples, starts, regions
+
+
+class ScriptAlignmentTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.samples, cls.starts, cls.truth = synthesize(SCRIPT)
+        cls.regions = speech_regions(cls.samples)
+
+    def test_speech_regions_match_tone_bursts(self):
+        self.assertEqual(len(self.regions), len(self.truth))
+        for (start, end), (true_start, true_end) in zip(self.regions, self.truth):
+            self.assertAlmostEqual(start, true_start, delta=0.04)
+            self.assertAlmostEqual(end, true_end, delta=0.04)
+
+    def test_word_timings_follow_the_audio(self):
+        result = align_script(SCRIPT, self.regions)
+        words = [word for cue in result.cues for word in cue["words"]]
+        self.assertEqual([w["word"] for w in words], SCRIPT.split())
+
+        errors = np.abs(np.array([w["start"] for w in words]) - np.array(self.starts))
+        self.assertLess(errors.mean(), 0.05)
+        self.assertLess(errors.max(), 0.2)
+        self.assertGreaterEqual(result.confidence, 0.7)
+
+    def test_mismatched_script_has_no_confidence(self):
+        result = align_script(SCRIPT * 4, self.regions)
+        self.assertEqual(result.confidence, 0.0)
+
+    def test_different_script_scores_below_matching_one(self):
+        other = (
+            "Balinalar şarkı söyler ve bu şarkılar kilometrelerce uzağa ulaşır, bazen okyanusun öbür ucuna kadar gider. "
+            "Bilim insanları bu seslerin anlamını hâlâ çözmeye çalışıyor"
+        )
+        self.assertLess(align_script(other, self.regions).confidence, 0.7)
+
+
+class Mp3DurationCounterTests(SimpleTestCase):
+    """Rastgele boyutlu chunk'larla akan MP3'ün süresi mutagen'in okuduğuyla aynı olmalı."""
+
+    def encode(self, *args):
+        handle, path = tempfile.mkstemp(suffix=".mp3")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        subprocess.run(
+            [get_ffmpeg_binary(), "-v", "error", "-y", "-f", "lavfi", "-i", "sine=frequency=440:duration=3.3",
+             "-c:a", "libmp3lame", "-metadata", "title=Test", *args, path],
+            check=True,
+        )
+        return path
+
+    def assert_matches_mutagen(self, path, seed):
+        with open(path, "rb") as f:
+            data = f.read()
+        rng = random.Random(seed)
+        chunks, pos = [], 0
+        while pos < len(data):
+            size = rng.choice([1, 2, 3, rng.randint(4, 64), rng.randint(64, 4096)])
+            chunks.append(data[pos:pos + size])
+            pos += size
+
+        counter = Mp3DurationCounter()
+        self.assertEqual(ChunkStream(counter.wrap(chunks)).read(), data)
+        self.assertEqual(counter.bytes, len(data))
+
+        info = MP3(path).info
+        self.assertAlmostEqual(counter.seconds, info.length, places=3)
+        frame_samples = 1152 if info.sample_rate >= 32000 else 576  # MPEG-1 / MPEG-2 Layer III
+        self.assertEqual(counter.frames, round(info.length * info.sample_rate / frame_samples))
+
+    def test_cbr(self):
+        path = self.encode("-ar", "44100", "-b:a", "128k")
+        for seed in range(5):
+            self.assert_matches_mutagen(path, seed)
+
+    def test_vbr_low_sample_rate(self):
+        path = self.encode("-ar", "24000", "-q:a", "4")
+        for seed in range(5):
+            self.assert_matches_mutagen(path, seed)
+
+
+class FakeAPIError(Exception):
+    """SDK hatası gibi `response` taşıyan sahte hata."""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = httpx.Response(status, headers=headers or {})
+
+
+def wrapped(exc):
+    """Ajanların yaptığı gibi hatayı RuntimeError'a sarar."""
+    try:
+        try:
+            raise exc
+        except Exception as e:
+            raise RuntimeError("agent failed") from e
+    except RuntimeError as e:
+        return e
+
+
+class RetryAfterTests(SimpleTestCase):
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after(httpx.Headers({"Retry-After": "7"})), 7.0)
+
+    def test_milliseconds_take_precedence(self):
+        headers = httpx.Headers({"retry-after-ms": "1500", "retry-after": "7"})
+        self.assertEqual(parse_retry_after(headers), 1.5)
+
+    def test_http_date(self):
+        value = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(parse_retry_after(httpx.Headers({"retry-after": value})), 30, delta=2)
+
+    def test_past_date_and_garbage(self):
+        self.assertEqual(parse_retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}), 0.0)
+        self.assertIsNone(parse_retry_after({"retry-after": "soon"}))
+        self.assertIsNone(parse_retry_after({}))
+
+
+class ClassifyErrorTests(SimpleTestCase):
+    def test_walks_the_cause_chain(self):
+        exc = wrapped(FakeAPIError(429, {"retry-after": "2"}))
+        self.assertEqual(classify_error(exc), (THROTTLED, 429, 2.0))
+
+    def test_server_client_and_network_errors(self):
+        self.assertEqual(classify_error(wrapped(FakeAPIError(503)))[:2], (SERVER, 503))
+        self.assertEqual(classify_error(wrapped(FakeAPIError(400))), (None, 400, None))
+        self.assertEqual(classify_error(wrapped(httpx.ConnectError("refused"))), (NETWORK, None, None))
+        self.assertEqual(classify_error(ValueError("bad")), (None, None, None))
+
+
+class AdaptiveLimiterTests(SimpleTestCase):
+    def test_throttles_from_one_window_halve_once(self):
+        limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=16)
+        tickets = [limiter.try_acquire() for _ in range(3)]
+        for ticket in tickets:
+            limiter.release(ticket, THROTTLED)
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.counters["decreases"], 1)
+        self.assertEqual(limiter.counters["throttled"], 3)
+
+        # Düşüşten sonra başlayan çağrının 429'u yeniden düşürür
+        limiter.release(limiter.try_acquire(), THROTTLED)
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_success_grows_limit_additively(self):
+        limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=16)
+        for _ in range(2):
+            limiter.release(limiter.try_acquire(), "success")
+        self.assertAlmostEqual(limiter.limit, 2 + 1 / 2 + 1 / 2.5)
+
+    def test_retry_after_pauses_the_key(self):
+        limiter = AdaptiveLimiter(initial=4)
+        limiter.release(limiter.try_acquire(), THROTTLED, retry_after=60)
+        self.assertIsNone(limiter.try_acquire())
+        self.assertIsNone(limiter.acquire(timeout=0.01))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_threshold_and_allows_single_probe(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.reset_timeout = 0
+        breaker.before_call()  # deneme isteği
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.opened, 2)
+
+
+@override_settings(AGENT_RETRY_BASE_DELAY=0.001, AGENT_RETRY_MAX_ATTEMPTS=3)
+class ResilientCallTests(SimpleTestCase):
+    names = itertools.count()
+
+    def resilient(self):
+        # Devre kesici ve limiter süreç geneli; her test kendi sağlayıcı adını kullanır
+        return ResilientCall(f"test-provider-{next(self.names)}", "model", "sk-test")
+
+    def test_call_retries_server_errors_only(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise wrapped(FakeAPIError(503))
+            return "ok"
+
+        self.assertEqual(self.resilient().call(flaky), "ok")
+        self.assertEqual(len(attempts), 3)
+
+        def rejected():
+            attempts.append(1)
+            raise wrapped(FakeAPIError(400))
+
+        attempts.clear()
+        with self.assertRaises(RuntimeError):
+            self.resilient().call(rejected)
+        self.assertEqual(len(attempts), 1)
+
+    def test_stream_retries_before_first_chunk(self):
+        opened = []
+
+        def open_stream():
+            opened.append(1)
+            if len(opened) == 1:
+                raise FakeAPIError(429)
+            return iter([b"a", b"b"])
+
+        call = self.resilient()
+        self.assertEqual(list(call.stream(open_stream)), [b"a", b"b"])
+        self.assertEqual(len(opened), 2)
+        self.assertEqual(call.limiter.in_flight, 0)
+
+    def test_stream_does_not_retry_after_first_chunk(self):
+        opened = []
+
+        def open_stream():
+            opened.append(1)
+            yield b"a"
+            raise FakeAPIError(503)
+
+        call = self.resilient()
+        received = []
+        with self.assertRaises(FakeAPIError):
+            for chunk in call.stream(open_stream):
+                received.append(chunk)
+        self.assertEqual(received, [b"a"])
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(call.limiter.in_flight, 0)
+        self.assertEqual(call.breaker.failures, 1)
+
+
+WORDS = [
+    "ahtapot", "kalp", "deniz", "mavi", "bakır", "kan", "yüzerken", "solungaçlara", "canlısı",
+    "bir", "ve", "ama", "çünkü", "okyanusun", "derinliklerinde", "yaşayan", "tuhaf",
+]
+
+
+def random_script(rng, max_word_chars):
+    """Noktalama, paragraf ve fazla boşluk içeren rastgele Türkçe benzeri metin."""
+    paragraphs = []
+    for _ in range(rng.randint(1, 5)):
+        sentences = []
+        for _ in range(rng.randint(1, 8)):
+            words = [w for w in rng.choices(WORDS, k=rng.randint(1, 40)) if len(w) <= max_word_chars] or ["kalp"]
+            parts = []
+            for word in words:
+                parts.append(word + rng.choice(["", "", "", ",", ";", " –", ":"]))
+            sentences.append(" ".join(parts).rstrip(",;: –") + rng.choice([".", "!", "?", "…", '."']))
+        paragraphs.append(rng.choice([" ", "  ", "\n"]).join(sentences))
+    return rng.choice(["\n\n", "\n \n", "\n\n\n"]).join(paragraphs)
+
+
+class SplitScriptTests(SimpleTestCase):
+    def test_chunks_fit_and_reproduce_the_script(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            max_chars = rng.randint(20, 600)
+            script = random_script(rng, max_chars)
+            chunks = split_script(script, max_chars)
+            self.assertTrue(all(0 < len(chunk) <= max_chars for chunk in chunks), (max_chars, chunks))
+            self.assertEqual(" ".join(" ".join(chunks).split()), " ".join(script.split()))
+
+    def test_short_and_empty_text(self):
+        self.assertEqual(split_script("  Kısa metin.  ", 100), ["Kısa metin."])
+        self.assertEqual(split_script("   ", 100), [])
+
+    def test_prefers_sentence_boundaries(self):
+        script = "Birinci cümle burada. İkinci cümle de burada. Üçüncü cümle en sonda."
+        self.assertEqual(
+            split_script(script, 50),
+            ["Birinci cümle burada. İkinci cümle de burada.", "Üçüncü cümle en sonda."],
+        )
+
+
+class LoudnessGainsTests(SimpleTestCase):
+    def test_matches_median_within_clamp(self):
+        self.assertEqual(loudness_gains([-16.0, -18.0, -20.0]), [-2.0, 0.0, 2.0])
+        self.assertEqual(loudness_gains([-10.0, -18.0, -30.0]), [-6.0, 0.0, 6.0])
+        self.assertEqual(loudness_gains([-10.0, -18.0, -30.0], max_gain=3), [-3.0, 0.0, 3.0])
+
+    def test_silent_and_unmeasured_parts_are_untouched(self):
+        self.assertEqual(loudness_gains([-16.0, None, SILENCE_LUFS - 10, -20.0]), [-2.0, 0.0, 0.0, 2.0])
+        self.assertEqual(loudness_gains([None, SILENCE_LUFS]), [0.0, 0.0])
+        self.assertEqual(loudness_gains([]), [])
+
+
+class ComposeRenditionsTests(SimpleTestCase):
+    """Aynı çözünürlük/fps'teki profillerin kareleri bir kez üretilir; her profil kendi bitrate'iyle encode edilir."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="renditions-tests-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.images = synthetic_images(self.work_dir, 2, size=(180, 320))
+        self.audio = synthetic_audio(self.work_dir, 2)
+        self.srt = synthetic_srt(self.work_dir, 2, 2)
+
+    def test_frames_are_generated_once_per_group(self):
+        profiles = [
+            OutputProfile("PORTRAIT_HIGH", (180, 320), 10, "400k"),
+            OutputProfile("PORTRAIT_LOW", (180, 320), 10, "100k"),
+            OutputProfile("LANDSCAPE", (320, 180), 10, "200k"),
+            OutputProfile("PORTRAIT_SLOW", (180, 320), 5),
+        ]
+        calls = Counter()
+        durations = {}
+        lock = threading.Lock()
+        original = TimelineFrameSource.frame
+
+        def frame(source, t):
+            with lock:
+                calls[id(source)] += 1
+                durations[id(source)] = source.duration
+            return original(source, t)
+
+        with mock.patch.object(TimelineFrameSource, "frame", autospec=True, side_effect=frame), \
+                mock.patch.object(renditions, "make_subtitle_renderer", wraps=renditions.make_subtitle_renderer) as layouts:
+            results = compose_renditions(
+                self.images, self.audio, profiles, output_path=os.path.join(self.work_dir, "out.mp4"),
+                srt_path=self.srt, preset="ultrafast",
+            )
+
+        self.assertEqual(sorted(results), sorted(profile.name for profile in profiles))
+        for path in results.values():
+            self.assertGreater(probe_duration(path), 2.0)
+
+        # 3 grup → 3 kaynak; her kare grup başına bir kez üretilir
+        duration = next(iter(durations.values()))
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(
+            sorted(calls.values()),
+            sorted([round(duration * 5), round(duration * 10), round(duration * 10)]),
+        )
+        # Altyazı yerleşimi çözünürlük başına bir kez
+        self.assertEqual(layouts.call_count, 2)
+        # Aynı kareler, farklı bitrate
+        self.assertGreater(
+            os.path.getsize(results["PORTRAIT_HIGH"]), os.path.getsize(results["PORTRAIT_LOW"]),
+        )
+
+
+class RenderCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="render-cache-tests-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.cache = RenderCache(root=os.path.join(self.work_dir, "cache"), max_bytes=10 ** 9)
+
+    def _put(self, key, size=100, age=0):
+        src = os.path.join(self.work_dir, f"{key}.src")
+        with open(src, "wb") as f:
+            f.write(b"x" * size)
+        path = self.cache.put("segment", key, ".mp4", src)
+        if age:
+            os.utime(path, (time.time() - age, time.time() - age))
+        return path
+
+    def test_get_and_put(self):
+        self.assertIsNone(self.cache.get("segment", "ab12", ".mp4"))
+        path = self._put("ab12", age=600)
+        self.assertFalse(os.path.exists(os.path.join(self.work_dir, "ab12.src")))  # taşınır, kopyalanmaz
+        self.assertEqual(self.cache.get("segment", "ab12", ".mp4"), path)
+        # get LRU için son kullanımı günceller
+        self.assertGreater(os.path.getmtime(path), time.time() - 60)
+        self.assertIsNone(self.cache.get("audio", "ab12", ".mp4"))
+
+    def test_evict_removes_oldest_first(self):
+        old = self._put("aa01", age=7200)
+        older = self._put("aa02", age=9000)
+        recent = self._put("aa03", age=5000)
+        freed = self.cache.evict(max_bytes=150, grace_seconds=60)
+        self.assertEqual(freed, 200)
+        self.assertFalse(os.path.exists(older))
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(recent))
+
+    def test_evict_keeps_entries_used_within_grace(self):
+        stale = self._put("bb01", age=7200)
+        # Eşzamanlı bir render'ın az önce get() ile aldığı segmentler
+        in_use = [self._put(f"bb0{i}", age=10) for i in range(2, 5)]
+        freed = self.cache.evict(max_bytes=0, grace_seconds=600)
+        self.assertEqual(freed, 100)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(all(os.path.exists(path) for path in in_use))
+        self.assertEqual(self.cache.evict(max_bytes=0, grace_seconds=0), 300)
+
+    def test_make_key(self):
+        key = make_key("segment", images=["a", "b"], fps=24)
+        self.assertEqual(key, make_key("segment", fps=24, images=["a", "b"]))
+        self.assertNotEqual(key, make_key("segment", images=["a", "b"], fps=30))
+        self.assertNotEqual(key, make_key("segment", images=["b", "a"], fps=24))
+        self.assertNotEqual(key, make_key("audio", images=["a", "b"], fps=24))
+
+
+class SegmentKeyTests(SimpleTestCase):
+    """Segment anahtarı yalnızca o segmentin çıktısını etkileyen girdiler değişince değişir."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="segment-key-tests-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.images = synthetic_images(self.work_dir, 4, size=(32, 48))
+        os.makedirs(os.path.join(self.work_dir, "other"))
+        self.other = synthetic_images(os.path.join(self.work_dir, "other"), 4, size=(32, 48), seed=1)
+
+    def _job(self, index, **overrides):
+        # 4 görsel × 2 sn, 24 fps, segment başına bir görsel
+        first = index
+        segment = Segment(index, first, first + 1, first * 48, (first + 1) * 48 if first < 3 else 4 * 48 + 24)
+        job = {
+            "segment": segment,
+            "images": list(self.images),
+            "resolution": (180, 320),
+            "clip_duration": 2.0,
+            "transition_duration": 1.0,
+            "zoom_ratio": 0.2,
+            "subtitles": [((0.0, 1.5), "Birinci"), ((4.2, 5.0), "İkinci")],
+            "fps": 24,
+            "preset": "medium",
+            "subtitle_scale": 1.0,
+        }
+        job.update(overrides)
+        return job
+
+    def _key(self, index, **overrides):
+        return _segment_key(self._job(index, **overrides), "font")
+
+    def test_image_change_invalidates_own_and_next_segment_only(self):
+        images = list(self.images)
+        images[1] = self.other[1]
+        keys = [self._key(i) for i in range(4)]
+        changed = [self._key(i, images=images) for i in range(4)]
+        # Görsel 1 kendi segmentinde ve crossfade ile bir sonrakinde görünür
+        self.assertEqual([a != b for a, b in zip(keys, changed)], [False, True, True, False])
+
+    def test_subtitle_change_invalidates_only_its_window(self):
+        subtitles = [((0.0, 1.5), "Birinci"), ((4.2, 5.0), "Değişti")]
+        keys = [self._key(i) for i in range(4)]
+        changed = [self._key(i, subtitles=subtitles) for i in range(4)]
+        self.assertEqual([a != b for a, b in zip(keys, changed)], [False, False, True, False])
+
+    def test_resolution_and_zoom_invalidate_every_segment(self):
+        for overrides in ({"resolution": (360, 640)}, {"zoom_ratio": 0.1}, {"fps": 30}):
+            with self.subTest(**overrides):
+                for i in range(4):
+                    self.assertNotEqual(self._key(i), self._key(i, **overrides))
+        self.assertNotEqual(_segment_key(self._job(0), "font"), _segment_key(self._job(0), "other-font"))
+
+
+def count_frames(path):
+    """Video akışındaki kare sayısı (null muxer'a decode edilerek sayılır)."""
+    result = subprocess.run(
+        [get_ffmpeg_binary(), "-i", path, "-map", "0:v:0", "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    return int(re.findall(r"frame=\s*(\d+)", result.stderr)[-1])
+
+
+class PlanSegmentsTests(SimpleTestCase):
+    def test_segments_cover_timeline_without_gaps(self):
+        for clip_duration, fps, per_segment in ((2.0, 24, 1), (2.37, 24, 1), (3.1, 30, 2), (1.7, 12, 3)):
+            with self.subTest(clip_duration=clip_duration, fps=fps, per_segment=per_segment):
+                segments = plan_segments(5, clip_duration, 1.0, fps, per_segment)
+                self.assertEqual(len(segments), math.ceil(5 / per_segment))
+                self.assertEqual(segments[0].start_frame, 0)
+                # Son segment crossfade kuyruğunu da içerir
+                self.assertEqual(segments[-1].end_frame, int((5 * clip_duration + 1.0) * fps))
+                for previous, current in zip(segments, segments[1:]):
+                    self.assertEqual(previous.end_frame, current.start_frame)
+                    self.assertEqual(previous.last_image, current.first_image)
+                    # Kesim görselin başladığı kareye denk gelir
+                    self.assertEqual(current.start_frame, round(current.first_image * clip_duration * fps))
+
+    def test_boundaries(self):
+        segments = plan_segments(4, 2.0, 1.0, 24, 1)
+        self.assertEqual(
+            [(s.first_image, s.last_image, s.start_frame, s.end_frame) for s in segments],
+            [(0, 1, 0, 48), (1, 2, 48, 96), (2, 3, 96, 144), (3, 4, 144, 216)],
+        )
+
+
+class ParallelRenderTests(SimpleTestCase):
+    """Segmentli render tek süreçli MoviePy render'ıyla aynı sayıda kare ve aynı süreyi üretmeli."""
+
+    fps = 12
+    resolution = (90, 160)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.work_dir = tempfile.mkdtemp(prefix="parallel-render-tests-")
+        cls.images = synthetic_images(cls.work_dir, 3, size=(180, 320))
+        cls.audio = synthetic_audio(cls.work_dir, 4.5)
+        cls.srt = synthetic_srt(cls.work_dir, 3, 4.5)
+        cls.audio_duration = probe_duration(cls.audio)
+        cls.total_frames = int((cls.audio_duration + 1.0) * cls.fps)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.work_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def _jobs(self, out_dir):
+        clip_duration = self.audio_duration / len(self.images)
+        segments = plan_segments(len(self.images), clip_duration, 1.0, self.fps, 1)
+        return [
+            {
+                "segment": segment,
+                "images": self.images,
+                "resolution": self.resolution,
+                "clip_duration": clip_duration,
+                "transition_duration": 1.0,
+                "zoom_ratio": 0.2,
+                "subtitles": read_srt(self.srt),
+                "font_path": subtitle_font_path(),
+                "fps": self.fps,
+                "preset": "ultrafast",
+                "subtitle_scale": 0.2,
+                "output_path": os.path.join(out_dir, f"segment_{segment.index}.mp4"),
+            }
+            for segment in segments
+        ]
+
+    def _render(self, name, compose, **options):
+        path = os.path.join(self.work_dir, f"{name}.mp4")
+        result = compose(
+            self.images, self.audio, output_path=path, resolution=self.resolution, srt_path=self.srt,
+            fps=self.fps, preset="ultrafast", subtitle_scale=0.2, **options,
+        )
+        self.assertEqual(result, path)
+        return count_frames(path), probe_duration(path)
+
+    def test_segment_includes_fading_previous_image(self):
+        out_dir = tempfile.mkdtemp(dir=self.work_dir)
+        job = self._jobs(out_dir)[1]
+        with mock.patch.object(video_composer, "build_image_clip", wraps=video_composer.build_image_clip) as build:
+            render_segment(job)
+        # Segment 1, crossfade süresince görünen görsel 0'ı da kurar
+        self.assertEqual([call.args[1] for call in build.call_args_list], [0, 1])
+        self.assertEqual(count_frames(job["output_path"]), job["segment"].end_frame - job["segment"].start_frame)
+
+    def test_concat_keeps_every_frame(self):
+        out_dir = tempfile.mkdtemp(dir=self.work_dir)
+        jobs = self._jobs(out_dir)
+        paths = [render_segment(job) for job in jobs]
+        self.assertEqual(
+            [count_frames(path) for path in paths],
+            [job["segment"].end_frame - job["segment"].start_frame for job in jobs],
+        )
+        audio = mix_audio(self.audio, os.path.join(out_dir, "audio.m4a"))
+        output = concat_segments(paths, audio, os.path.join(out_dir, "joined.mp4"), out_dir)
+        self.assertEqual(count_frames(output), self.total_frames)
+
+    def test_worker_count_and_cache_do_not_change_output_length(self):
+        cache = RenderCache(root=os.path.join(self.work_dir, "cache"))
+        results = {
+            "moviepy": self._render("moviepy", compose_video_moviepy),
+            "1 worker": self._render("one", compose_video_parallel, workers=1, segment_images=1),
+            "2 workers": self._render("two", compose_video_parallel, workers=2),
+            "cache cold": self._render("cold", compose_video_parallel, workers=2, cache=cache),
+            "cache warm": self._render("warm", compose_video_parallel, workers=2, cache=cache),
+        }
+        self.assertEqual(cache.stats()["kinds"]["segment"]["entries"], len(self.images))
+        reference_frames, reference_duration = results["moviepy"]
+        self.assertEqual(reference_frames, self.total_frames)
+        for name, (frames, duration) in results.items():
+            with self.subTest(name):
+                self.assertEqual(frames, reference_frames)
+                self.assertAlmostEqual(duration, reference_duration, delta=1.0 / self.fps)
+
+
+class SubtitleRendererTests(SimpleTestCase):
+    text = "Ahtapotların üç kalbi vardır ve kanları mavidir çünkü bakır taşır"
+    cue = ((1.0, 4.0), text)
+
+    def setUp(self):
+        self.font_path = subtitle_font_path()
+        self.atlas = get_glyph_atlas(self.font_path)
+
+    def _renderer(self, subtitles=None, resolution=(600, 1000), **kwargs):
+        return SubtitleRenderer(subtitles or [self.cue], resolution, self.font_path, **kwargs)
+
+    def test_lines_wrap_at_resolution_minus_margin(self):
+        resolution = (600, 1000)
+        max_width = resolution[0] - SUBTITLE_SIDE_MARGIN
+        lines = _break_lines(self.text, self.atlas, max_width)
+        self.assertGreater(len(lines), 1)
+        for line, _ in lines:
+            self.assertLess(sum(self.atlas.glyph(char).advance for char in line), max_width)
+        # Kırılan boşluklar atılır, başka harf kaybolmaz
+        rebuilt = "".join(line + (" " if dropped else "") for line, dropped in lines)
+        self.assertEqual(rebuilt, self.text)
+
+        renderer = self._renderer(resolution=resolution)
+        self.assertEqual(len(renderer.cues[0].placements), len(self.text))
+        self.assertLessEqual(renderer.width, max_width + 2 * self.atlas.stroke_width)
+        # Boşluksuz uzun kelime harften kırılır
+        word = "A" * 60
+        self.assertEqual("".join(line for line, _ in _break_lines(word, self.atlas, max_width)), word)
+
+    def test_visible_characters_at_time(self):
+        renderer = self._renderer()
+        cue = renderer.cues[0]
+        total = len(cue.placements)
+        step = (cue.end - cue.start) / total
+        self.assertFalse(renderer.is_active(0.99))
+        self.assertEqual(renderer._reveal_count(cue, 1.0), 1)
+        self.assertEqual(renderer._reveal_count(cue, 1.0 + 10.5 * step), 11)
+        self.assertEqual(renderer._reveal_count(cue, 4.0 - 1e-6), total)
+        self.assertFalse(renderer.is_active(4.0))
+        # Açılan harf sayısı arttıkça maske genişler
+        coverage = [float(renderer.mask(1.0 + k * step).sum()) for k in (2, 10, total - 1)]
+        self.assertEqual(coverage, sorted(coverage))
+        self.assertLess(coverage[0], coverage[-1])
+        # Animasyonsuz: bütün harfler ilk karede görünür
+        static = self._renderer(animated=False)
+        self.assertEqual(static._reveal_count(static.cues[0], 1.0), total)
+
+    def test_backwards_seek_matches_fresh_render(self):
+        subtitles = [self.cue, ((4.5, 6.0), "Peki sizce?")]
+        renderer = self._renderer(subtitles)
+        for t in (1.5, 2.5, 1.2, 3.9, 2.0, 5.0, 4.6, 1.1, 5.9, 3.0):
+            with self.subTest(t=t):
+                fresh = self._renderer(subtitles)
+                np.testing.assert_array_equal(renderer.frame(t), fresh.frame(t))
+                np.testing.assert_array_equal(renderer.mask(t), fresh.mask(t))
+
+    def test_layout_is_shared_by_fork(self):
+        renderer = self._renderer()
+        renderer.frame(3.0)
+        fork = renderer.fork()
+        self.assertIs(fork.cues, renderer.cues)
+        np.testing.assert_array_equal(fork.mask(1.5), self._renderer().mask(1.5))
+        self.assertEqual(layout_cue(self.text, 1.0, 4.0, self.atlas, 500).width, renderer.cues[0].width)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.sleeps = []
+        patcher = mock.patch("core.services.rate_limit.time")
+        fake_time = patcher.start()
+        self.addCleanup(patcher.stop)
+        fake_time.monotonic.side_effect = lambda: self.now
+        fake_time.sleep.side_effect = self._sleep
+
+    def _sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate_per_minute=6, capacity=2)
+        self.assertEqual([bucket.try_acquire() for _ in range(2)], [0.0, 0.0])
+        # Dakikada 6 token: bir sonraki 10 sn sonra
+        self.assertAlmostEqual(bucket.try_acquire(), 10.0)
+        self.now += 4
+        self.assertAlmostEqual(bucket.try_acquire(), 6.0)
+        self.now += 6
+        self.assertEqual(bucket.try_acquire(), 0.0)
+        # Uzun bekleme kapasiteyi aşmaz
+        self.now += 3600
+        self.assertEqual([bucket.try_acquire() for _ in range(2)], [0.0, 0.0])
+        self.assertGreater(bucket.try_acquire(), 0)
+
+    def test_capacity_defaults_to_rate(self):
+        self.assertEqual(TokenBucket(rate_per_minute=5).capacity, 5.0)
+        self.assertEqual(TokenBucket(rate_per_minute=0.5).capacity, 1.0)
+
+    def test_acquire_waits_for_next_token(self):
+        bucket = TokenBucket(rate_per_minute=12, capacity=1)
+        self.assertTrue(bucket.acquire())
+        self.assertTrue(bucket.acquire())
+        self.assertTrue(bucket.acquire())
+        self.assertEqual(len(self.sleeps), 2)
+        for seconds in self.sleeps:
+            self.assertAlmostEqual(seconds, 5.0)
+        self.assertAlmostEqual(self.now, 1010.0)
+
+    def test_acquire_timeout(self):
+        bucket = TokenBucket(rate_per_minute=6, capacity=1)
+        bucket.acquire()
+        self.assertFalse(bucket.acquire(timeout=5))
+        self.assertEqual(self.sleeps, [])
+        self.assertTrue(bucket.acquire(timeout=10))
+
+    def test_bucket_is_shared_per_scope_and_key(self):
+        bucket = bucket_for("tests", "sk-a", rate_per_minute=5)
+        self.assertIs(bucket_for("tests", "sk-a", rate_per_minute=5), bucket)
+        self.assertIsNot(bucket_for("tests", "sk-b", rate_per_minute=5), bucket)
+        self.assertIsNot(bucket_for("other", "sk-a", rate_per_minute=5), bucket)
+        # Limit değişirse bucket yenilenir
+        self.assertIsNot(bucket_for("tests", "sk-a", rate_per_minute=10), bucket)
+
+
+class KenBurnsFpsTests(SimpleTestCase):
+    """Önceden hesaplanan zoom kareleri render fps'iyle üretilir (24'e sabit değil)."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="ken-burns-tests-")
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.images = synthetic_images(self.work_dir, 2, size=(64, 96))
+
+    def test_build_image_clip_precomputes_at_given_fps(self):
+        with mock.patch.object(KenBurnsZoom, "precompute", autospec=True, side_effect=KenBurnsZoom.precompute) as precompute:
+            video_composer.build_image_clip(self.images[0], 0, (32, 48), 1.0, 0.5, 0.2, precompute=True, fps=30)
+        zoom, fps = precompute.call_args.args
+        self.assertEqual(fps, 30)
+        self.assertEqual(len(zoom._frames), math.ceil(1.5 * 30) + 1)
+
+    @override_settings(KEN_BURNS_PRECOMPUTE_SECONDS=60)
+    def test_moviepy_render_passes_its_fps(self):
+        audio = synthetic_audio(self.work_dir, 1)
+        output = os.path.join(self.work_dir, "out.mp4")
+        with mock.patch.object(KenBurnsZoom, "precompute", autospec=True, side_effect=KenBurnsZoom.precompute) as precompute:
+            result = compose_video_moviepy(
+                self.images, audio, output_path=output, resolution=(32, 48), transition_duration=0.2,
+                fps=10, preset="ultrafast",
+            )
+        self.assertEqual(result, output)
+        self.assertEqual([call.args[1] for call in precompute.call_args_list], [10, 10])
+
+
+class SpanRecorderThreadTests(SimpleTestCase):
+    """copy_context ile açılan worker thread'ler aynı recorder'a güvenle yazar."""
+
+    def test_concurrent_spans_keep_their_own_depth(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+
+        def work(idx):
+            with span("worker", idx=idx):
+                # Hepsi aynı anda açık span içindeyken iç span'i açar
+                barrier.wait(timeout=5)
+                for _ in range(50):
+                    with span("inner", idx=idx):
+                        pass
+
+        with record_spans() as recorder:
+            with span("root"):
+                threads = [
+                    threading.Thread(target=contextvars.copy_context().run, args=(work, idx))
+                    for idx in range(workers)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            with span("after"):
+                pass
+
+        spans = recorder.as_list()
+        self.assertEqual(len(spans), 2 + workers * 51)
+        depths = Counter((s["name"], s["depth"]) for s in spans)
+        self.assertEqual(depths, Counter({
+            ("root", 0): 1, ("after", 0): 1, ("worker", 1): workers, ("inner", 2): workers * 50,
+        }))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('panels', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='panel',
+            name='render_backend',
+            field=models.CharField(blank=True, choices=[('moviepy', 'MoviePy'), ('ffmpeg', 'FFmpeg filtergraph')], max_length=20, null=True),
+        ),
+    ]
@@ -14,6 +14,11 @@ class AdPositionChoices(models.TextChoices):
     BOTTOM_RIGHT = 'BOTTOM_RIGHT', 'Bottom Right'
     CENTER = 'CENTER', 'Center'
 
+class RenderBackendChoices(models.TextChoices):
+    MOVIEPY = 'moviepy', 'MoviePy'
+    FFMPEG = 'ffmpeg', 'FFmpeg filtergraph'
+    STREAMING = 'streaming', 'Streaming (sabit bellek)'
+
 class Panel(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="panels")
 
@@ -38,6 +43,9 @@ class Panel(models.Model):
     resolution_width = models.IntegerField(default=1080)
     resolution_height = models.IntegerField(default=1920)
 
+    # Render backend (boşsa settings.VIDEO_RENDER_BACKEND kullanılır)
+    render_backend = models.CharField(max_length=20, choices=RenderBackendChoices.choices, blank=True, null=True)
+
     is_active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
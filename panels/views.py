@@ -1,10 +1,12 @@
 from django.shortcuts import render, get_object_or_404
 from .models import Panel
+from videos.jobs import batch_stats
 
 
 def panel_detail(request, pk):
     panel = get_object_or_404(Panel.objects.prefetch_related('videos'), pk=pk)
-    return render(request, 'panels/panel_detail.html', {'panel': panel})
+    batches = [batch_stats(batch) for batch in panel.batches.all()[:5]]  # son toplu üretimler
+    return render(request, 'panels/panel_detail.html', {'panel': panel, 'batches': batches})
 
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
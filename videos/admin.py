@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Video, VideoImage, VideoAIContent
+from .models import Video, VideoImage, VideoAIContent, StepRun, GenerationJob, VideoBatch
 
 class VideoImageInline(admin.TabularInline):
     model = VideoImage
@@ -9,8 +9,25 @@ class VideoAIContentInline(admin.TabularInline):
     model = VideoAIContent
     extra = 0
 
+class StepRunInline(admin.TabularInline):
+    model = StepRun
+    extra = 0
+    readonly_fields = ['step', 'success', 'duration_seconds', 'error_message', 'spans', 'started_at']
+
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
     list_display = ['title', 'panel', 'video_type', 'status', 'created_at']
     list_filter = ['video_type', 'status']
-    inlines = [VideoImageInline, VideoAIContentInline]
+    inlines = [VideoImageInline, VideoAIContentInline, StepRunInline]
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'video', 'step', 'state', 'progress', 'created_at', 'finished_at']
+    list_filter = ['state', 'step']
+    readonly_fields = ['step_run', 'result', 'worker', 'started_at', 'finished_at']
+
+
+@admin.register(VideoBatch)
+class VideoBatchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'panel', 'user', 'created_at']
@@ -0,0 +1,84 @@
+# videos/events.py
+
+import json
+import time
+import threading
+from collections import deque
+
+# Kanal başına tutulan en fazla olay; geç bağlanan istemci en fazla bu kadarını kaçırmadan alır
+MAX_EVENTS = 500
+# Aynı türden sık olaylar (progress, encode) en fazla bu aralıkla yayınlanır
+THROTTLE_SECONDS = 0.25
+# Biten işlerin kanalı bu kadar süre daha tutulur (son olayları okumak için)
+CLOSED_CHANNEL_TTL = 120
+
+THROTTLED_KINDS = {'progress', 'encode'}
+
+
+class JobChannel:
+    """Tek bir işin canlı olayları: worker thread yayınlar, SSE akışları okur. Süreç içi, thread-safe."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.next_id = 1
+        self.closed_at = None
+        self.cancelled = threading.Event()
+        self._last_sent = {}
+        self._cond = threading.Condition()
+
+    def publish(self, kind, data, force=False):
+        now = time.monotonic()
+        with self._cond:
+            if not force and kind in THROTTLED_KINDS and now - self._last_sent.get(kind, 0) < THROTTLE_SECONDS:
+                return
+            self._last_sent[kind] = now
+            self.events.append({'id': self.next_id, 'event': kind, 'data': data})
+            self.next_id += 1
+            self._cond.notify_all()
+
+    def close(self, kind, data):
+        self.publish(kind, data, force=True)
+        with self._cond:
+            self.closed_at = time.monotonic()
+            self._cond.notify_all()
+
+    def read(self, last_id=0, timeout=None):
+        """last_id'den sonraki olaylar; yoksa ve kanal açıksa timeout kadar bekler."""
+        with self._cond:
+            if self.next_id - 1 <= last_id and self.closed_at is None:
+                self._cond.wait(timeout)
+            return [event for event in self.events if event['id'] > last_id]
+
+    @property
+    def closed(self):
+        return self.closed_at is not None
+
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+
+def _prune():
+    now = time.monotonic()
+    for job_id in [job_id for job_id, ch in _channels.items() if ch.closed and now - ch.closed_at > CLOSED_CHANNEL_TTL]:
+        del _channels[job_id]
+
+
+def open_channel(job_id):
+    with _channels_lock:
+        _prune()
+        channel = _channels.get(job_id)
+        if channel is None:
+            channel = _channels[job_id] = JobChannel(job_id)
+        return channel
+
+
+def get_channel(job_id):
+    with _channels_lock:
+        return _channels.get(job_id)
+
+
+def format_sse(event):
+    """Tek olayı text/event-stream biçimine çevirir."""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
@@ -0,0 +1,438 @@
+# videos/jobs.py
+
+import os
+import time
+import socket
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from core.services.instrumentation import StepCancelled, event_listener, progress_listener, record_spans, span
+from .events import get_channel, open_channel
+from .models import GenerationJob, JobStateChoices, StepRun, Video, VideoBatch
+from .utils import (
+    generate_text_content_util,
+    generate_voice_content_util,
+    generate_subtitle_content_util,
+    generate_image_content_util,
+    generate_thumbnail_image_util,
+    generate_edit_video_util,
+    generate_draft_video_util,
+    generate_renditions_util,
+)
+from .pipeline import generate_pipeline_util
+
+logger = logging.getLogger(__name__)
+
+STEP_UTILS = {
+    'text': generate_text_content_util,
+    'voice': generate_voice_content_util,
+    'subtitle': generate_subtitle_content_util,
+    'content_images': generate_image_content_util,
+    'thumbnail_image': generate_thumbnail_image_util,
+    'draft': generate_draft_video_util,
+    'edit': generate_edit_video_util,
+    'renditions': generate_renditions_util,
+    'pipeline': generate_pipeline_util,
+}
+
+# CPU ağırlıklı adımlar (Whisper, render) ile API çağrısı bekleyen adımlar ayrı sınırlarla çalışır.
+# `pipeline` kendisi slot tutmaz; düğümleri kendi slotlarını alır.
+STEP_RESOURCES = {
+    'text': 'io',
+    'voice': 'io',
+    'content_images': 'io',
+    'thumbnail_image': 'io',
+    'subtitle': 'cpu',
+    'draft': 'cpu',
+    'edit': 'cpu',
+    'renditions': 'cpu',
+}
+
+# İlerleme en fazla bu aralıkla veritabanına yazılır
+PROGRESS_WRITE_INTERVAL = 1.0
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_executors = {}
+_executor_lock = threading.Lock()
+
+_slots = {}
+_slot_usage = {}
+_slots_lock = threading.Lock()
+
+
+def _slot_limit(resource):
+    if resource == 'cpu':
+        return max(1, getattr(settings, 'CPU_STEP_CONCURRENCY', 1))
+    return max(1, getattr(settings, 'IO_STEP_CONCURRENCY', 8))
+
+
+@contextmanager
+def step_slot(step):
+    """Adımın kaynak sınıfı için süreç genelinde bir slot bekler; beklenen süre `slot_wait` span'i olur."""
+    resource = STEP_RESOURCES.get(step)
+    if resource is None:
+        yield
+        return
+
+    with _slots_lock:
+        if resource not in _slots:
+            _slots[resource] = threading.BoundedSemaphore(_slot_limit(resource))
+            _slot_usage[resource] = {'running': 0, 'waiting': 0}
+        semaphore = _slots[resource]
+        _slot_usage[resource]['waiting'] += 1
+
+    try:
+        with span("slot_wait", resource=resource):
+            semaphore.acquire()
+    finally:
+        with _slots_lock:
+            _slot_usage[resource]['waiting'] -= 1
+    with _slots_lock:
+        _slot_usage[resource]['running'] += 1
+    try:
+        yield
+    finally:
+        with _slots_lock:
+            _slot_usage[resource]['running'] -= 1
+        semaphore.release()
+
+
+def slot_usage():
+    """{'cpu': {'limit', 'running', 'waiting'}, 'io': {...}} — bu süreçteki anlık durum."""
+    with _slots_lock:
+        return {
+            resource: dict(limit=_slot_limit(resource), **_slot_usage.get(resource, {'running': 0, 'waiting': 0}))
+            for resource in ('cpu', 'io')
+        }
+
+
+def record_step_run(video, step, recorder, response):
+    """Adımın toplam süresini ve span'lerini StepRun olarak kaydeder; kayıt hatası yanıtı bozmaz."""
+    try:
+        return StepRun.objects.create(
+            video=video,
+            step=step,
+            success=bool(response and response.get('success')),
+            error_message=(response or {}).get('error'),
+            duration_seconds=round(recorder.elapsed(), 4),
+            spans=recorder.as_list(),
+        )
+    except Exception:
+        logger.exception(f"Could not store step run `{step}` for video {video.id}")
+        return None
+
+
+def run_step(user, video, step, on_progress=None, on_event=None):
+    """
+    Adımı bu thread'de çalıştırır; (yanıt, StepRun) döner.
+    on_event verilmezse dıştaki olay dinleyicisi (ör. pipeline işinin akışı) geçerli kalır.
+    """
+    util = STEP_UTILS.get(step)
+    if util is None:
+        return {'success': False, 'error': 'Unsupported step'}, None
+
+    recorder = None
+    try:
+        events = event_listener(on_event) if on_event else nullcontext()
+        with record_spans() as recorder, progress_listener(on_progress), events, step_slot(step):
+            response = util(user, video)
+        return response, record_step_run(video, step, recorder, response)
+    except Exception as e:
+        if recorder is not None:
+            record_step_run(video, step, recorder, {'success': False, 'error': str(e)})
+        raise
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def fail_orphaned_jobs():
+    """
+    Bu makinede ölmüş bir süreçte (yeniden başlatma, OOM) kalmış işleri FAILED yapar.
+    Başka canlı süreçlerin işlerine dokunmaz.
+    """
+    host = socket.gethostname()
+    orphaned = []
+    for job in GenerationJob.objects.filter(state__in=[JobStateChoices.QUEUED, JobStateChoices.RUNNING]):
+        worker_host, _, pid = (job.worker or "").rpartition(":")
+        if worker_host == host and pid.isdigit() and not _pid_alive(int(pid)):
+            orphaned.append(job.id)
+
+    if orphaned:
+        GenerationJob.objects.filter(id__in=orphaned).update(
+            state=JobStateChoices.FAILED,
+            error_message='Worker process exited before the job finished.',
+            finished_at=timezone.now(),
+        )
+        logger.warning(f"Marked {len(orphaned)} orphaned generation job(s) as failed")
+    return orphaned
+
+
+def get_executor(pool='default'):
+    """
+    'default': sayfadan tetiklenen adımlar; 'batch': toplu üretimin pipeline işleri.
+    Ayrı havuzlar sayesinde uzun bir batch tekil istekleri sıraya sokmaz.
+    """
+    with _executor_lock:
+        if pool not in _executors:
+            if not _executors:
+                try:
+                    fail_orphaned_jobs()
+                except Exception:
+                    logger.exception("Could not check for orphaned generation jobs")
+            if pool == 'batch':
+                workers = max(1, getattr(settings, 'BATCH_PIPELINE_WORKERS', 4))
+            else:
+                workers = getattr(settings, 'GENERATION_JOB_WORKERS', 2)
+            _executors[pool] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'generation-{pool}')
+            logger.info(f"Generation job pool `{pool}` started with {workers} worker(s) ({WORKER_ID})")
+        return _executors[pool]
+
+
+def _progress_writer(job_id):
+    last_write = [0.0]
+
+    def write(fraction, message=None):
+        now = time.monotonic()
+        if fraction < 1.0 and now - last_write[0] < PROGRESS_WRITE_INTERVAL:
+            return
+        last_write[0] = now
+        GenerationJob.objects.filter(id=job_id).update(progress=round(fraction, 4), progress_message=message)
+
+    return write
+
+
+def _event_publisher(job_id, channel):
+    """Olayları kanala yazar; iptal istenmişse (bu süreçte veya DB'de) StepCancelled fırlatır."""
+    last_check = [time.monotonic()]
+
+    def publish(kind, data):
+        now = time.monotonic()
+        if not channel.cancelled.is_set() and now - last_check[0] >= PROGRESS_WRITE_INTERVAL:
+            last_check[0] = now
+            if GenerationJob.objects.filter(id=job_id, cancel_requested=True).exists():
+                channel.cancelled.set()
+        if channel.cancelled.is_set():
+            raise StepCancelled(f"Job {job_id} cancelled")
+        channel.publish(kind, data)
+
+    return publish
+
+
+def execute_job(job_id):
+    """İşi çalıştırır ve sonucunu job satırına yazar. Worker thread'inde (veya senkron modda) çağrılır."""
+    close_old_connections()
+    channel = open_channel(job_id)
+    try:
+        # Sıradayken iptal edilen iş hiç başlamaz
+        started = GenerationJob.objects.filter(id=job_id, state=JobStateChoices.QUEUED).update(
+            state=JobStateChoices.RUNNING, started_at=timezone.now(), worker=WORKER_ID,
+        )
+        job = GenerationJob.objects.select_related('video', 'user').get(id=job_id)
+        if not started:
+            logger.info(f"[{job.user}] Job {job.id}: not queued anymore ({job.state}), skipped")
+            channel.close('done', job_payload(job))
+            return
+
+        logger.info(f"[{job.user}] Job {job.id}: step `{job.step}` started for video {job.video_id}")
+        channel.publish('state', {'state': JobStateChoices.RUNNING, 'step': job.step}, force=True)
+
+        stopped = False
+        try:
+            response, step_run = run_step(
+                job.user, job.video, job.step,
+                on_progress=_progress_writer(job.id),
+                on_event=_event_publisher(job.id, channel),
+            )
+        except StepCancelled:
+            response, step_run = {'success': False, 'error': 'Cancelled by user.'}, None
+            stopped = True
+        except Exception as e:
+            logger.exception(f"[{job.user}] Job {job.id}: exception in step `{job.step}` for video {job.video_id}")
+            response, step_run = {'success': False, 'error': str(e)}, None
+
+        success = bool(response.get('success'))
+        # İptal yalnızca adımı gerçekten durdurduysa kaydedilir (StepCancelled'ı yakalayıp hata dönen util'ler dahil).
+        # Olay üretmeyen adım (text, voice) bayrağı görmeden tamamlandıysa çıktısı kaydedilmiştir; SUCCEEDED kalır.
+        cancelled = stopped or (not success and channel.cancelled.is_set())
+        if cancelled:
+            state = JobStateChoices.CANCELLED
+            response = {'success': False, 'error': 'Cancelled by user.'}
+        else:
+            state = JobStateChoices.SUCCEEDED if success else JobStateChoices.FAILED
+        fields = dict(
+            state=state,
+            result=response,
+            error_message=None if success else response.get('error'),
+            step_run=step_run,
+            finished_at=timezone.now(),
+        )
+        if success:
+            fields['progress'] = 1.0
+        GenerationJob.objects.filter(id=job_id).update(**fields)
+
+        if cancelled:
+            logger.warning(f"[{job.user}] Job {job.id}: step `{job.step}` CANCELLED for video {job.video_id}")
+        elif success:
+            logger.info(f"[{job.user}] Job {job.id}: step `{job.step}` SUCCESS for video {job.video_id}")
+        else:
+            logger.error(f"[{job.user}] Job {job.id}: step `{job.step}` FAILED for video {job.video_id} - Reason: {response.get('error')}")
+
+        job.refresh_from_db()
+        channel.close('done', job_payload(job))
+    except Exception as e:
+        channel.close('done', {'job_id': job_id, 'state': JobStateChoices.FAILED, 'error': str(e)})
+        raise
+    finally:
+        close_old_connections()
+
+
+def cancel_job(job):
+    """
+    Sıradaki işi hemen iptal eder; çalışan işe iptal isteği bırakır. Adım bir sonraki ilerleme
+    olayında (görsel, segment, encode karesi) durur.
+    """
+    GenerationJob.objects.filter(id=job.id).update(cancel_requested=True)
+    cancelled_in_queue = GenerationJob.objects.filter(id=job.id, state=JobStateChoices.QUEUED).update(
+        state=JobStateChoices.CANCELLED,
+        error_message='Cancelled by user.',
+        finished_at=timezone.now(),
+    )
+    channel = get_channel(job.id)
+    if channel is not None:
+        channel.cancelled.set()
+    job.refresh_from_db()
+    if cancelled_in_queue and channel is not None:
+        channel.close('done', job_payload(job))
+    return job
+
+
+def submit_job(user, video, step, batch=None):
+    """
+    Adımı kuyruğa alır ve GenerationJob döner. Aynı video + adım için bitmemiş bir iş varsa yenisi açılmaz.
+    GENERATION_JOB_WORKERS = 0 ise iş istek içinde senkron çalışır (geliştirme/test).
+    """
+    active = GenerationJob.objects.filter(
+        video=video, step=step, state__in=[JobStateChoices.QUEUED, JobStateChoices.RUNNING],
+    ).first()
+    if active:
+        return active
+
+    job = GenerationJob.objects.create(video=video, user=user, step=step, batch=batch, worker=WORKER_ID)
+
+    if getattr(settings, 'GENERATION_JOB_WORKERS', 2) <= 0:
+        # Atomic blok dışında hemen çalışır; create_batch gibi bir bloğun içindeysek commit'ten sonra
+        # (execute_job'un close_old_connections çağrısı açık bloğun bağlantısını bozmasın)
+        transaction.on_commit(lambda: execute_job(job.id))
+    else:
+        executor = get_executor('batch' if batch else 'default')
+        # Satır commit edilmeden worker onu göremez
+        transaction.on_commit(lambda: executor.submit(execute_job, job.id))
+
+    job.refresh_from_db()
+    return job
+
+
+def job_payload(job):
+    """Durum endpoint'inin JSON gövdesi."""
+    return {
+        'job_id': job.id,
+        'video_id': job.video_id,
+        'step': job.step,
+        'state': job.state,
+        'state_display': job.get_state_display(),
+        'progress': job.progress,
+        'message': job.progress_message,
+        'result': job.result,
+        'error': job.error_message,
+        'created_at': job.created_at.isoformat(),
+        'queued_seconds': job.queued_seconds,
+        'run_seconds': job.run_seconds,
+        'cancel_requested': job.cancel_requested,
+    }
+
+
+def create_batch(user, panel, entries, duration_seconds=60):
+    """
+    entries: [{'title': ..., 'description': ..., 'duration_seconds': ...}, ...]
+    Videoları oluşturur ve her biri için `pipeline` işini batch kuyruğuna alır.
+    """
+    with transaction.atomic():
+        batch = VideoBatch.objects.create(panel=panel, user=user)
+        videos = [
+            Video.objects.create(
+                panel=panel,
+                title=entry['title'],
+                description=entry.get('description', ''),
+                duration_minutes=max(1, round(int(entry.get('duration_seconds') or duration_seconds) / 60)),
+                status='PENDING',
+            )
+            for entry in entries
+        ]
+        for video in videos:
+            submit_job(user, video, 'pipeline', batch=batch)
+    logger.info(f"[{user}] Batch {batch.id}: {len(videos)} video(s) queued for panel {panel.id}")
+    return batch
+
+
+def batch_stats(batch):
+    """Batch'in iş durumları, kuyruk derinliği, saatlik verim ve kalan süre tahmini."""
+    jobs = list(batch.jobs.select_related('video').order_by('id'))
+    counts = {state: 0 for state in JobStateChoices.values}
+    for job in jobs:
+        counts[job.state] += 1
+
+    finished = counts[JobStateChoices.SUCCEEDED] + counts[JobStateChoices.FAILED] + counts[JobStateChoices.CANCELLED]
+    remaining = len(jobs) - finished
+    started = [job.started_at for job in jobs if job.started_at]
+    ended = [job.finished_at for job in jobs if job.finished_at]
+
+    elapsed = None
+    if started:
+        until = max(ended) if not remaining and ended else timezone.now()
+        elapsed = max((until - min(started)).total_seconds(), 0.001)
+
+    throughput = finished / elapsed * 3600 if elapsed and finished else None  # video/saat
+    eta_seconds = round(remaining / throughput * 3600) if throughput and remaining else (0 if not remaining else None)
+
+    return {
+        'batch_id': batch.id,
+        'panel_id': batch.panel_id,
+        'total': len(jobs),
+        'queued': counts[JobStateChoices.QUEUED],
+        'running': counts[JobStateChoices.RUNNING],
+        'succeeded': counts[JobStateChoices.SUCCEEDED],
+        'failed': counts[JobStateChoices.FAILED],
+        'cancelled': counts[JobStateChoices.CANCELLED],
+        'queue_depth': counts[JobStateChoices.QUEUED],
+        'elapsed_seconds': round(elapsed, 1) if elapsed else None,
+        'throughput_per_hour': round(throughput, 2) if throughput else None,
+        'eta_seconds': eta_seconds,
+        'slots': slot_usage(),
+        'videos': [
+            {
+                'video_id': job.video_id,
+                'title': job.video.title,
+                'job_id': job.id,
+                'state': job.state,
+                'progress': job.progress,
+                'message': job.progress_message,
+                'error': job.error_message,
+            }
+            for job in jobs
+        ],
+    }
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0005_video_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='draft_video',
+            field=models.FileField(blank=True, null=True, upload_to='draft_videos/'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0006_video_draft_video'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StepRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.CharField(max_length=30)),
+                ('success', models.BooleanField(default=False)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('duration_seconds', models.FloatField(default=0)),
+                ('spans', models.JSONField(default=list)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='step_runs', to='videos.video')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
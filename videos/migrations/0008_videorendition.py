@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0007_steprun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('YOUTUBE_SHORTS', 'YouTube Shorts'), ('YOUTUBE_LONG', 'YouTube Long'), ('INSTAGRAM_REELS', 'Instagram Reels'), ('TIKTOK', 'TikTok')], max_length=20)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('fps', models.PositiveIntegerField(default=30)),
+                ('video_bitrate', models.CharField(blank=True, max_length=20, null=True)),
+                ('file', models.FileField(upload_to='renditions/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='videos.video')),
+            ],
+            options={
+                'ordering': ['platform'],
+                'unique_together': {('video', 'platform')},
+            },
+        ),
+    ]
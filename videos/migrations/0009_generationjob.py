@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0008_videorendition'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.CharField(max_length=30)),
+                ('state', models.CharField(choices=[('QUEUED', 'Sırada'), ('RUNNING', 'Çalışıyor'), ('SUCCEEDED', 'Tamamlandı'), ('FAILED', 'Hata')], default='QUEUED', max_length=20)),
+                ('progress', models.FloatField(default=0)),
+                ('progress_message', models.CharField(blank=True, max_length=255, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('step_run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='videos.steprun')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generation_jobs', to=settings.AUTH_USER_MODEL)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='videos.video')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0010_videobatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='cancel_requested',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='generationjob',
+            name='state',
+            field=models.CharField(choices=[('QUEUED', 'Sırada'), ('RUNNING', 'Çalışıyor'), ('SUCCEEDED', 'Tamamlandı'), ('FAILED', 'Hata'), ('CANCELLED', 'İptal edildi')], default='QUEUED', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0011_generationjob_cancel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='subtitle_words',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
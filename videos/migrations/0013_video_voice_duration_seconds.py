@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0012_video_subtitle_words'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='voice_duration_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
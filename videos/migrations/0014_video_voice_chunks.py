@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0013_video_voice_duration_seconds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='voice_chunks',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
-from panels.models import Panel
+from django.contrib.auth.models import User
+from panels.models import Panel, PlatformChoices
 
 class VideoTypeChoices(models.TextChoices):
     SHORT = 'SHORT', 'Short'
@@ -11,6 +12,13 @@ class VideoStatusChoices(models.TextChoices):
     ERROR = 'ERROR', 'Hata'
     COMPLETED = 'COMPLETED', 'Tamamlandı'
 
+class JobStateChoices(models.TextChoices):
+    QUEUED = 'QUEUED', 'Sırada'
+    RUNNING = 'RUNNING', 'Çalışıyor'
+    SUCCEEDED = 'SUCCEEDED', 'Tamamlandı'
+    FAILED = 'FAILED', 'Hata'
+    CANCELLED = 'CANCELLED', 'İptal edildi'
+
 class Video(models.Model):
     panel = models.ForeignKey(Panel, on_delete=models.CASCADE, related_name='videos')
 
@@ -26,10 +34,14 @@ class Video(models.Model):
 
     # İçerikler
     voice_file = models.FileField(upload_to='voices/', blank=True, null=True)
+    voice_duration_seconds = models.FloatField(blank=True, null=True)  # akış sırasında MP3 çerçevelerinden hesaplanır
+    voice_chunks = models.JSONField(blank=True, null=True)  # [{'index', 'text', 'start', 'end'}] — TTS parçalarının zamanları
     subtitle_file = models.FileField(upload_to='subtitle/', blank=True, null=True)
+    subtitle_words = models.JSONField(blank=True, null=True)  # hizalama modunda satır + kelime zamanları
     background_music = models.FileField(upload_to='music/', blank=True, null=True)
     thumbnail = models.ImageField(upload_to="thumbnails/", blank=True, null=True)
     final_video = models.FileField(upload_to='final_videos/', blank=True, null=True)
+    draft_video = models.FileField(upload_to='draft_videos/', blank=True, null=True)  # düşük çözünürlüklü önizleme
 
     # Zaman bilgisi
     created_at = models.DateTimeField(auto_now_add=True)
@@ -59,4 +71,103 @@ class VideoImage(models.Model):
     image = models.ImageField(upload_to='video_images/')
 
     def __str__(self):
-        return f"Image for {self.video.title}"
\ No newline at end of file
+        return f"Image for {self.video.title}"
+
+class StepRun(models.Model):
+    """generate_content adımlarının (text, voice, edit...) her çalıştırması ve aşama süreleri."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='step_runs')
+
+    step = models.CharField(max_length=30)
+    success = models.BooleanField(default=False)
+    error_message = models.TextField(blank=True, null=True)
+
+    duration_seconds = models.FloatField(default=0)
+    # [{"name": "encode", "start": 1.2, "duration": 30.5, "depth": 0, "status": "ok", "attrs": {"fps": 24.1}}, ...]
+    spans = models.JSONField(default=list)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.video.title} - {self.step} ({self.duration_seconds:.1f}s)"
+
+    class Meta:
+        ordering = ['-started_at']
+
+
+class VideoRendition(models.Model):
+    """Aynı videonun farklı platform/çözünürlük çıktıları (tek render'da üretilir)."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='renditions')
+
+    platform = models.CharField(max_length=20, choices=PlatformChoices.choices)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    fps = models.PositiveIntegerField(default=30)
+    video_bitrate = models.CharField(max_length=20, blank=True, null=True)
+    file = models.FileField(upload_to='renditions/')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.video.title} - {self.platform} ({self.width}x{self.height})"
+
+    class Meta:
+        ordering = ['platform']
+        unique_together = ('video', 'platform')
+
+
+class VideoBatch(models.Model):
+    """Bir panel için toplu üretim: her video için bir `pipeline` işi kuyruğa alınır."""
+    panel = models.ForeignKey(Panel, on_delete=models.CASCADE, related_name='batches')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='video_batches')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.panel.name} - batch #{self.id}"
+
+    class Meta:
+        ordering = ['-created_at']
+
+class GenerationJob(models.Model):
+    """generate_content adımının arka planda çalışan işi; görünüm iş id'sini döner, durum buradan okunur."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='jobs')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='generation_jobs')
+
+    step = models.CharField(max_length=30)
+    state = models.CharField(max_length=20, choices=JobStateChoices.choices, default=JobStateChoices.QUEUED)
+    progress = models.FloatField(default=0)  # 0.0 - 1.0
+    progress_message = models.CharField(max_length=255, blank=True, null=True)
+
+    result = models.JSONField(blank=True, null=True)  # adımın JSON yanıtı
+    error_message = models.TextField(blank=True, null=True)
+    step_run = models.ForeignKey(StepRun, on_delete=models.SET_NULL, blank=True, null=True, related_name='jobs')
+    batch = models.ForeignKey(VideoBatch, on_delete=models.SET_NULL, blank=True, null=True, related_name='jobs')
+
+    worker = models.CharField(max_length=100, blank=True, null=True)  # "host:pid", yarım kalan işleri bulmak için
+    cancel_requested = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def is_active(self):
+        return self.state in (JobStateChoices.QUEUED, JobStateChoices.RUNNING)
+
+    @property
+    def queued_seconds(self):
+        if not self.started_at:
+            return None
+        return (self.started_at - self.created_at).total_seconds()
+
+    @property
+    def run_seconds(self):
+        if not self.started_at or not self.finished_at:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+    def __str__(self):
+        return f"{self.video.title} - {self.step} ({self.state})"
+
+    class Meta:
+        ordering = ['-created_at']
@@ -0,0 +1,212 @@
+# videos/pipeline.py
+
+import os
+import time
+import logging
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from core.services.instrumentation import StepCancelled, current_recorder, emit_event, report_progress
+from .models import Video, VideoAIContent, VideoStatusChoices
+
+logger = logging.getLogger(__name__)
+
+# adım → bağımlı olduğu adımlar
+PIPELINE_GRAPH = {
+    'text': (),
+    'voice': ('text',),
+    'subtitle': ('voice',),
+    'content_images': ('voice',),
+    'thumbnail_image': ('text',),
+    'edit': ('subtitle', 'content_images', 'thumbnail_image'),
+}
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+BLOCKED = 'blocked'
+CANCELLED = 'cancelled'
+
+
+def _file_mtime(field):
+    if not field:
+        return None
+    try:
+        return os.path.getmtime(field.path)
+    except (OSError, ValueError, NotImplementedError):
+        return None
+
+
+def output_timestamp(video, step):
+    """Adımın çıktısının son üretilme zamanı (epoch saniye); çıktı yoksa None."""
+    if step == 'text':
+        ai_content = VideoAIContent.objects.filter(video=video).first()
+        return ai_content.updated_at.timestamp() if ai_content and ai_content.script.strip() else None
+    if step == 'voice':
+        return _file_mtime(video.voice_file)
+    if step == 'subtitle':
+        return _file_mtime(video.subtitle_file)
+    if step == 'content_images':
+        stamps = [_file_mtime(img.image) for img in video.images.all()]
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        return max(stamps) if stamps else None
+    if step == 'thumbnail_image':
+        return _file_mtime(video.thumbnail)
+    if step == 'edit':
+        return _file_mtime(video.final_video)
+    return None
+
+
+def is_up_to_date(video, step):
+    """Çıktı var ve bütün girdilerinden daha yeni ise adım atlanabilir."""
+    stamp = output_timestamp(video, step)
+    if stamp is None:
+        return False
+    for dep in PIPELINE_GRAPH[step]:
+        dep_stamp = output_timestamp(video, dep)
+        if dep_stamp is None or dep_stamp > stamp:
+            return False
+    return True
+
+
+def critical_path_seconds(nodes):
+    """Düğüm sürelerine göre grafın en uzun yolu; paralel çalıştırmanın ulaşabileceği alt sınır."""
+    finish = {}
+    for step in PIPELINE_GRAPH:  # sözlük sırası topolojik sıradır
+        start = max((finish[dep] for dep in PIPELINE_GRAPH[step]), default=0.0)
+        finish[step] = start + (nodes[step].get('duration') or 0.0)
+    return round(max(finish.values(), default=0.0), 2)
+
+
+def _run_node(user, video_id, step):
+    """Düğümü kendi thread'inde, kendi Video örneği ve DB bağlantısıyla çalıştırır."""
+    from .jobs import run_step
+
+    close_old_connections()
+    try:
+        video = Video.objects.select_related('panel').get(id=video_id)
+        response, step_run = run_step(user, video, step)
+        return response, step_run.id if step_run else None
+    finally:
+        close_old_connections()
+
+
+def run_pipeline(user, video, force=False, workers=None):
+    """
+    text → voice → (subtitle ∥ content_images) ve text → thumbnail_image, hepsi → edit grafını çalıştırır.
+    Girdileri hazır olan adımlar aynı anda koşar; çıktısı girdilerinden yeni olan adımlar atlanır (force=False).
+    Her düğüm kendi StepRun'ını yazar; bu fonksiyon düğüm sürelerini ve kritik yolu döner.
+    """
+    workers = workers or getattr(settings, 'PIPELINE_WORKERS', 3)
+    recorder = current_recorder()
+    started = time.perf_counter()
+    nodes = {step: {'status': PENDING} for step in PIPELINE_GRAPH}
+    running = {}
+
+    cancelled = False
+
+    def finished(step):
+        return nodes[step]['status'] in (SUCCEEDED, SKIPPED)
+
+    def notify(step, done=None):
+        """Düğüm olayını canlı akışa yollar; iş iptal edildiyse yeni düğüm başlatılmaz."""
+        nonlocal cancelled
+        node = {key: value for key, value in nodes[step].items() if not key.startswith('_')}
+        try:
+            emit_event('node', step=step, **node)
+            if done is not None:
+                report_progress(done, len(nodes), f"{step}: {node['status']}")
+        except StepCancelled:
+            cancelled = True
+
+    Video.objects.filter(id=video.id).update(status=VideoStatusChoices.GENERATING, error_message=None)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pipeline') as pool:
+        while True:
+            for step, deps in PIPELINE_GRAPH.items():
+                node = nodes[step]
+                if node['status'] != PENDING:
+                    continue
+                if cancelled:
+                    node['status'] = CANCELLED
+                    continue
+                if any(nodes[dep]['status'] in (FAILED, BLOCKED) for dep in deps):
+                    node['status'] = BLOCKED
+                    continue
+                if not all(finished(dep) for dep in deps):
+                    continue
+
+                # Bu çalıştırmada yeniden üretilen bir girdi varsa çıktı zaten eskimiştir
+                rerun_dep = any(nodes[dep]['status'] == SUCCEEDED for dep in deps)
+                if not force and not rerun_dep and is_up_to_date(video, step):
+                    node['status'] = SKIPPED
+                    logger.info(f"[{user}] Pipeline {video.id}: `{step}` is up to date, skipped")
+                    notify(step)
+                    continue
+
+                node['status'] = RUNNING
+                node['start'] = round(time.perf_counter() - started, 4)
+                node['_started'] = time.perf_counter()
+                logger.info(f"[{user}] Pipeline {video.id}: `{step}` started")
+                notify(step)
+                # Düğümün olayları (görsel, segment, encode) bu işin akışına da düşsün
+                running[pool.submit(contextvars.copy_context().run, _run_node, user, video.id, step)] = step
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                node = nodes[step]
+                node['duration'] = round(time.perf_counter() - node.pop('_started'), 4)
+                try:
+                    response, step_run_id = future.result()
+                except Exception as e:
+                    logger.exception(f"[{user}] Pipeline {video.id}: `{step}` raised")
+                    response, step_run_id = {'success': False, 'error': str(e)}, None
+
+                node['status'] = SUCCEEDED if response.get('success') else FAILED
+                node['step_run_id'] = step_run_id
+                if not response.get('success'):
+                    node['error'] = response.get('error')
+                if recorder is not None:
+                    recorder.add(
+                        f"node:{step}", started + node['start'], node['duration'],
+                        status='ok' if node['status'] == SUCCEEDED else 'error',
+                    )
+
+                completed = sum(1 for n in nodes.values() if n['status'] not in (PENDING, RUNNING))
+                notify(step, done=completed)
+
+    wall_seconds = round(time.perf_counter() - started, 2)
+    success = all(finished(step) for step in nodes)
+    response = {
+        'success': success,
+        'nodes': nodes,
+        'wall_seconds': wall_seconds,
+        'critical_path_seconds': critical_path_seconds(nodes),
+    }
+    if cancelled:
+        response['error'] = 'Pipeline cancelled.'
+    elif not success:
+        failed = [step for step, node in nodes.items() if node['status'] == FAILED]
+        response['error'] = f"Pipeline failed at: {', '.join(failed) or 'unknown step'}"
+
+    Video.objects.filter(id=video.id).update(
+        status=VideoStatusChoices.COMPLETED if success else VideoStatusChoices.ERROR,
+        error_message=response.get('error'),
+    )
+    video.refresh_from_db()
+    if video.final_video:
+        response['final_video_url'] = video.final_video.url
+    return response
+
+
+def generate_pipeline_util(user, video):
+    return run_pipeline(user, video)
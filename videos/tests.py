@@ -1,3 +1,521 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import UserAPIKeys
+from core.benchmarks.fake_provider import FakeProviderServer
+from core.benchmarks.inputs import synthetic_audio, synthetic_images, synthetic_srt
+from core.agents.image_content_agent import GeneratedImage, ImageContentAgent
+from core.services.agent_cache import get_agent_cache
+from core.services.api_clients import get_client_registry
+from core.services import ffmpeg_composer, frame_stream, parallel_render, video_composer
+from core.services.instrumentation import StepCancelled, emit_event, event_listener
+from panels.models import Panel, PlatformChoices, RenderBackendChoices
+from videos.jobs import STEP_UTILS, batch_stats, cancel_job, create_batch, execute_job
+from videos.models import GenerationJob, JobStateChoices, StepRun, Video, VideoAIContent, VideoBatch, VideoImage
+from videos.pipeline import PIPELINE_GRAPH, critical_path_seconds, run_pipeline
+from videos.utils import generate_image_content_util, generate_text_content_util
+
+
+class AgentCacheStepTests(TestCase):
+    """Cache açık: her görsel slotu ayrı görsel alır, yeniden üretim sağlayıcıya gider, aynı girdiyle tekrar çalışma gitmez."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.provider = FakeProviderServer(latency=0, jitter=0).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.provider.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp(prefix="videos-tests-")
+        self.settings_override = override_settings(
+            OPENAI_BASE_URL=self.provider.openai_base_url,
+            MEDIA_ROOT=self.media_root,
+            AGENT_CACHE_ENABLED=True,
+            AGENT_CACHE_DIR=f"{self.media_root}/agent_cache",
+            IMAGE_RATE_LIMIT_PER_MINUTE=6000,
+            IMAGE_GENERATION_CONCURRENCY=2,
+        )
+        self.settings_override.enable()
+        get_client_registry().close()
+        self.provider.stats.clear()
+        # Süreç genelindeki cache bu testin geçici dizinine kurulsun
+        cache_patcher = mock.patch("core.services.agent_cache._cache", None)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+        self.user = User.objects.create_user(username="cache-tests")
+        UserAPIKeys.objects.create(user=self.user, openai_api_key="sk-cache-tests")
+        panel = Panel.objects.create(user=self.user, name="Test", platform=PlatformChoices.YOUTUBE_SHORTS)
+        self.video = Video.objects.create(panel=panel, title="Ahtapotun üç kalbi", description="Kısa bilgi")
+
+    def tearDown(self):
+        get_client_registry().close()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _image_entries(self):
+        return get_agent_cache().stats()["agents"].get("image_content_generator", {}).get("entries", 0)
+
+    def test_each_image_slot_calls_the_provider(self):
+        VideoAIContent.objects.create(
+            video=self.video, title="t", script="s", hashtags=[], description="d",
+            thumbnail_prompt="thumb", content_prompt="deep sea, octopus",
+        )
+        self.video.voice_file.name = "voices/voice.mp3"
+        self.video.voice_duration_seconds = 40.0  # 4 görsel slotu
+        self.video.save()
+
+        first = generate_image_content_util(self.user, self.video)
+        self.assertTrue(first["success"], first)
+        self.assertEqual(len(first["images"]), 4)
+        self.assertEqual(self.provider.stats["images 200"], 4)
+        self.assertEqual(self._image_entries(), 4)  # slot başına ayrı anahtar
+
+        # Görseller varken yeniden çalıştırma cache'i atlar ve yeni görseller üretir
+        second = generate_image_content_util(self.user, self.video)
+        self.assertTrue(second["success"], second)
+        self.assertEqual(self.provider.stats["images 200"], 8)
+        self.assertEqual(len(set(first["images"]) | set(second["images"])), 8)
+
+        # Görseller silinip aynı girdiyle çalıştırılırsa cache'ten gelir
+        self.video.images.all().delete()
+        third = generate_image_content_util(self.user, self.video)
+        self.assertTrue(third["success"], third)
+        self.assertEqual(len(third["images"]), 4)
+        self.assertEqual(self.provider.stats["images 200"], 8)
+
+    def test_text_step_rerun_calls_the_provider(self):
+        for _ in range(2):
+            response = generate_text_content_util(self.user, self.video)
+            self.assertTrue(response["success"], response)
+        self.assertEqual(self.provider.stats["chat 200"], 2)
+
+        # Metin yokken aynı girdi cache'ten gelir
+        VideoAIContent.objects.filter(video=self.video).delete()
+        response = generate_text_content_util(self.user, self.video)
+        self.assertTrue(response["success"], response)
+        self.assertEqual(self.provider.stats["chat 200"], 2)
+
+
+class ImageRetryTests(TestCase):
+    """Tek bir slota gelen 429 yalnızca o slotu yeniden denetir; görseller slot sırasıyla kaydedilir."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.provider = FakeProviderServer(latency=0.05, jitter=0.5).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.provider.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp(prefix="image-retry-tests-")
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            OPENAI_BASE_URL=self.provider.openai_base_url,
+            MEDIA_ROOT=self.media_root,
+            AGENT_CACHE_ENABLED=False,
+            # 429 ajan katmanında yeniden denenmesin; slot turu denesin
+            AGENT_RETRY_MAX_ATTEMPTS=1,
+            IMAGE_RATE_LIMIT_PER_MINUTE=6000,
+            IMAGE_GENERATION_CONCURRENCY=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_client_registry().close()
+        self.addCleanup(get_client_registry().close)
+
+        self.user = User.objects.create_user(username="image-retry")
+        UserAPIKeys.objects.create(user=self.user, openai_api_key="sk-image-retry")
+        panel = Panel.objects.create(user=self.user, name="Test", platform=PlatformChoices.YOUTUBE_SHORTS)
+        self.video = Video.objects.create(panel=panel, title="Sıra")
+        VideoAIContent.objects.create(
+            video=self.video, title="t", script="s", hashtags=[], description="d",
+            thumbnail_prompt="thumb", content_prompt="coral reef",
+        )
+        self.video.voice_file.name = "voices/voice.mp3"
+        self.video.voice_duration_seconds = 40.0  # 4 görsel slotu
+        self.video.save()
+
+    def test_throttled_slot_is_retried_alone_and_order_is_kept(self):
+        self.provider.stats.clear()
+        self.provider.fail_request("images", nth=2, status=429)
+        calls = []
+        failures = []
+        original = ImageContentAgent.generate
+
+        def generate(agent, *args, variant=0, **kwargs):
+            calls.append(variant)
+            try:
+                original(agent, *args, variant=variant, **kwargs)
+            except Exception:
+                failures.append(variant)
+                raise
+            # Sağlayıcının görselleri aynı prompt için aynı; sırayı izlemek için slota özgü görsel
+            return GeneratedImage.from_bytes(self.provider.image_png(variant, 16, 16))
+
+        with mock.patch.object(ImageContentAgent, "generate", autospec=True, side_effect=generate):
+            response = generate_image_content_util(self.user, self.video)
+
+        self.assertTrue(response["success"], response)
+        self.assertNotIn("failed_images", response)
+        self.assertEqual(self.provider.stats["images 429"], 1)
+        self.assertEqual(self.provider.stats["images 200"], 4)
+        # base64 yanıt doğrudan çözülür; ayrı dosya indirmesi yok
+        self.assertEqual(self.provider.stats["GET /files"], 0)
+        self.assertEqual(len(failures), 1)
+        # Sadece 429 alan slot ikinci kez istendi
+        self.assertEqual(sorted(calls), sorted([0, 1, 2, 3] + failures))
+        saved = [image.image.read() for image in self.video.images.order_by("id")]
+        self.assertEqual(saved, [self.provider.image_png(slot, 16, 16) for slot in range(4)])
+
+
+class JobCancelStateTests(TransactionTestCase):
+    """İptal isteği yalnızca adımı gerçekten durdurduysa iş CANCELLED olur."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="cancel-tests")
+        panel = Panel.objects.create(user=self.user, name="Test", platform=PlatformChoices.YOUTUBE_SHORTS)
+        self.video = Video.objects.create(panel=panel, title="İptal")
+        self.job = GenerationJob.objects.create(video=self.video, user=self.user, step="text")
+
+    def _run(self, util):
+        with mock.patch.dict(STEP_UTILS, {"text": util}):
+            execute_job(self.job.id)
+        self.job.refresh_from_db()
+        return self.job
+
+    def test_step_that_finishes_after_cancel_request_succeeds(self):
+        def util(user, video):
+            cancel_job(self.job)  # olay üretmeyen adım bayrağı hiç görmez
+            return {"success": True}
+
+        job = self._run(util)
+        self.assertEqual(job.state, JobStateChoices.SUCCEEDED)
+        self.assertIsNone(job.error_message)
+
+    def test_step_stopped_by_cancel_is_cancelled(self):
+        def util(user, video):
+            cancel_job(self.job)
+            emit_event("image", index=1, total=2)
+            return {"success": True}
+
+        job = self._run(util)
+        self.assertEqual(job.state, JobStateChoices.CANCELLED)
+
+
+class RenderCancelTests(TransactionTestCase):
+    """Render sırasında iptal edilen edit işi başka bir backend'e düşmeden durur."""
+
+    BACKENDS = {
+        RenderBackendChoices.FFMPEG: (ffmpeg_composer, "compose_video_ffmpeg"),
+        RenderBackendChoices.STREAMING: (frame_stream, "compose_video_streaming"),
+        RenderBackendChoices.MOVIEPY: (video_composer, "compose_video_moviepy"),
+        "segmented": (parallel_render, "compose_video_parallel"),
+    }
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp(prefix="render-cancel-")
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, RENDER_CACHE_ENABLED=False, RENDER_PARALLEL_WORKERS=1)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="render-cancel")
+        self.panel = Panel.objects.create(
+            user=self.user, name="Test", platform=PlatformChoices.YOUTUBE_SHORTS,
+            resolution_width=180, resolution_height=320,
+        )
+        self.video = Video.objects.create(panel=self.panel, title="İptal")
+        with tempfile.TemporaryDirectory() as tmp:
+            for field, path in (("voice_file", synthetic_audio(tmp, 6)), ("subtitle_file", synthetic_srt(tmp, 3, 6))):
+                with open(path, "rb") as f:
+                    getattr(self.video, field).save(os.path.basename(path), File(f), save=False)
+            self.video.save()
+            for path in synthetic_images(tmp, 2, size=(180, 320)):
+                with open(path, "rb") as f:
+                    VideoImage.objects.create(video=self.video, image=File(f, name=os.path.basename(path)))
+
+    def _cancel_mid_render(self, backend):
+        Panel.objects.filter(id=self.panel.id).update(render_backend=backend)
+        job = GenerationJob.objects.create(video=self.video, user=self.user, step="edit")
+
+        def cancel_on_progress(job_id):
+            # İlk kare/segment ilerlemesinde iptal isteği gelir
+            return lambda fraction, message=None: cancel_job(job)
+
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch("videos.jobs._progress_writer", cancel_on_progress))
+            calls = {
+                name: stack.enter_context(mock.patch.object(module, attr, wraps=getattr(module, attr)))
+                for name, (module, attr) in self.BACKENDS.items()
+            }
+            execute_job(job.id)
+
+        job.refresh_from_db()
+        self.video.refresh_from_db()
+        return job, [name for name, patched in calls.items() if patched.called]
+
+    def test_cancel_stops_render_without_fallback(self):
+        for backend in (RenderBackendChoices.FFMPEG, RenderBackendChoices.STREAMING, RenderBackendChoices.MOVIEPY):
+            with self.subTest(backend=backend):
+                job, ran = self._cancel_mid_render(backend)
+                self.assertEqual(job.state, JobStateChoices.CANCELLED)
+                self.assertEqual(ran, [backend])
+                self.assertFalse(self.video.final_video)
+                output_dir = os.path.join(self.media_root, "final_videos")
+                self.assertEqual(os.listdir(output_dir) if os.path.isdir(output_dir) else [], [])
+
+    @override_settings(RENDER_PARALLEL_WORKERS=2)
+    def test_cancel_stops_segmented_render_without_fallback(self):
+        job, ran = self._cancel_mid_render(RenderBackendChoices.MOVIEPY)
+        self.assertEqual(job.state, JobStateChoices.CANCELLED)
+        self.assertEqual(ran, ["segmented"])
+        self.assertFalse(self.video.final_video)
+
+
+class PipelineTests(TransactionTestCase):
+    """Adım grafı: bağımsız adımlar paralel koşar, güncel adımlar atlanır, hata ve iptal yayılır."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp(prefix="pipeline-tests-")
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, PIPELINE_WORKERS=3)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username="pipeline-tests")
+        panel = Panel.objects.create(user=self.user, name="Test", platform=PlatformChoices.YOUTUBE_SHORTS)
+        self.video = Video.objects.create(panel=panel, title="Graf")
+        self.ran = []
+        self.lock = threading.Lock()
+
+    def _stub(self, step, result=None, barrier=None):
+        def util(user, video):
+            with self.lock:
+                self.ran.append(step)
+            if barrier is not None:
+                # İki adım da aynı anda çalışmıyorsa bariyer zaman aşımına uğrar
+                if barrier.wait(timeout=5) == 0:
+                    # StepRun yazımları çakışmasın (test veritabanı SQLite)
+                    time.sleep(0.05)
+            if isinstance(result, Exception):
+                raise result
+            return result or {'success': True}
+        return util
+
+    def _run(self, overrides=None, **kwargs):
+        utils = {step: self._stub(step) for step in PIPELINE_GRAPH}
+        utils.update(overrides or {})
+        with mock.patch.dict(STEP_UTILS, utils):
+            return run_pipeline(self.user, self.video, **kwargs)
+
+    def _write_outputs(self):
+        """Bütün adımların çıktısını girdilerinden sonra, sırayla yazar."""
+        VideoAIContent.objects.create(video=self.video, title="t", script="s", hashtags=[], description="d")
+        base = time.time() + 10
+        fields = {'voice': 'voice_file', 'subtitle': 'subtitle_file', 'thumbnail_image': 'thumbnail', 'edit': 'final_video'}
+        for offset, (step, field) in enumerate(fields.items()):
+            getattr(self.video, field).save(f"{step}.bin", ContentFile(b"x"), save=False)
+        self.video.save()
+        image = VideoImage.objects.create(video=self.video, image=ContentFile(b"x", name="image.png"))
+        stamps = {'voice': 0, 'subtitle': 1, 'content_images': 1, 'thumbnail_image': 1, 'edit': 2}
+        paths = {step: getattr(self.video, field).path for step, field in fields.items()}
+        paths['content_images'] = image.image.path
+        for step, path in paths.items():
+            os.utime(path, (base + stamps[step], base + stamps[step]))
+        return paths, base
+
+    def test_independent_steps_run_concurrently(self):
+        voice_thumbnail = threading.Barrier(2)
+        subtitle_images = threading.Barrier(2)
+        response = self._run({
+            'voice': self._stub('voice', barrier=voice_thumbnail),
+            'thumbnail_image': self._stub('thumbnail_image', barrier=voice_thumbnail),
+            'subtitle': self._stub('subtitle', barrier=subtitle_images),
+            'content_images': self._stub('content_images', barrier=subtitle_images),
+        })
+        self.assertTrue(response['success'], response)
+        self.assertEqual(self.ran[0], 'text')
+        self.assertEqual(self.ran[-1], 'edit')
+        self.assertEqual(sorted(self.ran), sorted(PIPELINE_GRAPH))
+        self.assertEqual(StepRun.objects.filter(video=self.video).count(), len(PIPELINE_GRAPH))
+
+    def test_up_to_date_steps_are_skipped(self):
+        paths, base = self._write_outputs()
+        response = self._run()
+        self.assertTrue(response['success'], response)
+        self.assertEqual(self.ran, [])
+        self.assertEqual({node['status'] for node in response['nodes'].values()}, {'skipped'})
+
+        # Ses altyazıdan ve görsellerden yeni: onlar ve onlara bağlı edit yeniden çalışır
+        os.utime(paths['voice'], (base + 5, base + 5))
+        response = self._run()
+        self.assertTrue(response['success'], response)
+        self.assertEqual(sorted(self.ran), ['content_images', 'edit', 'subtitle'])
+        self.assertEqual(response['nodes']['thumbnail_image']['status'], 'skipped')
+
+        self.ran.clear()
+        response = self._run(force=True)
+        self.assertEqual(sorted(self.ran), sorted(PIPELINE_GRAPH))
+
+    def test_dependents_of_failed_step_are_blocked(self):
+        with self.assertLogs("videos.pipeline", level="ERROR"):
+            response = self._run({
+                'content_images': self._stub('content_images', {'success': False, 'error': 'quota'}),
+                'thumbnail_image': self._stub('thumbnail_image', RuntimeError('boom')),
+            })
+        nodes = response['nodes']
+        self.assertFalse(response['success'])
+        self.assertEqual(nodes['content_images']['status'], 'failed')
+        self.assertEqual(nodes['content_images']['error'], 'quota')
+        self.assertEqual(nodes['thumbnail_image']['status'], 'failed')
+        self.assertEqual(nodes['thumbnail_image']['error'], 'boom')
+        self.assertEqual(nodes['subtitle']['status'], 'succeeded')
+        self.assertEqual(nodes['edit']['status'], 'blocked')
+        self.assertNotIn('edit', self.ran)
+        self.assertIn('content_images', response['error'])
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.status, 'ERROR')
+
+    def test_cancel_from_node_event_stops_new_steps(self):
+        def listener(kind, data):
+            # İş iptal edildiğinde kanal dinleyicisi StepCancelled fırlatır
+            if kind == 'node' and data['step'] == 'text' and data['status'] == 'succeeded':
+                raise StepCancelled()
+
+        with event_listener(listener):
+            response = self._run()
+        self.assertFalse(response['success'])
+        self.assertEqual(response['error'], 'Pipeline cancelled.')
+        self.assertEqual(self.ran, ['text'])
+        self.assertEqual(
+            {step: node['status'] for step, node in response['nodes'].items()},
+            {'text': 'succeeded', **{step: 'cancelled' for step in PIPELINE_GRAPH if step != 'text'}},
+        )
+
+    def test_critical_path(self):
+        durations = {'text': 1.0, 'voice': 2.0, 'subtitle': 3.0, 'content_images': 5.0, 'thumbnail_image': 9.0, 'edit': 2.0}
+        nodes = {step: {'duration': duration} for step, duration in durations.items()}
+        # text → thumbnail_image → edit
+        self.assertEqual(critical_path_seconds(nodes), 12.0)
+        nodes['thumbnail_image'] = {'status': 'skipped'}
+        # text → voice → content_images → edit; atlanan düğüm süre katmaz
+        self.assertEqual(critical_path_seconds(nodes), 10.0)
+        self.assertEqual(critical_path_seconds({step: {} for step in PIPELINE_GRAPH}), 0.0)
+
+
+@override_settings(GENERATION_JOB_WORKERS=0)
+class BatchTests(TransactionTestCase):
+    """Toplu üretim: senkron modda işler batch commit edildikten sonra çalışır; yalnızca kendi paneline."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="batch-tests", password="pw")
+        self.panel = Panel.objects.create(user=self.user, name="Test", platform=PlatformChoices.YOUTUBE_SHORTS)
+        self.seen = []
+
+    def _pipeline(self, user, video):
+        # İş, create_batch'in atomic bloğu kapandıktan sonra ve batch görünür durumdayken çalışmalı
+        self.seen.append((transaction.get_connection().in_atomic_block, VideoBatch.objects.count()))
+        return {'success': True}
+
+    def test_create_batch_runs_sync_jobs_after_commit(self):
+        entries = [
+            {'title': 'Bir', 'description': 'ilk'},
+            {'title': 'İki', 'duration_seconds': 150},
+        ]
+        with mock.patch.dict(STEP_UTILS, {'pipeline': self._pipeline}):
+            batch = create_batch(self.user, self.panel, entries, duration_seconds=60)
+
+        self.assertEqual(self.seen, [(False, 1), (False, 1)])
+        videos = list(Video.objects.filter(panel=self.panel).order_by('id'))
+        self.assertEqual([(v.title, v.duration_minutes) for v in videos], [('Bir', 1), ('İki', 2)])
+        jobs = list(batch.jobs.order_by('id'))
+        self.assertEqual([job.video_id for job in jobs], [v.id for v in videos])
+        self.assertEqual({job.step for job in jobs}, {'pipeline'})
+        self.assertEqual({job.state for job in jobs}, {JobStateChoices.SUCCEEDED})
+
+    def test_batch_stats(self):
+        batch = VideoBatch.objects.create(panel=self.panel, user=self.user)
+        start = timezone.now() - timedelta(hours=1)
+        for idx, state in enumerate([JobStateChoices.SUCCEEDED, JobStateChoices.FAILED, JobStateChoices.QUEUED]):
+            video = Video.objects.create(panel=self.panel, title=f"V{idx}")
+            finished = state != JobStateChoices.QUEUED
+            GenerationJob.objects.create(
+                video=video, user=self.user, step='pipeline', batch=batch, state=state,
+                started_at=start if finished else None,
+                finished_at=start + timedelta(minutes=30) if finished else None,
+            )
+
+        stats = batch_stats(batch)
+        self.assertEqual(
+            {key: stats[key] for key in ('total', 'queued', 'running', 'succeeded', 'failed', 'cancelled', 'queue_depth')},
+            {'total': 3, 'queued': 1, 'running': 0, 'succeeded': 1, 'failed': 1, 'cancelled': 0, 'queue_depth': 1},
+        )
+        # 2 iş ~1 saatte bitti: ~2 video/saat, kalan 1 iş için ~30 dk
+        self.assertAlmostEqual(stats['throughput_per_hour'], 2.0, delta=0.05)
+        self.assertAlmostEqual(stats['eta_seconds'], 1800, delta=30)
+        self.assertEqual([video['title'] for video in stats['videos']], ['V0', 'V1', 'V2'])
+
+        # Hepsi bitince süre son işin bitişinde durur
+        GenerationJob.objects.filter(batch=batch, state=JobStateChoices.QUEUED).update(
+            state=JobStateChoices.SUCCEEDED, started_at=start, finished_at=start + timedelta(minutes=45),
+        )
+        stats = batch_stats(batch)
+        self.assertEqual(stats['elapsed_seconds'], 2700.0)
+        self.assertEqual(stats['throughput_per_hour'], 4.0)
+        self.assertEqual(stats['eta_seconds'], 0)
+
+    def test_batch_create_only_for_own_panel(self):
+        other = User.objects.create_user(username="batch-other")
+        other_panel = Panel.objects.create(user=other, name="Other", platform=PlatformChoices.TIKTOK)
+        client = Client()
+        client.force_login(self.user)
+        body = json.dumps({'videos': [{'title': 'Bir'}]})
+
+        with mock.patch.dict(STEP_UTILS, {'pipeline': self._pipeline}):
+            response = client.post(
+                reverse('videos:batch_create', args=[other_panel.id]), body, content_type='application/json',
+            )
+            self.assertEqual(response.status_code, 404)
+            self.assertFalse(VideoBatch.objects.exists())
+            self.assertFalse(Video.objects.filter(panel=other_panel).exists())
+
+            response = client.post(
+                reverse('videos:batch_create', args=[self.panel.id]), body, content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['total'], 1)
+        self.assertEqual(response.json()['succeeded'], 1)
+
+    def test_batch_create_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(
+            reverse('videos:batch_create', args=[self.panel.id]),
+            json.dumps({'videos': [{'title': 'Bir'}]}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(VideoBatch.objects.exists())
@@ -5,6 +5,11 @@ app_name = 'videos'
 
 urlpatterns = [
     path('<int:video_id>/generate/<str:step>/', views.generate_content, name='generate_content'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/events/', views.job_events, name='job_events'),
+    path('jobs/<int:job_id>/cancel/', views.job_cancel, name='job_cancel'),
+    path('batch/<int:panel_id>/', views.batch_create, name='batch_create'),
+    path('batches/<int:batch_id>/', views.batch_status, name='batch_status'),
     path('', views.video_list, name='list'),
     path('create/<int:panel_id>/', views.video_create, name='create'),
     path('<int:pk>/', views.video_detail, name='detail'),
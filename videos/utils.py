@@ -3,6 +3,17 @@ from django.core.files.base import ContentFile
 from .models import VideoAIContent
 from core.agents.text_agent import TextAgent
 from core.agents.voice_agent import VoiceAgent
+from core.services.agent_cache import agent_cache_bypass
+from core.services.audio_stream import ChunkStream, Mp3DurationCounter
+from core.services.instrumentation import emit_event, report_progress, span
+from core.services.voice_stitcher import loudness_gains, measure_audio, split_script, stitch_voice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.files import File
+from contextlib import nullcontext
+import contextvars
+import tempfile
+import os
 import logging
 logger = logging.getLogger(__name__)
 
@@ -18,14 +29,17 @@ def generate_text_content_util(user, video):
     if not api_key:
         return {'success': False, 'error': 'API key not found'}
 
+    # Metin zaten varsa adım bilerek yeniden çalıştırılmıştır: cache okunmaz, yeni metin üretilir
+    existing = VideoAIContent.objects.filter(video=video).exclude(script='').exists()
     text_agent = TextAgent()
-    response = text_agent._run(
-        api_key=api_key,
-        topic_title=video.title,
-        prompt_context=video.description,
-        duration_minutes=video.duration_minutes,
-        language=video.panel.language if video.panel else 'tr'
-    )
+    with agent_cache_bypass() if existing else nullcontext():
+        response = text_agent._run(
+            api_key=api_key,
+            topic_title=video.title,
+            prompt_context=video.description,
+            duration_minutes=video.duration_minutes,
+            language=video.panel.language if video.panel else 'tr'
+        )
 
     ai_content, created = VideoAIContent.objects.update_or_create(
         video=video,
@@ -40,7 +54,7 @@ def generate_text_content_util(user, video):
     )
 
     video.status = 'TEXT_GENERATED'
-    video.save()
+    video.save(update_fields=['status', 'updated_at'])
 
     return {
         'success': True,
@@ -55,6 +69,58 @@ def generate_text_content_util(user, video):
     }
 
 
+def _synthesize_voice_chunks(user, video, agent, api_key, chunks, tmp_dir):
+    """
+    Metin parçalarını eşzamanlı sentezler; her parça geçici dosyaya akar ve ses seviyesi/süresi ölçülür.
+    Başarısız parçalar TTS_CHUNK_RETRIES tur yeniden denenir. Sırasıyla [(yol, lufs, süre)] döner.
+    """
+    concurrency = max(1, getattr(settings, 'TTS_CHUNK_CONCURRENCY', 4))
+    retries = getattr(settings, 'TTS_CHUNK_RETRIES', 1)
+    context_chars = getattr(settings, 'TTS_CHUNK_CONTEXT_CHARS', 300)
+
+    def synthesize(idx):
+        path = os.path.join(tmp_dir, f"chunk_{idx:03}.mp3")
+        # Komşu parçaların metni tonlamanın parça sınırında kopmaması için bağlam olarak gider
+        previous_text = chunks[idx - 1][-context_chars:] if idx > 0 else None
+        next_text = chunks[idx + 1][:context_chars] if idx + 1 < len(chunks) else None
+        with span("agent:voice_generator", streaming=True, chunk=idx) as attrs, open(path, 'wb') as f:
+            for data in agent.stream(api_key=api_key, text=chunks[idx], previous_text=previous_text, next_text=next_text):
+                f.write(data)
+            attrs['chars'] = len(chunks[idx])
+        lufs, duration = measure_audio(path)
+        return path, lufs, duration
+
+    results = {}
+    pending = list(range(len(chunks)))
+    errors = {}
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks)), thread_name_prefix='tts-chunk') as pool:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                logger.warning(f"[{user}] Retrying {len(pending)} failed voice chunk(s) for video {video.id} (attempt {attempt + 1})")
+
+            futures = {pool.submit(contextvars.copy_context().run, synthesize, idx): idx for idx in pending}
+            failed = []
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    results[idx] = future.result()
+                except Exception as e:
+                    logger.error(f"[{user}] Voice chunk {idx + 1}/{len(chunks)} failed: {str(e)}")
+                    errors[idx] = str(e)
+                    failed.append(idx)
+                    continue
+                errors.pop(idx, None)
+                report_progress(len(results), len(chunks), f"Ses parçası {len(results)}/{len(chunks)}")
+                emit_event("voice_chunk", index=idx, total=len(chunks), duration=round(results[idx][2], 2))
+            pending = sorted(failed)
+
+    if pending:
+        raise RuntimeError(f"{len(pending)} voice chunk(s) failed: {errors[pending[0]]}")
+    return [results[idx] for idx in range(len(chunks))]
+
+
 def generate_voice_content_util(user, video):
     if not hasattr(video, "ai_content") or not video.ai_content.script.strip():
         return {'success': False, 'error': 'AI content script not found or empty. Please complete previous steps.'}
@@ -69,32 +135,161 @@ def generate_voice_content_util(user, video):
     text = video.ai_content.script.strip()
     voice = "onyx"  # sabit erkek sesi
 
+    # Uzun metin sağlayıcı sınırına sığan parçalara bölünür; parçalar paralel sentezlenip birleştirilir
+    chunks = split_script(text, getattr(settings, 'TTS_CHUNK_MAX_CHARS', 1500))
+
     agent = VoiceAgent()
-    result = agent._run(api_key=api_key, text=text)
-    audio_base64 = result.get("audio_base64")
+    counter = Mp3DurationCounter()
+    storage = video.voice_file.storage
+    old_name = video.voice_file.name if video.voice_file else None
+    name = storage.get_available_name(video.voice_file.field.generate_filename(video, f"voice_{video.id}.mp3"))
 
-    if not audio_base64:
-        return {'success': False, 'error': 'No audio generated'}
+    try:
+        if len(chunks) <= 1:
+            # Chunk'lar API'den geldikçe depoya yazılır; süre çerçeve başlıklarından hesaplanır
+            with span("agent:voice_generator", streaming=True) as attrs:
+                source = counter.wrap(agent.stream(api_key=api_key, text=text))
+                name = storage.save(name, File(ChunkStream(source), name=name))
+                attrs['bytes'] = counter.bytes
+            voice_chunks = [{'index': 0, 'text': text, 'start': 0.0, 'end': round(counter.seconds, 3)}]
+        else:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                parts = _synthesize_voice_chunks(user, video, agent, api_key, chunks, tmp_dir)
+                gains = loudness_gains([lufs for _, lufs, _ in parts])
+                output = stitch_voice([path for path, _, _ in parts], os.path.join(tmp_dir, 'voice.mp3'), gains)
+                with open(output, 'rb') as f:
+                    source = counter.wrap(iter(lambda: f.read(64 * 1024), b""))
+                    name = storage.save(name, File(ChunkStream(source), name=name))
+
+            voice_chunks, position = [], 0.0
+            for idx, (chunk_text, (_, _, duration)) in enumerate(zip(chunks, parts)):
+                voice_chunks.append({'index': idx, 'text': chunk_text, 'start': round(position, 3), 'end': round(position + duration, 3)})
+                position += duration
+    except Exception as e:
+        if storage.exists(name):
+            storage.delete(name)
+        return {'success': False, 'error': str(e)}
 
-    audio_bytes = base64.b64decode(audio_base64)
-    audio_file = ContentFile(audio_bytes, name=f"voice_{video.id}.mp3")
+    if not counter.bytes:
+        storage.delete(name)
+        return {'success': False, 'error': 'No audio generated'}
 
-    if video.voice_file:
-        video.voice_file.delete(save=False)
+    # Sadece kendi alanını yaz: paralel adımların kaydettiği alanları ezmesin
+    video.voice_file.name = name
+    video.voice_duration_seconds = round(counter.seconds, 3)
+    video.voice_chunks = voice_chunks
+    video.save(update_fields=['voice_file', 'voice_duration_seconds', 'voice_chunks', 'updated_at'])
 
-    video.voice_file.save(audio_file.name, audio_file)
-    video.save()
+    # Eski ses, yenisi tamamen yazıldıktan sonra silinir
+    if old_name and old_name != name:
+        storage.delete(old_name)
 
     return {
         'success': True,
-        'voice_url': video.voice_file.url
+        'voice_url': video.voice_file.url,
+        'duration_seconds': video.voice_duration_seconds,
+        'chunks': len(voice_chunks),
     }
 
 import base64
 from django.core.files.base import ContentFile
 from core.services.subtitle_generator import generate_subtitles_with_whisper  # core.services.subtitle_generator'dan içeri alındığını varsayıyorum
+from core.services.subtitle_generator import transcribe_many
+from core.services.script_alignment import align_script_to_audio
+from core.services.instrumentation import StepCancelled
+from django.conf import settings
+import time
 from mutagen.mp3 import MP3
 
+def save_subtitle(video, srt_content, subtitle_words=None):
+    """SRT dosyasını (ve hizalama modunda kelime zamanlarını) videoya yazar."""
+    srt_bytes = srt_content.encode('utf-8-sig')
+    srt_file = ContentFile(srt_bytes, name=f"subtitle_{video.id}.srt")
+
+    if video.subtitle_file:
+        video.subtitle_file.delete(save=False)
+
+    video.subtitle_file.save(srt_file.name, srt_file, save=False)
+    video.subtitle_words = subtitle_words
+    video.save(update_fields=['subtitle_file', 'subtitle_words', 'updated_at'])
+
+
+def align_subtitle(video, audio_path):
+    """
+    SUBTITLE_MODE = 'align' ise metni sese hizalar. (hizalama, güven) döner; mod kapalıysa, metin yoksa
+    veya güven eşiğin altındaysa hizalama None'dır ve çağıran Whisper'a düşer.
+    """
+    script = video.ai_content.script.strip() if hasattr(video, 'ai_content') else ''
+    if getattr(settings, 'SUBTITLE_MODE', 'align') != 'align' or not script:
+        return None, None
+
+    try:
+        alignment = align_script_to_audio(script, audio_path, chunks=video.voice_chunks)
+    except StepCancelled:
+        # İptal edilen iş Whisper'a düşmez
+        raise
+    except Exception as e:
+        logger.warning(f"Script alignment failed for video {video.id}, falling back to Whisper: {str(e)}")
+        return None, None
+
+    if alignment.confidence < getattr(settings, 'SUBTITLE_ALIGNMENT_MIN_CONFIDENCE', 0.7):
+        logger.warning(f"Script alignment confidence {alignment.confidence} too low for video {video.id}, falling back to Whisper")
+        return None, alignment.confidence
+    return alignment, alignment.confidence
+
+
+def generate_subtitles_batch_util(videos, batch_size=None, model_size=None, on_saved=None):
+    """
+    Çok sayıda videonun altyazısını tek seferde üretir: önce metin hizalaması, kalanlar paylaşılan modelle
+    batched Whisper. Her video sonucu gelir gelmez kaydedilir. Dosya/CPU-saati metriğiyle özet döner.
+    """
+    started, cpu_started = time.perf_counter(), time.process_time()
+    stats = {'files': 0, 'aligned': 0, 'transcribed': 0, 'failed': 0, 'audio_seconds': 0.0}
+
+    def saved(video, method, error=None):
+        stats['failed' if error else method] += 1
+        if on_saved:
+            on_saved(video, method, error)
+
+    pending = []
+    for video in videos:
+        stats['files'] += 1
+        try:
+            audio_path = video.voice_file.path
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError('Voice file does not exist on disk.')
+        except Exception as e:
+            saved(video, 'failed', str(e))
+            continue
+
+        alignment, _ = align_subtitle(video, audio_path)
+        if alignment is not None:
+            save_subtitle(video, alignment.to_srt(), alignment.cues)
+            stats['audio_seconds'] += alignment.cues[-1]['end'] if alignment.cues else 0.0
+            saved(video, 'aligned')
+        else:
+            pending.append(video)
+
+    by_id = {video.id: video for video in pending}
+    items = [(video.id, video.voice_file.path, video.panel.language if video.panel else None) for video in pending]
+    for video_id, srt_content, error, audio_seconds in transcribe_many(items, model_size=model_size, batch_size=batch_size):
+        video = by_id[video_id]
+        if error or not srt_content:
+            saved(video, 'transcribed', error or 'Subtitle generation returned empty content.')
+            continue
+        save_subtitle(video, srt_content)
+        stats['audio_seconds'] += audio_seconds
+        saved(video, 'transcribed')
+
+    stats['wall_seconds'] = round(time.perf_counter() - started, 2)
+    stats['cpu_seconds'] = round(time.process_time() - cpu_started, 2)
+    cpu_hours = stats['cpu_seconds'] / 3600
+    done = stats['aligned'] + stats['transcribed']
+    stats['files_per_cpu_hour'] = round(done / cpu_hours, 1) if cpu_hours else None
+    stats['audio_seconds'] = round(stats['audio_seconds'], 1)
+    return stats
+
+
 def generate_subtitle_content_util(user, video):
     if not video.voice_file:
         return {'success': False, 'error': 'Voice file not found. Please complete the voice generation step first.'}
@@ -106,34 +301,48 @@ def generate_subtitle_content_util(user, video):
     except Exception as e:
         return {'success': False, 'error': f'Audio file error: {str(e)}'}
 
-    try:
-        # Whisper ile zaman kodlu altyazı üret
-        srt_content = generate_subtitles_with_whisper(audio_path)
-    except Exception as e:
-        return {'success': False, 'error': f'Whisper subtitle generation failed: {str(e)}'}
+    srt_content = None
+    subtitle_words = None
+    method = 'whisper'
 
-    if not srt_content:
-        return {'success': False, 'error': 'Subtitle generation returned empty content.'}
+    # Metin zaten belli: önce sese hizalamayı dene, güven düşükse Whisper'a düş
+    alignment, confidence = align_subtitle(video, audio_path)
+    if alignment is not None:
+        srt_content = alignment.to_srt()
+        subtitle_words = alignment.cues
+        method = 'align'
 
-    # SRT dosyasını kaydet
-    srt_bytes = srt_content.encode('utf-8-sig')
-    srt_file = ContentFile(srt_bytes, name=f"subtitle_{video.id}.srt")
+    if srt_content is None:
+        try:
+            # Whisper ile zaman kodlu altyazı üret
+            language = video.panel.language if video.panel else None
+            srt_content = generate_subtitles_with_whisper(audio_path, language=language)
+        except StepCancelled:
+            raise
+        except Exception as e:
+            return {'success': False, 'error': f'Whisper subtitle generation failed: {str(e)}'}
 
-    if video.subtitle_file:
-        video.subtitle_file.delete(save=False)
+    if not srt_content:
+        return {'success': False, 'error': 'Subtitle generation returned empty content.'}
 
-    video.subtitle_file.save(srt_file.name, srt_file)
-    video.save()
+    save_subtitle(video, srt_content, subtitle_words)
 
     return {
         'success': True,
-        'subtitle_file_url': video.subtitle_file.url
+        'subtitle_file_url': video.subtitle_file.url,
+        'method': method,
+        'alignment_confidence': confidence,
     }
 
 from mutagen.mp3 import MP3
 from django.core.files.base import ContentFile
 from core.agents.image_content_agent import ImageContentAgent  # Agent import
 from videos.models import VideoImage  # VideoImage modeli
+from core.services.instrumentation import emit_event, report_progress, span
+from core.services.rate_limit import bucket_for
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+import contextvars
 import base64
 import uuid
 import math
@@ -146,8 +355,8 @@ def generate_image_content_util(user, video):
         return {'success': False, 'error': 'Voice file not found. Please complete voice generation first.'}
 
     try:
-        audio = MP3(video.voice_file.path)
-        duration = audio.info.length  # saniye cinsinden float
+        # Ses akış sırasında ölçüldüyse dosyayı yeniden okumaya gerek yok
+        duration = video.voice_duration_seconds or MP3(video.voice_file.path).info.length  # saniye cinsinden float
         image_count = math.floor(duration / 10)
 
         # Küsuratlı hesaplama: örneğin 3.7 → 4, 3.3 → 3
@@ -168,42 +377,92 @@ def generate_image_content_util(user, video):
     prompt = video.ai_content.content_prompt
     agent = ImageContentAgent()
 
-    image_urls = []
-
-    for i in range(image_count):
-        try:
-            logger.info(f"[{user}] Generating image {i+1}/{image_count} for video {video.id}")
-            result = agent._run(api_key=api_key, prompt=prompt, size="1024x1024")
-            image_base64 = result.get("image_base64")
-
-            if not image_base64:
-                continue
-
-            image_data = base64.b64decode(image_base64)
-            image_name = f"image_{video.id}_{uuid.uuid4().hex[:8]}.png"
-            image_file = ContentFile(image_data, name=image_name)
+    concurrency = max(1, getattr(settings, 'IMAGE_GENERATION_CONCURRENCY', 4))
+    retries = getattr(settings, 'IMAGE_GENERATION_RETRIES', 2)
+    bucket = bucket_for(
+        'openai_images', api_key,
+        rate_per_minute=getattr(settings, 'IMAGE_RATE_LIMIT_PER_MINUTE', 5),
+        capacity=getattr(settings, 'IMAGE_RATE_LIMIT_BURST', None),
+    )
 
-            # Yeni image kaydı oluştur
-            video_image = VideoImage.objects.create(video=video, image=image_file)
-            image_urls.append(video_image.image.url)
+    def generate(slot):
+        # Aynı anahtarı paylaşan bütün işler bu bucket'tan token bekler
+        bucket.acquire()
+        logger.info(f"[{user}] Generating image {slot + 1}/{image_count} for video {video.id}")
+        with span(f"agent:{agent.name}") as agent_attrs:
+            # Slot anahtara girer: aynı prompt'lu slotlar cache'te birbirinin görselini almaz
+            image = agent.generate(api_key=api_key, prompt=prompt, size="1024x1024", variant=slot)
+            agent_attrs.update(width=image.width, height=image.height, bytes=len(image.data))
+        if not image.data:
+            raise RuntimeError("Empty image payload")
+        return image
 
-        except Exception as e:
-            logger.error(f"[{user}] Image {i+1} failed: {str(e)}")
-            continue  # Her hata, sadece o resmin atlanmasına neden olur
+    image_urls = []
+    pending = list(range(image_count))
+    errors = {}
+    ready = {}
+    next_slot = 0
+    # Görseller zaten varsa yeniden üretim istenmiştir; bypass copy_context ile worker thread'lere de geçer
+    regenerate = video.images.exists()
+
+    def save(image):
+        # Her görsel kaydedildiği anda kalıcıdır; sonraki hatalar bunu geri almaz
+        image_file = image.to_file(f"image_{video.id}_{uuid.uuid4().hex[:8]}")
+        video_image = VideoImage.objects.create(video=video, image=image_file)
+        image_urls.append(video_image.image.url)
+        report_progress(len(image_urls), image_count, f"Görsel {len(image_urls)}/{image_count}")
+        emit_event("image", index=len(image_urls), total=image_count, url=video_image.image.url)
+
+    with agent_cache_bypass() if regenerate else nullcontext(), \
+            span("image_generation", images=image_count, concurrency=concurrency) as attrs:
+        with ThreadPoolExecutor(max_workers=min(concurrency, image_count), thread_name_prefix='image-gen') as pool:
+            for attempt in range(retries + 1):
+                if not pending:
+                    break
+                if attempt:
+                    logger.warning(f"[{user}] Retrying {len(pending)} failed image slot(s) for video {video.id} (attempt {attempt + 1})")
+
+                # Span/ilerleme dinleyicileri worker thread'lere de taşınsın
+                futures = {pool.submit(contextvars.copy_context().run, generate, slot): slot for slot in pending}
+                failed = []
+                for future in as_completed(futures):
+                    slot = futures[future]
+                    try:
+                        ready[slot] = future.result()
+                    except Exception as e:
+                        logger.error(f"[{user}] Image {slot + 1} failed: {str(e)}")
+                        errors[slot] = str(e)
+                        failed.append(slot)
+                        continue
+
+                    errors.pop(slot, None)
+                    # Slot sırası korunur: önceki slotlar hazır olduğu anda sıradakiler kaydedilir
+                    while next_slot in ready:
+                        save(ready.pop(next_slot))
+                        next_slot += 1
+                pending = sorted(failed)
+                # Yeniden denemeyi bekleyen slotlar sırayı tutuyorsa diğerleri bekler; son turda boşluk atlanır
+                if not pending or attempt == retries:
+                    for slot in sorted(ready):
+                        save(ready.pop(slot))
+
+        attrs['failed'] = len(pending)
 
     if not image_urls:
-        return {'success': False, 'error': 'Image generation failed.'}
+        return {'success': False, 'error': f"Image generation failed: {next(iter(errors.values()), 'unknown error')}"}
 
-    return {
+    response = {
         'success': True,
         'images': image_urls
     }
+    if pending:
+        response['failed_images'] = len(pending)
+    return response
 
 from core.agents.image_thumbnail_agent import ImageThumbnailAgent
+from core.services.thumbnail import render_thumbnail
 from django.core.files.base import ContentFile
-from PIL import Image, ImageDraw, ImageFont
 import base64
-import io
 import uuid
 import os
 
@@ -220,47 +479,20 @@ def generate_thumbnail_image_util(user, video):
 
     try:
         # 1. OpenAI'den büyük boyutlu yatay görsel al (en yakın çözünürlük)
-        result = agent._run(api_key=api_key, prompt=prompt, size="1792x1024")
-        image_base64 = result.get("image_base64")
-        image_data = base64.b64decode(image_base64)
-
-        # 2. Pillow ile resmi aç, yeniden boyutlandır (bizim istediğimiz gibi)
-        image = Image.open(io.BytesIO(image_data)).convert("RGBA")
-        target_size = (1024, 576)
-        image = image.resize(target_size, Image.LANCZOS)
-
-        # 3. Yazıyı yerleştir
-        draw = ImageDraw.Draw(image)
-        title = video.ai_content.title.strip()
-
-        font_path = os.path.join("static", "Roboto_Condensed-Bold.ttf")
-        font = ImageFont.truetype(font_path, size=64)
-        text_color = (255, 255, 255, 255)
-        shadow_color = (0, 0, 0, 180)
-
-        w, h = image.size
-        # Yazı konumu hesapla
-        bbox = draw.textbbox((0, 0), title, font=font)
-        tw = bbox[2] - bbox[0]
-        th = bbox[3] - bbox[1]
-        x = (w - tw) // 2
-        y = h - th - 40
-
-        # Gölge + yazı
-        draw.text((x + 2, y + 2), title, font=font, fill=shadow_color)
-        draw.text((x, y), title, font=font, fill=text_color)
-
-        # 4. PNG olarak kaydet
-        output = io.BytesIO()
-        image.save(output, format="PNG")
+        # Mevcut kapak yeniden üretiliyorsa cache okunmaz
+        with agent_cache_bypass() if video.thumbnail else nullcontext(), span(f"agent:{agent.name}"):
+            image = agent.generate(api_key=api_key, prompt=prompt, size="1792x1024")
+
+        # 2. Yeniden boyutlandır, başlığı yaz, PNG'ye çevir (görsel bir kez decode edilir)
+        thumbnail_png = render_thumbnail(image.to_pil(), video.ai_content.title.strip())
         thumb_name = f"thumbnail_{video.id}_{uuid.uuid4().hex[:8]}.png"
-        thumb_file = ContentFile(output.getvalue(), name=thumb_name)
+        thumb_file = ContentFile(thumbnail_png, name=thumb_name)
 
         if video.thumbnail:
             video.thumbnail.delete(save=False)
 
-        video.thumbnail.save(thumb_file.name, thumb_file)
-        video.save()
+        video.thumbnail.save(thumb_file.name, thumb_file, save=False)
+        video.save(update_fields=['thumbnail', 'updated_at'])
 
         return {'success': True, 'thumbnail_url': video.thumbnail.url}
 
@@ -272,9 +504,14 @@ import uuid
 from django.conf import settings
 from django.core.files import File
 from core.services.video_composer import compose_video  # compose_video burada
+from core.services.instrumentation import span
 from django.core.files.base import File as DjangoFile
 
-def generate_edit_video_util(user, video):
+def generate_edit_video_util(user, video, draft=False):
+    """
+    Final videoyu (veya draft=True ise düşük çözünürlüklü taslağı) oluşturur.
+    Taslak, final_video'ya dokunmadan draft_video alanına kaydedilir.
+    """
     # Gerekli bileşenlerin olup olmadığını kontrol et
     if not video.voice_file:
         return {'success': False, 'error': 'Voice file missing. Lütfen önce ses üretin.'}
@@ -285,6 +522,10 @@ def generate_edit_video_util(user, video):
     if not video.images.exists():
         return {'success': False, 'error': 'No images found. Lütfen içerik görsellerini üretin.'}
 
+    target_field = video.draft_video if draft else video.final_video
+    prefix = 'draft' if draft else 'final'
+    output_path = None
+
     try:
         # Yolları ayarla
         audio_path = video.voice_file.path
@@ -292,10 +533,10 @@ def generate_edit_video_util(user, video):
         images = [img.image.path for img in video.images.all()]
 
         # Çıktı klasörü
-        output_dir = os.path.join(settings.MEDIA_ROOT, 'final_videos')
+        output_dir = os.path.join(settings.MEDIA_ROOT, f'{prefix}_videos')
         os.makedirs(output_dir, exist_ok=True)
 
-        output_filename = f"final_{video.id}_{uuid.uuid4().hex[:8]}.mp4"
+        output_filename = f"{prefix}_{video.id}_{uuid.uuid4().hex[:8]}.mp4"
         output_path = os.path.join(output_dir, output_filename)
 
         # Videoyu oluştur
@@ -304,25 +545,111 @@ def generate_edit_video_util(user, video):
             audio_path=audio_path,
             output_path=output_path,
             srt_path=srt_path,
-            resolution=(video.panel.resolution_width, video.panel.resolution_height)
+            resolution=(video.panel.resolution_width, video.panel.resolution_height),
+            backend=video.panel.render_backend or None,
+            draft=draft,
         )
 
         if not result_path or not os.path.exists(result_path):
             return {'success': False, 'error': 'Video composition failed or output missing.'}
 
-        # Eski final video varsa sil
-        if video.final_video:
-            video.final_video.delete(save=False)
+        # Eski video varsa sil
+        if target_field:
+            target_field.delete(save=False)
 
-        # Yeni final videoyu kaydet
-        with open(result_path, 'rb') as f:
-            django_file = DjangoFile(f)
-            video.final_video.save(output_filename, django_file, save=True)
+        # Yeni videoyu kaydet
+        with span("file_save", bytes=os.path.getsize(result_path)):
+            with open(result_path, 'rb') as f:
+                django_file = DjangoFile(f)
+                target_field.save(output_filename, django_file, save=False)
+                video.save(update_fields=[target_field.field.name, 'updated_at'])
 
         return {
             'success': True,
-            'video_url': video.final_video.url
+            'video_url': target_field.url
         }
 
+    except StepCancelled:
+        # İptal edilen render'ın yarım dosyası bırakılmaz
+        if output_path and os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def generate_draft_video_util(user, video):
+    return generate_edit_video_util(user, video, draft=True)
+
+
+from core.services.renditions import platform_profiles, rendition_path
+from .models import VideoRendition
+
+def generate_renditions_util(user, video):
+    """
+    Videoyu tüm platform profillerinde (settings.RENDITION_PLATFORMS, boşsa hepsi) tek render'da üretir
+    ve her çıktıyı VideoRendition olarak kaydeder.
+    """
+    if not video.voice_file:
+        return {'success': False, 'error': 'Voice file missing. Lütfen önce ses üretin.'}
+
+    if not video.subtitle_file:
+        return {'success': False, 'error': 'Subtitle file missing. Lütfen altyazıyı üretin.'}
+
+    if not video.images.exists():
+        return {'success': False, 'error': 'No images found. Lütfen içerik görsellerini üretin.'}
+
+    try:
+        profiles = platform_profiles(getattr(settings, 'RENDITION_PLATFORMS', None))
+
+        output_dir = os.path.join(settings.MEDIA_ROOT, 'renditions')
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"rendition_{video.id}_{uuid.uuid4().hex[:8]}.mp4")
+
+        results = compose_video(
+            images=[img.image.path for img in video.images.all()],
+            audio_path=video.voice_file.path,
+            output_path=output_path,
+            srt_path=video.subtitle_file.path,
+            profiles=profiles,
+        )
+
+        if not results:
+            return {'success': False, 'error': 'Rendition composition failed.'}
+
+        renditions = []
+        with span("file_save", renditions=len(results)):
+            for profile in profiles:
+                result_path = results.get(profile.name)
+                if not result_path or not os.path.exists(result_path):
+                    continue
+
+                # Aynı platformun eski çıktısı varsa sil
+                old = video.renditions.filter(platform=profile.name).first()
+                if old:
+                    old.file.delete(save=False)
+                    old.delete()
+
+                rendition = VideoRendition(
+                    video=video,
+                    platform=profile.name,
+                    width=profile.resolution[0],
+                    height=profile.resolution[1],
+                    fps=profile.fps,
+                    video_bitrate=profile.video_bitrate,
+                )
+                with open(result_path, 'rb') as f:
+                    rendition.file.save(os.path.basename(rendition_path(output_path, profile)), DjangoFile(f), save=True)
+                os.remove(result_path)
+                renditions.append({
+                    'platform': rendition.get_platform_display(),
+                    'resolution': f"{rendition.width}x{rendition.height}",
+                    'url': rendition.file.url,
+                })
+
+        return {'success': True, 'renditions': renditions}
+
+    except StepCancelled:
+        raise
     except Exception as e:
-        return {'success': False, 'error': str(e)}
\ No newline at end of file
+        return {'success': False, 'error': str(e)}
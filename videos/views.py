@@ -3,11 +3,22 @@ from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.core.files.base import ContentFile
-from .models import Video, VideoAIContent
+from .models import Video, VideoAIContent, GenerationJob, JobStateChoices, VideoBatch
 from django.utils.decorators import method_decorator
 import logging
 import base64
-from .utils import generate_text_content_util, generate_voice_content_util, generate_subtitle_content_util, generate_image_content_util, generate_thumbnail_image_util, generate_edit_video_util
+from django.urls import reverse
+from django.conf import settings
+from django.shortcuts import redirect
+from panels.models import Panel
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import StreamingHttpResponse
+from .events import format_sse, get_channel
+from .jobs import STEP_UTILS, submit_job, job_payload, cancel_job, create_batch, batch_stats
 logger = logging.getLogger(__name__)
 
 @csrf_exempt
@@ -17,41 +28,171 @@ def generate_content(request, video_id, step):
         logger.warning(f"[{request.user}] Invalid request method: {request.method} on step={step}")
         return JsonResponse({'success': False, 'error': 'Only POST method allowed'}, status=405)
 
-    if step not in ['text', 'voice', 'subtitle', 'content_images', 'banner_image', 'thumbnail_image', 'edit']:
+    if step not in STEP_UTILS:
         logger.warning(f"[{request.user}] Invalid step parameter: {step}")
         return JsonResponse({'success': False, 'error': 'Invalid step parameter'}, status=400)
 
     video = get_object_or_404(Video, id=video_id)
 
     try:
-        user = request.user
-        logger.info(f"[{user}] Step `{step}` generation started for video {video.id} - `{video.title}`")
-
-        if step == 'text':
-            response = generate_text_content_util(user, video)
-        elif step == 'voice':
-            response = generate_voice_content_util(user, video)
-        elif step == 'subtitle':
-            response = generate_subtitle_content_util(user, video)
-        elif step == 'content_images':
-            response = generate_image_content_util(user, video)
-        elif step == 'thumbnail_image':
-            response = generate_thumbnail_image_util(user, video)
-        elif step == 'edit':
-            response = generate_edit_video_util(user, video)
-        else:
-            response = {'success': False, 'error': 'Unsupported step'}
+        logger.info(f"[{request.user}] Step `{step}` submitted for video {video.id} - `{video.title}`")
+        job = submit_job(request.user, video, step)
+        payload = job_payload(job)
+        payload['success'] = True
+        payload['status_url'] = reverse('videos:job_status', args=[job.id])
+        payload['events_url'] = reverse('videos:job_events', args=[job.id])
+        payload['cancel_url'] = reverse('videos:job_cancel', args=[job.id])
+        # İş senkron çalıştıysa (GENERATION_JOB_WORKERS=0) sonuç da hemen döner
+        return JsonResponse(payload, status=200 if not job.is_active else 202)
+
+    except Exception as e:
+        logger.exception(f"[{request.user}] Exception occurred while submitting step `{step}` for video {video.id}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
 
-        if response.get('success'):
-            logger.info(f"[{user}] Step `{step}` generation SUCCESS for video {video.id}")
+@login_required
+def job_status(request, job_id):
+    job = get_object_or_404(GenerationJob, id=job_id, user=request.user)
+    return JsonResponse(job_payload(job))
+
+
+# SSE akışında olay yoksa bu aralıkla yorum satırı gönderilir (proxy'ler bağlantıyı kapatmasın)
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def _job_event_stream(job_id, last_id=0):
+    """
+    İşin canlı olaylarını text/event-stream parçaları olarak üretir. İş bu süreçte çalışıyorsa olaylar
+    kanaldan okunur; değilse (başka worker süreci, bitmiş iş) durum satırı saniyede bir okunur.
+    """
+    last_beat = time.monotonic()
+    last_progress = None
+    while True:
+        channel = get_channel(job_id)
+        if channel is not None:
+            events = channel.read(last_id, timeout=1.0)
+            for event in events:
+                last_id = event['id']
+                yield format_sse(event)
+            if channel.closed and not channel.read(last_id, timeout=0):
+                return
+            if events:
+                last_beat = time.monotonic()
         else:
-            logger.error(f"[{user}] Step `{step}` generation FAILED for video {video.id} - Reason: {response.get('error')}")
+            try:
+                job = GenerationJob.objects.get(id=job_id)
+            finally:
+                connection.close()
+            if not job.is_active:
+                yield format_sse({'id': last_id + 1, 'event': 'done', 'data': job_payload(job)})
+                return
+            if job.progress != last_progress:
+                last_progress = job.progress
+                last_beat = time.monotonic()
+                yield format_sse({'id': last_id, 'event': 'progress', 'data': {'progress': job.progress, 'message': job.progress_message}})
+            time.sleep(1.0)
 
-        return JsonResponse(response)
+        if time.monotonic() - last_beat >= SSE_HEARTBEAT_SECONDS:
+            last_beat = time.monotonic()
+            yield ": keep-alive\n\n"
 
-    except Exception as e:
-        logger.exception(f"[{request.user}] Exception occurred in step `{step}` for video {video.id}")
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+async def _iterate_in_thread(stream):
+    """Bloklayan üreticiyi ASGI altında event loop'u tutmadan tüketir."""
+    next_chunk = sync_to_async(next, thread_sensitive=False)
+    while True:
+        chunk = await next_chunk(stream, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+@login_required
+def job_events(request, job_id):
+    """Server-Sent Events: progress, image, segment, encode, node ve son olarak done (sonuç + dosya URL'leri)."""
+    job = get_object_or_404(GenerationJob, id=job_id, user=request.user)
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_id') or 0)
+    except ValueError:
+        last_id = 0
+
+    stream = _job_event_stream(job.id, last_id)
+    if isinstance(request, ASGIRequest):
+        stream = _iterate_in_thread(stream)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+def job_cancel(request, job_id):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Only POST method allowed'}, status=405)
+
+    job = get_object_or_404(GenerationJob, id=job_id, user=request.user)
+    if not job.is_active:
+        return JsonResponse({'success': False, 'error': 'Job is not running'}, status=409)
+
+    job = cancel_job(job)
+    logger.info(f"[{request.user}] Job {job.id}: cancel requested ({job.state})")
+    payload = job_payload(job)
+    payload['success'] = True
+    return JsonResponse(payload, status=202 if job.is_active else 200)
+
+
+def _parse_batch_entries(request):
+    """JSON gövdesi ({"videos": [...]}) veya formdaki "Başlık | açıklama" satırları."""
+    if request.content_type == 'application/json':
+        data = json.loads(request.body or b'{}')
+        entries = data.get('videos') or []
+        default_seconds = int(data.get('duration_seconds', 60))
+    else:
+        entries = []
+        for line in request.POST.get('entries', '').splitlines():
+            title, _, description = line.partition('|')
+            entries.append({'title': title.strip(), 'description': description.strip()})
+        default_seconds = int(request.POST.get('length_seconds', 60))
+
+    entries = [entry for entry in entries if str(entry.get('title', '')).strip()]
+    return entries, default_seconds
+
+
+@login_required
+def batch_create(request, panel_id):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Only POST method allowed'}, status=405)
+
+    # Toplu üretim kullanıcının API anahtarlarını harcar: yalnızca kendi paneli
+    panel = get_object_or_404(Panel, id=panel_id, user=request.user)
+    try:
+        entries, default_seconds = _parse_batch_entries(request)
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'success': False, 'error': f'Invalid batch payload: {str(e)}'}, status=400)
+
+    if not entries:
+        return JsonResponse({'success': False, 'error': 'No videos in batch'}, status=400)
+
+    max_videos = getattr(settings, 'BATCH_MAX_VIDEOS', 100)
+    if len(entries) > max_videos:
+        return JsonResponse({'success': False, 'error': f'A batch can contain at most {max_videos} videos'}, status=400)
+
+    batch = create_batch(request.user, panel, entries, duration_seconds=default_seconds)
+
+    if request.content_type != 'application/json':
+        return redirect('panels:detail', pk=panel.id)
+
+    payload = batch_stats(batch)
+    payload['success'] = True
+    payload['status_url'] = reverse('videos:batch_status', args=[batch.id])
+    return JsonResponse(payload, status=202)
+
+
+@login_required
+def batch_status(request, batch_id):
+    batch = get_object_or_404(VideoBatch, id=batch_id, user=request.user)
+    return JsonResponse(batch_stats(batch))
 
 
 from django.shortcuts import render, redirect, get_object_or_404
@@ -101,13 +242,17 @@ def video_detail(request, pk):
     images = video.images.all()  # related_name='images' varsayımı
     voice_file = video.voice_file if hasattr(video, 'voice_file') else None
     subtitle_file = video.subtitle_file if hasattr(video, 'subtitle_file') else None
-    
+    step_runs = video.step_runs.all()[:10]  # son adım çalıştırmaları ve aşama süreleri
+    active_jobs = video.jobs.filter(state__in=[JobStateChoices.QUEUED, JobStateChoices.RUNNING])
+
     context = {
         'video': video,
         'ai_content': ai_content,
         'images': images,
         'voice_file': voice_file,
         'subtitle_file': subtitle_file,
+        'step_runs': step_runs,
+        'active_jobs': active_jobs,
     }
     return render(request, 'videos/detail.html', context)
 